@@ -0,0 +1,32 @@
+"""Add lat/lng location columns to bikes
+
+Revision ID: 3c9d5e1a7b42
+Revises: 480b17f97f02
+Create Date: 2026-10-18 09:12:40.118305
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d5e1a7b42'
+down_revision: Union[str, None] = '480b17f97f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add nullable lat/lng columns; existing bikes stay unlocated."""
+    with op.batch_alter_table("bikes", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("lat", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("lng", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove the lat/lng columns."""
+    with op.batch_alter_table("bikes", schema=None) as batch_op:
+        batch_op.drop_column("lng")
+        batch_op.drop_column("lat")
@@ -0,0 +1,32 @@
+"""Add optimistic-locking version column to bikes
+
+Revision ID: 5be2d0f9a6c3
+Revises: a17e6f20c4d8
+Create Date: 2026-10-18 11:37:02.904518
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5be2d0f9a6c3'
+down_revision: Union[str, None] = 'a17e6f20c4d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the version column, starting existing bikes at 1."""
+    with op.batch_alter_table("bikes", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade() -> None:
+    """Remove the version column."""
+    with op.batch_alter_table("bikes", schema=None) as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,32 @@
+"""Add claim_token to idempotency_keys
+
+Revision ID: 9e4a7c2d5f81
+Revises: b58e2c7d4f19
+Create Date: 2026-10-18 21:04:52.118903
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4a7c2d5f81'
+down_revision: Union[str, None] = 'b58e2c7d4f19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the claim_token column; records already stored have no holder."""
+    with op.batch_alter_table("idempotency_keys", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("claim_token", sa.String(length=32), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    """Remove the claim_token column."""
+    with op.batch_alter_table("idempotency_keys", schema=None) as batch_op:
+        batch_op.drop_column("claim_token")
@@ -0,0 +1,32 @@
+"""Add composite rental availability index
+
+Revision ID: a17e6f20c4d8
+Revises: 3c9d5e1a7b42
+Create Date: 2026-10-18 10:04:51.620447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a17e6f20c4d8'
+down_revision: Union[str, None] = '3c9d5e1a7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index rentals by bike and date range for overlap checks."""
+    op.create_index(
+        "ix_rentals_bike_id_start_date_end_date",
+        "rentals",
+        ["bike_id", "start_date", "end_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the rental availability index."""
+    op.drop_index("ix_rentals_bike_id_start_date_end_date", table_name="rentals")
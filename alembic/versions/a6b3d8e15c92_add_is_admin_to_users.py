@@ -0,0 +1,34 @@
+"""Add is_admin flag to users
+
+Revision ID: a6b3d8e15c92
+Revises: f2d81c6b3e47
+Create Date: 2026-10-18 18:12:40.337159
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6b3d8e15c92'
+down_revision: Union[str, None] = 'f2d81c6b3e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the is_admin column; existing users are not administrators."""
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "is_admin", sa.Boolean(), nullable=False, server_default=sa.false()
+            )
+        )
+
+
+def downgrade() -> None:
+    """Remove the is_admin column."""
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("is_admin")
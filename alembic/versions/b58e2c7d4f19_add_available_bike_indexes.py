@@ -0,0 +1,50 @@
+"""Add partial indexes over available bikes
+
+Revision ID: b58e2c7d4f19
+Revises: a6b3d8e15c92
+Create Date: 2026-10-18 16:42:07.318204
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e2c7d4f19'
+down_revision: Union[str, None] = 'a6b3d8e15c92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_AVAILABLE = sa.text("availability_status = 'available'")
+
+
+def upgrade() -> None:
+    """Index the available fleet by each catalog sort order.
+
+    SQLite and PostgreSQL keep only available bikes in these indexes; other
+    dialects ignore the predicate and index the whole table.
+    """
+    op.create_index(
+        "ix_bikes_available_rate_per_day_cents_id",
+        "bikes",
+        ["rate_per_day_cents", "id"],
+        unique=False,
+        sqlite_where=_AVAILABLE,
+        postgresql_where=_AVAILABLE,
+    )
+    op.create_index(
+        "ix_bikes_available_name_id",
+        "bikes",
+        ["name", "id"],
+        unique=False,
+        sqlite_where=_AVAILABLE,
+        postgresql_where=_AVAILABLE,
+    )
+
+
+def downgrade() -> None:
+    """Drop the available bike indexes."""
+    op.drop_index("ix_bikes_available_name_id", table_name="bikes")
+    op.drop_index("ix_bikes_available_rate_per_day_cents_id", table_name="bikes")
@@ -0,0 +1,32 @@
+"""Add rental user history index
+
+Revision ID: d93b6e4f1a25
+Revises: c41f8a3e92b7
+Create Date: 2026-10-18 14:12:08.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93b6e4f1a25'
+down_revision: Union[str, None] = 'c41f8a3e92b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index rentals by user and creation time for the rental history."""
+    op.create_index(
+        "ix_rentals_user_id_created_at",
+        "rentals",
+        ["user_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the rental user history index."""
+    op.drop_index("ix_rentals_user_id_created_at", table_name="rentals")
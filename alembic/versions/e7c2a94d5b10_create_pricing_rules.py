@@ -0,0 +1,43 @@
+"""Create pricing_rules table
+
+Revision ID: e7c2a94d5b10
+Revises: d93b6e4f1a25
+Create Date: 2026-10-18 15:41:37.902448
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c2a94d5b10'
+down_revision: Union[str, None] = 'd93b6e4f1a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the table of quote pricing adjustments."""
+    op.create_table(
+        "pricing_rules",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("bike_type", sa.String(length=100), nullable=True),
+        sa.Column(
+            "day_kind",
+            sa.Enum("all", "weekday", "weekend", name="pricing_day_kind"),
+            nullable=False,
+        ),
+        sa.Column("multiplier_percent", sa.Integer(), nullable=False),
+        sa.Column("surcharge_cents", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the pricing_rules table."""
+    op.drop_table("pricing_rules")
+    sa.Enum(name="pricing_day_kind").drop(op.get_bind(), checkfirst=True)
@@ -4,26 +4,40 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 import logging
 import os
-from typing import Annotated
+import uuid
+from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.types import Scope
 
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.models.user import User
+from app.password_hasher import check_password, hash_password, password_hasher
+from app.repositories import revoked_token_repo, user_repo
+from app.revocation import revocation_filter
+from app.user_cache import AuthenticatedUser, user_cache
 
 logger = logging.getLogger("app.auth")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+# Request state slot holding ``(token, claims or JWTError)`` for the bearer
+# token, so middleware and dependencies verify it once per request.
+TOKEN_CLAIMS_STATE_KEY = "token_claims"
 
 if not SECRET_KEY:
     raise RuntimeError("JWT_SECRET_KEY environment variable must be configured.")
@@ -31,23 +45,95 @@ if not SECRET_KEY:
 
 def get_password_hash(password: str) -> str:
     """Hash a plaintext password for storage."""
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Validate a plaintext password against a stored hash."""
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except ValueError:
-        return False
+    return check_password(plain_password, hashed_password)
+
+
+def _create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
+    """Sign a JWT carrying a unique ``jti`` so it can be revoked later."""
+    expire = datetime.now(tz=timezone.utc) + expires_delta
+    payload = {
+        "sub": subject,
+        "exp": expire,
+        "jti": uuid.uuid4().hex,
+        "type": token_type,
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
     """Create a signed JWT access token for the supplied subject identifier."""
     expire_delta = expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    expire = datetime.now(tz=timezone.utc) + expire_delta
-    payload = {"sub": subject, "exp": expire}
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    return _create_token(subject, ACCESS_TOKEN_TYPE, expire_delta)
+
+
+def create_refresh_token(subject: str, expires_delta: timedelta | None = None) -> str:
+    """Create a long-lived refresh token exchangeable at ``/auth/refresh``."""
+    expire_delta = expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    return _create_token(subject, REFRESH_TOKEN_TYPE, expire_delta)
+
+
+def decode_token(token: str, expected_type: str) -> dict[str, Any]:
+    """Verify a JWT's signature, expiry and type and return its claims.
+
+    Tokens issued before token types existed have no ``type`` claim and are
+    treated as access tokens. Raises ``JWTError`` when verification fails.
+    """
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if payload.get("type", ACCESS_TOKEN_TYPE) != expected_type:
+        raise JWTError(f"expected a {expected_type} token")
+    return payload
+
+
+def bearer_token(headers: Headers) -> str | None:
+    """Return the bearer token from an ``Authorization`` header, if any."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+def request_token_claims(scope: Scope, token: str) -> dict[str, Any]:
+    """Decode an access token at most once per request.
+
+    The result, or the verification error, is kept in the ASGI request state
+    so the rate limit tiers, idempotency middleware and ``get_current_user``
+    share one decode. Raises ``JWTError`` like ``decode_token``.
+    """
+    state = scope.setdefault("state", {})
+    cached = state.get(TOKEN_CLAIMS_STATE_KEY)
+    if cached is not None and cached[0] == token:
+        claims = cached[1]
+    else:
+        try:
+            claims = decode_token(token, ACCESS_TOKEN_TYPE)
+        except JWTError as exc:
+            claims = exc
+        state[TOKEN_CLAIMS_STATE_KEY] = (token, claims)
+    if isinstance(claims, JWTError):
+        raise claims
+    return claims
+
+
+def revoke_token_claims(db: Session, payload: dict[str, Any]) -> bool:
+    """Revoke a decoded token by its ``jti``; return False if already revoked.
+
+    Tokens without a ``jti`` cannot be revoked and return False.
+    """
+    jti = payload.get("jti")
+    expires_at = payload.get("exp")
+    if not isinstance(jti, str) or not isinstance(expires_at, (int, float)):
+        return False
+    return revoked_token_repo.revoke_token(
+        db,
+        jti,
+        datetime.fromtimestamp(expires_at, tz=timezone.utc),
+        datetime.now(tz=timezone.utc),
+    )
 
 
 def _get_user_by_email(db: Session, email: str) -> User | None:
@@ -73,45 +159,168 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
     return user
 
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)],
-) -> User:
-    """Validate request bearer token and return the associated user."""
-    credentials_exception = HTTPException(
+async def authenticate_user_async(
+    db: AsyncSession, email: str, password: str
+) -> User | None:
+    """Like ``authenticate_user`` but verifies bcrypt in the hashing pool.
+
+    Raises ``HashingQueueFull`` when the pool cannot take more work.
+    """
+    user = await user_repo.get_user_by_email_async(db, email)
+    # End the read so no pooled connection is held while bcrypt runs.
+    await db.commit()
+    if user is None:
+        logger.warning("Login attempt with unknown email: %s", email)
+        return None
+    if not await password_hasher.verify(password, user.hashed_password):
+        logger.warning("Invalid password attempt for email: %s", email)
+        return None
+    return user
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _verify_access_token(
+    token: str, request: Request
+) -> tuple[int, str | None, dict[str, Any]]:
+    """Return ``(user_id, jti, claims)`` for a valid access token.
+
+    Claims decoded earlier in the request by middleware are reused. Raises
+    the 401 credentials error when the token cannot be trusted.
+    """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = request_token_claims(request.scope, token)
     except JWTError as exc:
         logger.warning("Failed token decode: %s", exc)
-        raise credentials_exception from exc
+        raise _credentials_exception() from exc
 
     subject = payload.get("sub")
     if subject is None:
         logger.warning("Token missing subject claim.")
-        raise credentials_exception
+        raise _credentials_exception()
 
     try:
         user_id = int(subject)
     except (TypeError, ValueError) as exc:
         logger.warning("Token subject is not a valid user id: %s", subject)
-        raise credentials_exception from exc
+        raise _credentials_exception() from exc
+
+    token_id = payload.get("jti")
+    return user_id, token_id if isinstance(token_id, str) else None, payload
+
+
+def _remember_user(
+    token: str, user: User, token_id: str | None, payload: dict[str, Any]
+) -> AuthenticatedUser:
+    """Cache the verified token's user until the token or cache entry expires."""
+    authenticated = AuthenticatedUser(
+        id=user.id, email=user.email, token_id=token_id, is_admin=user.is_admin
+    )
+    expires_at = payload.get("exp")
+    user_cache.put(
+        token,
+        authenticated,
+        float(expires_at) if isinstance(expires_at, (int, float)) else None,
+    )
+    return authenticated
+
+
+def get_current_user(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[Session, Depends(get_db)],
+) -> AuthenticatedUser:
+    """Validate request bearer token and return the associated user.
+
+    Tokens already verified are answered from ``user_cache`` without decoding
+    or touching the database. Otherwise claims decoded earlier in the request
+    by middleware are reused.
+    """
+    cached = user_cache.get(token)
+    if cached is not None:
+        if cached.token_id is not None and revocation_filter.is_revoked(
+            db, cached.token_id
+        ):
+            logger.warning("Revoked token presented for user: %s", cached.id)
+            raise _credentials_exception()
+        return cached
+
+    user_id, token_id, payload = _verify_access_token(token, request)
+    if token_id is not None and revocation_filter.is_revoked(db, token_id):
+        logger.warning("Revoked token presented for user: %s", user_id)
+        raise _credentials_exception()
 
     user = _get_user_by_id(db, user_id)
     if user is None:
         logger.warning("Token subject not found: %s", user_id)
-        raise credentials_exception
+        raise _credentials_exception()
+    return _remember_user(token, user, token_id, payload)
 
-    return user
+
+async def get_current_user_async(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> AuthenticatedUser:
+    """``get_current_user`` for async routes, on the request's ``AsyncSession``.
+
+    Being a coroutine, it runs on the event loop instead of taking a
+    threadpool thread for every authenticated request.
+    """
+    cached = user_cache.get(token)
+    if cached is not None:
+        if cached.token_id is not None and await db.run_sync(
+            revocation_filter.is_revoked, cached.token_id
+        ):
+            logger.warning("Revoked token presented for user: %s", cached.id)
+            raise _credentials_exception()
+        return cached
+
+    user_id, token_id, payload = _verify_access_token(token, request)
+    if token_id is not None and await db.run_sync(
+        revocation_filter.is_revoked, token_id
+    ):
+        logger.warning("Revoked token presented for user: %s", user_id)
+        raise _credentials_exception()
+
+    user = await user_repo.get_user_by_id_async(db, user_id)
+    if user is None:
+        logger.warning("Token subject not found: %s", user_id)
+        raise _credentials_exception()
+    return _remember_user(token, user, token_id, payload)
+
+
+def get_current_admin(
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+) -> AuthenticatedUser:
+    """Return the authenticated user, rejecting callers who are not admins."""
+    if not current_user.is_admin:
+        logger.warning("Non-admin user %s denied admin route", current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required.",
+        )
+    return current_user
 
 
 __all__ = [
     "authenticate_user",
+    "authenticate_user_async",
+    "bearer_token",
     "create_access_token",
+    "create_refresh_token",
+    "decode_token",
+    "get_current_admin",
     "get_current_user",
+    "get_current_user_async",
     "get_password_hash",
+    "request_token_claims",
+    "revoke_token_claims",
     "verify_password",
 ]
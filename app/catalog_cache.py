@@ -0,0 +1,166 @@
+"""Process-local cache of encoded bike catalog pages.
+
+``GET /api/bikes`` answers from here when the inventory has not changed,
+returning the JSON bytes it encoded last time without validating models or
+opening a database connection, and compressing them once per encoding.
+Pages are keyed by their query parameters and belong to an inventory
+``version``: bikes added, changed or deleted through the ORM bump the
+version on commit, which drops every page. Writes made by other worker
+processes, and a read replica catching up, are not seen, so pages also
+expire after ``CATALOG_CACHE_TTL_SECONDS``. Callers that ``get_read_db``
+keeps on the primary after a write bypass the cache, so they never get a
+page read from a replica that has not caught up with them. Set
+``CATALOG_CACHE_ENABLED=false`` to build every page from the database.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.compression import compress
+from app.models.bike import Bike
+
+CATALOG_CACHE_ENABLED = os.getenv("CATALOG_CACHE_ENABLED", "true").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "256"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+
+_PENDING_KEY = "catalog_cache_pending"
+
+
+class CatalogPage(NamedTuple):
+    """One encoded catalog page and the inventory version it was read at.
+
+    ``compressed`` holds the body per content encoding, filled on first use,
+    so a page is compressed once per inventory version rather than per
+    request.
+    """
+
+    body: bytes
+    next_cursor: str | None
+    version: int
+    compressed: dict[str, bytes]
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return the body compressed with ``encoding``."""
+        body = self.compressed.get(encoding)
+        if body is None:
+            body = self.compressed[encoding] = compress(self.body, encoding)
+        return body
+
+
+class CatalogCache:
+    """Bounded LRU of query key -> ``CatalogPage`` for the current version."""
+
+    def __init__(
+        self,
+        max_size: int = CATALOG_CACHE_SIZE,
+        ttl_seconds: float = CATALOG_CACHE_TTL_SECONDS,
+        enabled: bool = CATALOG_CACHE_ENABLED,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = enabled
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries: OrderedDict[Hashable, tuple[CatalogPage, float]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever committed bike writes change the catalog.
+
+        Read it before querying the database and pass it to ``put``.
+        """
+        return self._version
+
+    def get(self, key: Hashable) -> CatalogPage | None:
+        """Return the cached page for a key, or None on a miss or expiry."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            page, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return page
+
+    def put(self, key: Hashable, page: CatalogPage) -> None:
+        """Cache a page unless the inventory changed while it was being read."""
+        if not self.enabled or self._max_size <= 0:
+            return
+        with self._lock:
+            if page.version != self._version:
+                return
+            self._entries[key] = (page, self._clock() + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Start a new inventory version, dropping every cached page."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def clear(self) -> None:
+        """Drop every cached page."""
+        with self._lock:
+            self._entries.clear()
+
+
+catalog_cache = CatalogCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_bike_writes(session: Session, _flush_context: object) -> None:
+    """Note whether this flush touched any bike."""
+    if any(
+        isinstance(obj, Bike)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_bike_writes(session: Session) -> None:
+    """Invalidate the catalog once bike writes are committed."""
+    if session.info.pop(_PENDING_KEY, False):
+        catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bike_writes(session: Session) -> None:
+    """Invalidate anyway; a rolled-back savepoint may leave earlier writes."""
+    if session.info.pop(_PENDING_KEY, False):
+        catalog_cache.invalidate()
+
+
+__all__ = [
+    "CATALOG_CACHE_ENABLED",
+    "CATALOG_CACHE_SIZE",
+    "CATALOG_CACHE_TTL_SECONDS",
+    "CatalogCache",
+    "CatalogPage",
+    "catalog_cache",
+]
@@ -0,0 +1,160 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+``CompressionMiddleware`` compresses responses of at least
+``COMPRESSION_MINIMUM_SIZE`` bytes with brotli or gzip, whichever the client
+prefers (brotli on a tie), and leaves alone responses that are already
+encoded or whose media type does not compress. Brotli is optional: without
+the ``brotli`` package only gzip is offered.
+
+Routes serving hot, rarely changing bodies can compress them once and set
+``Content-Encoding`` themselves; ``negotiate_encoding`` and ``compress`` are
+shared for that (see ``GET /api/bikes``, which keeps each catalog page's
+compressed variants alongside its cached bytes).
+"""
+from __future__ import annotations
+
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli
+    brotli = None
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Preferred first when the client weighs encodings equally.
+SUPPORTED_ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli else ("gzip",)
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def negotiate_encoding(
+    accept_encoding: str, supported: tuple[str, ...] = SUPPORTED_ENCODINGS
+) -> str | None:
+    """Return the supported encoding the client weighs highest, if any."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(
+    body: bytes,
+    encoding: str,
+    *,
+    gzip_level: int = COMPRESSION_GZIP_LEVEL,
+    brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+) -> bytes:
+    """Compress ``body`` with a ``SUPPORTED_ENCODINGS`` encoding."""
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f"unsupported content encoding: {encoding}")
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing large responses.
+
+    The body is buffered before compressing, so this suits the API's JSON
+    responses rather than long-lived streams.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        chunks: list[bytes] = []
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                media_type = headers.get("content-type", "")
+                if "content-encoding" in headers or not media_type.startswith(
+                    _COMPRESSIBLE_TYPES
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start)
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.minimum_size:
+                body = compress(
+                    body,
+                    encoding,
+                    gzip_level=self.gzip_level,
+                    brotli_quality=self.brotli_quality,
+                )
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+__all__ = [
+    "COMPRESSION_BROTLI_QUALITY",
+    "COMPRESSION_GZIP_LEVEL",
+    "COMPRESSION_MINIMUM_SIZE",
+    "CompressionMiddleware",
+    "SUPPORTED_ENCODINGS",
+    "compress",
+    "negotiate_encoding",
+]
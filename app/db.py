@@ -1,12 +1,37 @@
-"""Database configuration and session management utilities."""
+"""Database configuration and session management utilities.
+
+Routes use the asyncio engine through ``get_async_db``, or
+``get_async_write_db`` when they write. The sync engine and ``get_db`` remain
+for Alembic, the admin routes and the middleware and caches that load through
+sync sessions. Both engines point at the same database; with
+``SQLITE_PROFILE=tuned`` both apply the pragmas in ``app.sqlite_profile``.
+
+When ``DATABASE_READ_URL`` names a replica, read-only routes use
+``get_read_db``, which serves them from a third, asyncio engine on the
+replica except for callers who have just written (see ``app.read_replica``).
+"""
 from __future__ import annotations
 
 import os
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator
 
 from dotenv import load_dotenv
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import Pool
+
+from app.pool_metrics import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.query_metrics import instrument_engine
+from app.read_replica import RecentWriters
+from app.sqlite_profile import WriterLock, apply_pragmas, is_tunable, tuned_pragmas
 
 # Load environment variables early so DATABASE_URL is available.
 load_dotenv()
@@ -23,17 +48,125 @@ def _sqlite_connect_args(database_url: str) -> dict[str, bool]:
     return {}
 
 
+# asyncio drivers substituted for the sync ones in DATABASE_URL.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def _async_database_url(database_url: str) -> str:
+    """Return ``database_url`` with its driver swapped for an asyncio one."""
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None or url.get_driver_name() == driver:
+        return database_url
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(
+    DATABASE_URL
+)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+READ_AFTER_WRITE_SECONDS = float(os.getenv("READ_AFTER_WRITE_SECONDS", "5"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "10"))
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in {"1", "true", "yes"}
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "default").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024)))
+
+
+def _pool_args(
+    database_url: str | URL, poolclass: type[Pool] = TimedQueuePool
+) -> dict[str, Any]:
+    """Return pool settings for the engine from the ``DB_POOL_*`` variables.
+
+    In-memory SQLite keeps SQLAlchemy's single shared connection, since a
+    pool of separate connections would each see an empty database.
+    """
+    args: dict[str, Any] = {
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return args
+    args.update(
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return args
+
 
 engine = create_engine(
     DATABASE_URL,
     echo=False,
     future=True,
     connect_args=_sqlite_connect_args(DATABASE_URL),
+    **_pool_args(DATABASE_URL),
 )
+PoolMetrics("primary").attach(engine)
+instrument_engine(engine, SLOW_QUERY_MS / 1000)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    connect_args=_sqlite_connect_args(ASYNC_DATABASE_URL),
+    **_pool_args(ASYNC_DATABASE_URL, TimedAsyncAdaptedQueuePool),
+)
+PoolMetrics("primary-async").attach(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, SLOW_QUERY_MS / 1000)
+
+# Serializes writing requests in this process; None unless SQLite is tuned.
+sqlite_writer_lock: WriterLock | None = None
+_tuned = tuned_pragmas(SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE)
+if SQLITE_PROFILE == "tuned" and is_tunable(DATABASE_URL):
+    apply_pragmas(engine, _tuned)
+    apply_pragmas(async_engine.sync_engine, _tuned)
+    sqlite_writer_lock = WriterLock()
+
+# Attributes stay loaded after commit: lazy refreshes cannot run implicitly
+# under asyncio.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# The replica, when configured; None sends every read to the primary.
+read_async_engine: AsyncEngine | None = None
+AsyncReadSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if DATABASE_READ_URL is not None:
+    _async_read_url = _async_database_url(DATABASE_READ_URL)
+    read_async_engine = create_async_engine(
+        _async_read_url,
+        echo=False,
+        connect_args=_sqlite_connect_args(_async_read_url),
+        **_pool_args(_async_read_url, TimedAsyncAdaptedQueuePool),
+    )
+    PoolMetrics("replica-async").attach(read_async_engine.sync_engine)
+    instrument_engine(read_async_engine.sync_engine, SLOW_QUERY_MS / 1000)
+    if SQLITE_PROFILE == "tuned" and is_tunable(_async_read_url):
+        apply_pragmas(read_async_engine.sync_engine, _tuned)
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=read_async_engine, autoflush=False, expire_on_commit=False
+    )
+
+recent_writers = RecentWriters(READ_AFTER_WRITE_SECONDS)
+
 
 def get_db() -> Generator[Session, None, None]:
     """Yield a SQLAlchemy session scoped to the request lifecycle."""
@@ -42,3 +175,65 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an ``AsyncSession`` scoped to the request lifecycle."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_write_db(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """``get_async_db`` for routes that write.
+
+    On tuned SQLite the session holds ``sqlite_writer_lock`` until it is
+    closed, so concurrent writers queue here instead of on the database lock.
+    With a replica configured, the caller's reads then stay on the primary
+    for ``READ_AFTER_WRITE_SECONDS``.
+    """
+    writer_lock = sqlite_writer_lock
+    try:
+        if writer_lock is None:
+            yield db
+            return
+        async with writer_lock:
+            try:
+                yield db
+            finally:
+                # Give the connection back before the next writer starts.
+                await db.close()
+    finally:
+        if AsyncReadSessionLocal is not None:
+            recent_writers.mark(request.scope)
+
+
+def reads_own_writes(request: Request) -> bool:
+    """Return True when a replica is configured but this caller is on the primary.
+
+    Such callers wrote within ``READ_AFTER_WRITE_SECONDS``; caches filled from
+    replica reads may not hold their write yet.
+    """
+    return AsyncReadSessionLocal is not None and recent_writers.is_sticky(
+        request.scope
+    )
+
+
+async def get_read_db(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session for read-only routes.
+
+    The session is on the replica unless none is configured or the caller
+    wrote within ``READ_AFTER_WRITE_SECONDS``, in which case it is the
+    request's primary session.
+    """
+    session_factory = AsyncReadSessionLocal
+    if session_factory is None or recent_writers.is_sticky(request.scope):
+        yield db
+        return
+    async with session_factory() as replica:
+        yield replica
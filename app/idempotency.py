@@ -0,0 +1,368 @@
+"""Idempotency-Key support for retried write requests.
+
+``IdempotencyMiddleware`` is a pure ASGI middleware placed in front of the
+routers. For ``POST`` requests to the configured paths that carry an
+``Idempotency-Key`` header and a valid, unrevoked bearer token, it stores a
+fingerprint of the request and the serialized response. Retries with the same
+key are answered from that store before validation, pricing, or database
+writes run again; concurrent duplicates wait for the first in-flight request
+to finish. The in-flight claim is a short lease that is renewed while the
+request runs, and only the claim's holder can store or release its outcome.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from jose import JWTError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import bearer_token, request_token_claims
+from app.db import SessionLocal
+from app.repositories import idempotency_repo
+from app.revocation import revocation_filter
+
+logger = logging.getLogger("app.idempotency")
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+
+_MAX_KEY_LENGTH = 255
+_IN_FLIGHT_LEASE = timedelta(seconds=60)
+_WAIT_SECONDS = 10.0
+_POLL_SECONDS = 0.05
+_PURGE_INTERVAL_SECONDS = 300.0
+
+
+class _Claim(NamedTuple):
+    """Snapshot of an idempotency record taken when claiming a key."""
+
+    record_id: int
+    claimed: bool
+    claim_token: str | None
+    fingerprint: str
+    status_code: int | None
+    content_type: str | None
+    response_body: bytes | None
+
+
+class _Principal(NamedTuple):
+    """The verified bearer token's subject and revocable ``jti``."""
+
+    subject: str
+    token_id: str | None
+
+
+def _principal(scope: Scope, headers: Headers) -> _Principal | None:
+    """Return the bearer token principal, or None when it cannot be verified."""
+    token = bearer_token(headers)
+    if token is None:
+        return None
+    try:
+        payload = request_token_claims(scope, token)
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    if subject is None:
+        return None
+    token_id = payload.get("jti")
+    return _Principal(str(subject), token_id if isinstance(token_id, str) else None)
+
+
+def _error_body(code: str, message: str) -> bytes:
+    return json.dumps({"error": {"code": code, "message": message}}).encode("utf-8")
+
+
+async def _send_response(
+    send: Send,
+    status_code: int,
+    body: bytes,
+    content_type: str | None = "application/json",
+    extra_headers: Iterable[tuple[bytes, bytes]] = (),
+) -> None:
+    headers = [(b"content-length", str(len(body)).encode("latin-1"))]
+    if content_type:
+        headers.append((b"content-type", content_type.encode("latin-1")))
+    headers.extend(extra_headers)
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for repeated ``Idempotency-Key`` requests."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: Iterable[str],
+        session_factory: Callable[[], Session] = SessionLocal,
+        ttl: timedelta = timedelta(hours=IDEMPOTENCY_TTL_HOURS),
+        wait_seconds: float = _WAIT_SECONDS,
+        lease: timedelta = _IN_FLIGHT_LEASE,
+    ) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self.lease = lease
+        self._last_purge = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        principal = None
+        if key is not None:
+            principal = await self._authenticate(scope, headers)
+        if key is None or principal is None:
+            # Unauthenticated requests fall through and are rejected downstream.
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > _MAX_KEY_LENGTH:
+            await _send_response(
+                send,
+                400,
+                _error_body(
+                    "INVALID_IDEMPOTENCY_KEY",
+                    f"{IDEMPOTENCY_HEADER} must be 1-{_MAX_KEY_LENGTH} characters.",
+                ),
+            )
+            return
+
+        body = await self._read_body(receive)
+        record_scope = f"{principal}:{scope['method']}:{scope['path']}"
+        digest = hashlib.sha256(scope.get("query_string", b""))
+        digest.update(b"\0")
+        digest.update(body)
+        fingerprint = digest.hexdigest()
+
+        await self._maybe_purge()
+        claim = await self._claim_or_replay(send, record_scope, key, fingerprint)
+        if claim is None:
+            return
+        await self._run_and_store(scope, body, send, claim)
+
+    async def _authenticate(self, scope: Scope, headers: Headers) -> str | None:
+        """Return the caller's subject, or None for missing or revoked tokens.
+
+        A revoked token must not replay the response stored for its key, so
+        it is treated like no token and rejected downstream.
+        """
+        principal = _principal(scope, headers)
+        if principal is None:
+            return None
+        if principal.token_id is not None and await run_in_threadpool(
+            self._is_revoked, principal.token_id
+        ):
+            return None
+        return principal.subject
+
+    def _is_revoked(self, token_id: str) -> bool:
+        with self.session_factory() as db:
+            return revocation_filter.is_revoked(db, token_id)
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks: list[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _claim_or_replay(
+        self, send: Send, record_scope: str, key: str, fingerprint: str
+    ) -> _Claim | None:
+        """Return this request's claim, or None once a response has been sent."""
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            claim = await run_in_threadpool(self._claim, record_scope, key, fingerprint)
+            if claim.claimed:
+                return claim
+            if claim.fingerprint != fingerprint:
+                await _send_response(
+                    send,
+                    422,
+                    _error_body(
+                        "IDEMPOTENCY_KEY_REUSED",
+                        "Idempotency-Key was already used with a different request.",
+                    ),
+                )
+                return None
+            if claim.status_code is not None:
+                await _send_response(
+                    send,
+                    claim.status_code,
+                    claim.response_body or b"",
+                    claim.content_type,
+                    [(REPLAYED_HEADER.lower().encode("latin-1"), b"true")],
+                )
+                return None
+            if time.monotonic() >= deadline:
+                await _send_response(
+                    send,
+                    409,
+                    _error_body(
+                        "IDEMPOTENCY_IN_PROGRESS",
+                        "A request with this Idempotency-Key is still in progress.",
+                    ),
+                )
+                return None
+            await asyncio.sleep(_POLL_SECONDS)
+
+    def _claim(self, record_scope: str, key: str, fingerprint: str) -> _Claim:
+        now = datetime.now(tz=timezone.utc)
+        with self.session_factory() as db:
+            record, claimed = idempotency_repo.claim_key(
+                db, record_scope, key, fingerprint, now, now + self.lease
+            )
+            return _Claim(
+                record.id,
+                claimed,
+                record.claim_token,
+                record.fingerprint,
+                record.status_code,
+                record.content_type,
+                record.response_body,
+            )
+
+    async def _run_and_store(
+        self, scope: Scope, body: bytes, send: Send, claim: _Claim
+    ) -> None:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        status_code = 500
+        content_type: str | None = None
+        chunks: list[bytes] = []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get(
+                    "content-type"
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        renewal = asyncio.create_task(self._keep_lease(claim))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await self._stop_renewal(renewal)
+            await run_in_threadpool(self._release, claim)
+            raise
+        await self._stop_renewal(renewal)
+
+        if status_code >= 500:
+            # Server errors are not final; let the client retry with the same key.
+            await run_in_threadpool(self._release, claim)
+            return
+        await run_in_threadpool(
+            self._complete, claim, status_code, content_type, b"".join(chunks)
+        )
+
+    async def _keep_lease(self, claim: _Claim) -> None:
+        """Renew the in-flight lease until cancelled or the claim is lost.
+
+        Without this a request outliving the lease could be claimed again
+        and run twice by a concurrent retry.
+        """
+        interval = self.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await run_in_threadpool(self._renew, claim):
+                logger.warning(
+                    "Idempotency record %s lost its in-flight claim.", claim.record_id
+                )
+                return
+
+    async def _stop_renewal(self, renewal: asyncio.Task[None]) -> None:
+        renewal.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await renewal
+
+    def _renew(self, claim: _Claim) -> bool:
+        lease_expires_at = datetime.now(tz=timezone.utc) + self.lease
+        with self.session_factory() as db:
+            return idempotency_repo.renew_key(
+                db, claim.record_id, claim.claim_token, lease_expires_at
+            )
+
+    def _complete(
+        self,
+        claim: _Claim,
+        status_code: int,
+        content_type: str | None,
+        response_body: bytes,
+    ) -> None:
+        expires_at = datetime.now(tz=timezone.utc) + self.ttl
+        with self.session_factory() as db:
+            stored = idempotency_repo.complete_key(
+                db,
+                claim.record_id,
+                claim.claim_token,
+                status_code,
+                content_type,
+                response_body,
+                expires_at,
+            )
+        if not stored:
+            logger.warning(
+                "Idempotency record %s was claimed by another request; "
+                "its response was not stored.",
+                claim.record_id,
+            )
+
+    def _release(self, claim: _Claim) -> None:
+        with self.session_factory() as db:
+            idempotency_repo.release_key(db, claim.record_id, claim.claim_token)
+
+    async def _maybe_purge(self) -> None:
+        """Evict expired records at most once per purge interval per process."""
+        now = time.monotonic()
+        if now - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        removed = await run_in_threadpool(self._purge)
+        if removed:
+            logger.info("Evicted %s expired idempotency records.", removed)
+
+    def _purge(self) -> int:
+        with self.session_factory() as db:
+            return idempotency_repo.purge_expired(db, datetime.now(tz=timezone.utc))
+
+
+__all__ = ["IDEMPOTENCY_HEADER", "IdempotencyMiddleware", "REPLAYED_HEADER"]
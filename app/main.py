@@ -2,17 +2,29 @@
 from __future__ import annotations
 
 import logging
+import os
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 
-from app.rate_limiter import limiter
+from app.compression import CompressionMiddleware
+from app.db import (
+    QUERY_REPEAT_THRESHOLD,
+    SERVER_TIMING,
+    async_engine,
+    read_async_engine,
+)
+from app.idempotency import IDEMPOTENCY_HEADER, IdempotencyMiddleware
+from app.password_hasher import password_hasher
+from app.query_metrics import QueryMetricsMiddleware
+from app.rate_limit_tiers import TieredRateLimitMiddleware
+from app.rate_limiter import RateLimitMiddleware, limiter
 from app.routers import auth as auth_router
-from app.routers import bikes, payments, rentals
+from app.routers import bikes, internal, payments, quotes, rentals
 
 # Configure logging early so security events are captured.
 logging.basicConfig(level=logging.INFO)
@@ -20,7 +32,39 @@ logging.basicConfig(level=logging.INFO)
 # Load environment variables from a .env file if present.
 load_dotenv()
 
-app = FastAPI(title="Personal Transport API")
+ORJSON_RESPONSES = os.getenv("ORJSON_RESPONSES", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+
+def _default_response_class() -> type[JSONResponse]:
+    """Render route results with orjson when ``ORJSON_RESPONSES`` is on."""
+    if not ORJSON_RESPONSES:
+        return JSONResponse
+    try:
+        import orjson  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError(
+            "ORJSON_RESPONSES is enabled but orjson is not installed"
+        ) from exc
+    return ORJSONResponse
+
+
+app = FastAPI(
+    title="Personal Transport API", default_response_class=_default_response_class()
+)
+
+# Innermost middleware: replays retried writes after CORS and rate limiting.
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=["/api/rentals", "/api/rentals/batch", "/api/payments"],
+)
+
+# Per-user read/write token buckets; decodes the bearer token once for the
+# idempotency middleware and ``get_current_user`` to reuse.
+app.add_middleware(TieredRateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,19 +73,47 @@ app.add_middleware(
         "http://localhost:5173",
     ],
     allow_methods=["GET", "POST", "PATCH"],
-    allow_headers=["Authorization", "Content-Type"],
+    allow_headers=["Authorization", "Content-Type", IDEMPOTENCY_HEADER],
+    expose_headers=[bikes.NEXT_CURSOR_HEADER],
 )
 
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+# Compresses what the middleware above returns, so idempotent replays are
+# stored uncompressed and the query metrics still time the whole request.
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so queries made by the other middleware count towards the request.
+app.add_middleware(
+    QueryMetricsMiddleware,
+    server_timing=SERVER_TIMING,
+    repeat_threshold=QUERY_REPEAT_THRESHOLD,
+)
 
 app.include_router(auth_router.router)
 app.include_router(bikes.router)
+app.include_router(internal.router)
 app.include_router(payments.router)
+app.include_router(quotes.router)
 app.include_router(rentals.router)
 
 
+@app.on_event("shutdown")
+def shutdown_password_hasher() -> None:
+    """Stop the bcrypt worker processes with the server."""
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    """Close pooled asyncio connections and their driver threads."""
+    await async_engine.dispose()
+    if read_async_engine is not None:
+        await read_async_engine.dispose()
+
+
 @app.get("/health", tags=["system"])
 async def health_check() -> dict[str, str]:
     """Simple health check endpoint used by monitoring and smoke tests."""
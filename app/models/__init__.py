@@ -3,7 +3,20 @@
 from app.db import Base
 
 from .bike import AvailabilityStatus, Bike
+from .idempotency import IdempotencyRecord
+from .pricing_rule import DayKind, PricingRule
 from .rental import Rental
+from .revoked_token import RevokedToken
 from .user import User
 
-__all__ = ["Base", "AvailabilityStatus", "Bike", "Rental", "User"]
+__all__ = [
+    "Base",
+    "AvailabilityStatus",
+    "Bike",
+    "DayKind",
+    "IdempotencyRecord",
+    "PricingRule",
+    "Rental",
+    "RevokedToken",
+    "User",
+]
@@ -4,7 +4,7 @@ from __future__ import annotations
 from enum import Enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Enum as SqlEnum, Integer, String
+from sqlalchemy import Enum as SqlEnum, Float, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
@@ -24,6 +24,24 @@ class Bike(Base):
     """Bike available for rental."""
 
     __tablename__ = "bikes"
+    __table_args__ = (
+        # Partial indexes over the available fleet serve the sorted catalog
+        # pages; other dialects get plain indexes.
+        Index(
+            "ix_bikes_available_rate_per_day_cents_id",
+            "rate_per_day_cents",
+            "id",
+            sqlite_where=text("availability_status = 'available'"),
+            postgresql_where=text("availability_status = 'available'"),
+        ),
+        Index(
+            "ix_bikes_available_name_id",
+            "name",
+            "id",
+            sqlite_where=text("availability_status = 'available'"),
+            postgresql_where=text("availability_status = 'available'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -37,5 +55,11 @@ class Bike(Base):
         ),
         nullable=False,
     )
+    lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    lng: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Bumped on every write (including bookings) for optimistic concurrency.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
 
     rentals: Mapped[list["Rental"]] = relationship("Rental", back_populates="bike")
+
+    __mapper_args__ = {"version_id_col": version}
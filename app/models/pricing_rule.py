@@ -0,0 +1,49 @@
+"""Pricing rule model definitions."""
+from __future__ import annotations
+
+from enum import Enum
+
+from sqlalchemy import Enum as SqlEnum, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class DayKind(str, Enum):
+    """Days of the week a pricing rule applies to."""
+
+    ALL = "all"
+    WEEKDAY = "weekday"
+    WEEKEND = "weekend"
+
+
+class PricingRule(Base):
+    """Adjustment applied to a bike's daily rate when quoting.
+
+    Every matching rule multiplies the daily rate by ``multiplier_percent`` /
+    100 and then adds ``surcharge_cents``. A rule without ``bike_type`` applies
+    to every bike.
+    """
+
+    __tablename__ = "pricing_rules"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    bike_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    day_kind: Mapped[DayKind] = mapped_column(
+        SqlEnum(
+            DayKind,
+            name="pricing_day_kind",
+            values_callable=lambda enum: [member.value for member in enum],
+        ),
+        nullable=False,
+        default=DayKind.ALL,
+    )
+    multiplier_percent: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=100
+    )
+    surcharge_cents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Bumped on every write; the rule cache compares a digest of versions.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Date, DateTime, ForeignKey, Integer
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -19,6 +19,17 @@ class Rental(Base):
     """Rental record connecting users and bikes."""
 
     __tablename__ = "rentals"
+    __table_args__ = (
+        # Serves per-bike date overlap checks and the availability anti-join.
+        Index(
+            "ix_rentals_bike_id_start_date_end_date",
+            "bike_id",
+            "start_date",
+            "end_date",
+        ),
+        # Serves the per-user rental history, newest first.
+        Index("ix_rentals_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     bike_id: Mapped[int] = mapped_column(ForeignKey("bikes.id"), nullable=False)
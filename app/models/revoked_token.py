@@ -0,0 +1,31 @@
+"""Revoked token model definitions."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db import Base
+
+
+class RevokedToken(Base):
+    """JWT id (``jti``) that must no longer be accepted.
+
+    Rows are only needed until ``expires_at``, when the token would be
+    rejected anyway. The autoincrement ``id`` is the high-water mark workers
+    use to mirror new revocations incrementally.
+    """
+
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (Index("ix_revoked_tokens_expires_at", "expires_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    jti: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
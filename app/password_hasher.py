@@ -0,0 +1,163 @@
+"""Bounded process pool for bcrypt password hashing and verification.
+
+bcrypt deliberately burns 100-300 ms of CPU per call. Running it on the
+request threadpool lets a burst of logins starve every other route, so
+``PasswordHasher`` hands the work to a small pool of low-priority worker
+processes instead. At most ``PASSWORD_HASH_WORKERS`` hashes run at once and
+at most ``PASSWORD_HASH_QUEUE_SIZE`` more may wait; beyond that callers get
+``HashingQueueFull`` immediately so routes can shed load with a fast 503.
+Bulk imports use ``hash_many``, which sends small batches and waits for
+capacity rather than shedding, keeping at most one batch per worker queued so
+logins still get a turn between batches.
+
+This module only imports passlib so spawned workers start quickly.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypeVar
+
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+
+# Passwords per pool task in ``hash_many``: large enough to amortise the
+# inter-process round trip, small enough that a login never waits long.
+_BULK_BATCH_SIZE = 8
+
+# Workers yield the CPU to request handling when the host is saturated.
+_WORKER_NICENESS = 5
+
+_T = TypeVar("_T")
+
+
+class HashingQueueFull(RuntimeError):
+    """Raised when the hashing pool already has its maximum pending work."""
+
+
+def hash_password(password: str) -> str:
+    """Hash a plaintext password for storage."""
+    return pwd_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Validate a plaintext password against a stored hash."""
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except ValueError:
+        return False
+
+
+def hash_passwords(passwords: Sequence[str]) -> list[str]:
+    """Hash several plaintext passwords, preserving order."""
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def _lower_worker_priority() -> None:
+    if hasattr(os, "nice"):
+        os.nice(_WORKER_NICENESS)
+
+
+class PasswordHasher:
+    """Run password hashing in a bounded pool of worker processes."""
+
+    def __init__(
+        self,
+        max_workers: int = PASSWORD_HASH_WORKERS,
+        queue_size: int = PASSWORD_HASH_QUEUE_SIZE,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_size < 0:
+            raise ValueError("queue_size must be zero or greater")
+        self._max_workers = max_workers
+        self._max_pending = max_workers + queue_size
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of hashing calls running or waiting in the pool."""
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """Hash a plaintext password in the pool."""
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Check a plaintext password against a stored hash in the pool."""
+        return await self._submit(check_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: Sequence[str]) -> list[str]:
+        """Hash many passwords across the pool, preserving order.
+
+        Unlike ``hash`` this never raises ``HashingQueueFull``; it is meant for
+        administrative bulk work that should wait rather than be shed.
+        """
+        batches = [
+            list(passwords[start : start + _BULK_BATCH_SIZE])
+            for start in range(0, len(passwords), _BULK_BATCH_SIZE)
+        ]
+        in_flight = asyncio.Semaphore(self._max_workers)
+
+        async def run(batch: list[str]) -> list[str]:
+            async with in_flight:
+                return await self._submit(hash_passwords, batch, shed=False)
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [hashed for batch in results for hashed in batch]
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later call starts a fresh pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _submit(
+        self, func: Callable[..., _T], *args: object, shed: bool = True
+    ) -> _T:
+        with self._lock:
+            if shed and self._pending >= self._max_pending:
+                raise HashingQueueFull("password hashing queue is full")
+            if self._executor is None:
+                # Spawn rather than fork: the server process runs threads.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_lower_worker_priority,
+                )
+            executor = self._executor
+            self._pending += 1
+        try:
+            return await asyncio.wrap_future(executor.submit(func, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+password_hasher = PasswordHasher()
+
+
+__all__ = [
+    "HashingQueueFull",
+    "PASSWORD_HASH_QUEUE_SIZE",
+    "PASSWORD_HASH_WORKERS",
+    "PasswordHasher",
+    "check_password",
+    "hash_password",
+    "hash_passwords",
+    "password_hasher",
+    "pwd_context",
+]
@@ -0,0 +1,176 @@
+"""Connection pool telemetry for sizing pools per worker.
+
+``TimedQueuePool`` (and ``TimedAsyncAdaptedQueuePool`` for the asyncio
+engine) is SQLAlchemy's queue pool with the time spent waiting for a
+connection measured, since the pool events only fire once a connection
+has been handed out. The wait includes opening a new connection and the
+pre-ping, when enabled. ``PoolMetrics.attach`` adds the event listeners that
+count checkouts, connections in use and invalidations, and registers the
+engine under a name for ``GET /internal/metrics/pool``.
+
+Counters are per process: each worker reports its own pool.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    Pool,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets.
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """Checkout and usage counters for one engine's connection pool."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._engine: Engine | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_timeouts = 0
+            self.connections_opened = 0
+            self.invalidations = 0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.wait_buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS) + 1)
+
+    def attach(self, engine: Engine) -> PoolMetrics:
+        """Listen to ``engine``'s pool events and register it by name."""
+        self._engine = engine
+        engine.pool.metrics = self
+        # Pool listeners are carried over when ``dispose`` recreates the pool.
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        pool_metrics[self.name] = self
+        return self
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bisect.bisect_left(CHECKOUT_WAIT_BUCKETS, seconds)] += 1
+
+    def _on_connect(self, _dbapi_connection: Any, _record: Any) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def _on_checkout(self, _dbapi_connection: Any, _record: Any, _proxy: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, _dbapi_connection: Any, _record: Any) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def _on_invalidate(self, _dbapi_connection: Any, _record: Any, _exc: Any) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the counters plus the pool's current size and overflow."""
+        pool = self._engine.pool if self._engine is not None else None
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(
+                (*map(str, CHECKOUT_WAIT_BUCKETS), "+Inf"), self.wait_buckets
+            ):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {
+                "name": self.name,
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "size": _gauge(pool, "size"),
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "timeout": getattr(pool, "_timeout", None),
+                "checked_out": _gauge(pool, "checkedout"),
+                "checked_in": _gauge(pool, "checkedin"),
+                # QueuePool counts unopened core slots as negative overflow.
+                "overflow": max(0, _gauge(pool, "overflow") or 0),
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connections_opened": self.connections_opened,
+                "invalidations": self.invalidations,
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "total_seconds": self.wait_total,
+                    "max_seconds": self.wait_max,
+                    "buckets": buckets,
+                },
+            }
+
+
+def _gauge(pool: Pool | None, method: str) -> int | None:
+    # Only QueuePool and its subclasses report sizes.
+    reader = getattr(pool, method, None)
+    return reader() if callable(reader) else None
+
+
+class _TimedCheckout:
+    """Pool mixin reporting checkout wait time to its ``PoolMetrics``."""
+
+    metrics: PoolMetrics | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self) -> Pool:
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """``QueuePool`` with checkout wait timing."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` with checkout wait timing."""
+
+
+pool_metrics: dict[str, PoolMetrics] = {}
+
+__all__ = [
+    "CHECKOUT_WAIT_BUCKETS",
+    "PoolMetrics",
+    "TimedAsyncAdaptedQueuePool",
+    "TimedQueuePool",
+    "pool_metrics",
+]
@@ -0,0 +1,172 @@
+"""Per-request SQL statement counts and timings.
+
+``instrument_engine`` times every statement an engine sends to the database
+and adds it to the ``QueryStats`` of the code running it, found through a
+context variable. ``QueryMetricsMiddleware`` opens one per request, reports
+it in a ``Server-Timing`` header and warns when the same statement runs
+often enough to suggest an N+1 query. Statements slower than the engine's
+threshold are logged as they finish, with their parameters redacted.
+
+Context variables follow the request into the threadpool and into the
+greenlets SQLAlchemy's asyncio layer runs its events in, so sync and async
+routes are both attributed. Tests use ``track_queries`` directly (see the
+``query_budget`` fixture).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.query_metrics")
+
+_STARTED_KEY = "query_metrics_started"
+
+
+class QueryStats:
+    """Statements run, and the time spent in them, within one scope."""
+
+    __slots__ = ("count", "total_seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Return statements that ran at least ``threshold`` times."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Return the stats statements are currently attributed to, if any."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Attribute statements run in this context to a fresh ``QueryStats``."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _redacted(parameters: Any, executemany: bool) -> str:
+    if executemany:
+        return f"{len(parameters)} parameter sets redacted"
+    return f"{len(parameters or ())} parameters redacted"
+
+
+def instrument_engine(engine: Engine, slow_query_seconds: float) -> None:
+    """Time ``engine``'s statements and log those slower than the threshold.
+
+    Pass ``AsyncEngine.sync_engine`` for asyncio engines.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(connection, _cursor, _statement, _parameters, _context, _many):
+        connection.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(connection, _cursor, statement, parameters, _context, many):
+        elapsed = time.perf_counter() - connection.info[_STARTED_KEY].pop()
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed >= slow_query_seconds:
+            logger.warning(
+                "Slow query (%.1f ms, %s): %s",
+                elapsed * 1e3,
+                _redacted(parameters, many),
+                statement,
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context) -> None:
+        # The statement raised, so ``after_cursor_execute`` will not pop it.
+        connection = context.connection
+        started = connection.info.get(_STARTED_KEY) if connection is not None else None
+        if started:
+            started.pop()
+
+
+class QueryMetricsMiddleware:
+    """Pure ASGI middleware reporting each request's database time."""
+
+    def __init__(
+        self, app: ASGIApp, server_timing: bool = True, repeat_threshold: int = 10
+    ) -> None:
+        self.app = app
+        self.server_timing = server_timing
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'db;dur={stats.total_seconds * 1e3:.1f};'
+                        f'desc="{stats.count} queries"',
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        # FastAPI leaves the matched route in the scope.
+        route = getattr(scope.get("route"), "path", scope["path"])
+        for statement, count in stats.repeated(self.repeat_threshold):
+            logger.warning(
+                "Possible N+1 query in %s %s: ran %d times: %s",
+                scope["method"],
+                route,
+                count,
+                statement,
+            )
+        logger.debug(
+            "%s %s ran %d queries in %.1f ms",
+            scope["method"],
+            route,
+            stats.count,
+            stats.total_seconds * 1e3,
+        )
+
+
+__all__ = [
+    "QueryMetricsMiddleware",
+    "QueryStats",
+    "current_query_stats",
+    "instrument_engine",
+    "track_queries",
+]
@@ -0,0 +1,514 @@
+"""Rate limit storages shared by every worker process.
+
+slowapi's default ``memory://`` storage keeps counters per process, so with N
+workers each limit is effectively N times looser. The storages here plug into
+the ``limits`` registry by URI scheme, so ``RATE_LIMIT_STORAGE_URI`` selects
+them without code changes:
+
+* ``sqlite:///path/to/limits.db`` shares counters between processes on one
+  host through a WAL-mode SQLite file. Each increment is one atomic upsert.
+* ``resp://host:port/db`` shares counters across hosts through any server
+  that speaks the Redis protocol (RESP2). It needs no client library; each
+  operation is a single pipelined round trip.
+
+Both support the fixed-window and sliding-window-counter strategies. The
+sliding window is two fixed-window counters, weighted like ``limits``' own
+storages: an increment that turns out to overshoot because of a concurrent
+hit is reverted, so counters never admit more than the limit.
+
+Each storage, plus ``MemoryTokenBuckets`` for ``memory://``, also provides
+``consume_token`` for the per-user tiers in ``app.rate_limit_tiers``. It is a
+token bucket in its GCRA form: a bucket is a single "theoretical arrival
+time", updated atomically per request.
+"""
+from __future__ import annotations
+
+import math
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from typing import Any
+
+from limits.errors import ConfigurationError
+from limits.storage import Storage, storage_from_string
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+_DEFAULT_RESP_PORT = 6379
+_DEFAULT_KEY_PREFIX = "rate-limit:"
+_SQLITE_BUSY_TIMEOUT_MS = 5_000
+# Sliding windows write a new key per window, so stale rows are swept
+# periodically rather than left to accumulate.
+_SQLITE_PURGE_INTERVAL_SECONDS = 60.0
+# Optimistic WATCH/EXEC retries before a contended RESP bucket gives up.
+_RESP_BUCKET_ATTEMPTS = 5
+_MEMORY_BUCKET_PRUNE_SIZE = 10_000
+
+
+def gcra(
+    tat: float | None, now: float, rate: float, burst: int, cost: int = 1
+) -> tuple[float | None, float]:
+    """Apply one token bucket request in GCRA form.
+
+    ``tat`` is the bucket's theoretical arrival time (None for a full
+    bucket). Returns ``(new_tat, 0.0)`` when the request is allowed and
+    ``(None, retry_after_seconds)`` when the bucket is empty.
+    """
+    interval = 1.0 / rate
+    new_tat = max(tat or now, now) + cost * interval
+    excess = new_tat - now - burst * interval
+    if excess > 1e-9:
+        return None, excess
+    return new_tat, 0.0
+
+
+class MemoryTokenBuckets:
+    """Per-process token buckets for the ``memory://`` storage."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tats: dict[str, float] = {}
+
+    def consume_token(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        """Take ``cost`` tokens; return 0.0, or seconds to wait when empty."""
+        now = time.time()
+        with self._lock:
+            new_tat, retry_after = gcra(self._tats.get(key), now, rate, burst, cost)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                if len(self._tats) > _MEMORY_BUCKET_PRUNE_SIZE:
+                    self._tats = {k: t for k, t in self._tats.items() if t > now}
+        return retry_after
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tats.clear()
+
+
+class _SlidingWindowCounters(
+    SlidingWindowCounterSupport, TimestampedSlidingWindow, ABC
+):
+    """Sliding-window-counter support built on atomic ``incr``/``decr``."""
+
+    @abstractmethod
+    def _get_many(self, keys: tuple[str, ...]) -> tuple[int, ...]:
+        """Return the current value of each counter, 0 when missing."""
+
+    @abstractmethod
+    def decr(self, key: str, amount: int = 1) -> int:
+        """Decrement a counter, returning its new value."""
+
+    def _window(
+        self, key: str, expiry: int, now: float
+    ) -> tuple[str, tuple[int, float, int, float]]:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, current_count = self._get_many((previous_key, current_key))
+        previous_ttl = (
+            (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        )
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return current_key, (previous_count, previous_ttl, current_count, current_ttl)
+
+    def acquire_sliding_window_entry(
+        self, key: str, limit: int, expiry: int, amount: int = 1
+    ) -> bool:
+        if amount > limit:
+            return False
+        current_key, window = self._window(key, expiry, time.time())
+        previous_count, previous_ttl, current_count, _ = window
+        weight = previous_count * previous_ttl / expiry
+        if math.floor(weight + current_count) + amount > limit:
+            return False
+        # Counters live for two windows so they can serve as "previous" next.
+        current_count = self.incr(current_key, 2 * expiry, amount)
+        if math.floor(weight + current_count) > limit:
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def get_sliding_window(
+        self, key: str, expiry: int
+    ) -> tuple[int, float, int, float]:
+        return self._window(key, expiry, time.time())[1]
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        for window_key in self.sliding_window_keys(key, expiry, time.time()):
+            self.clear(window_key)
+
+
+class SQLiteStorage(Storage, _SlidingWindowCounters):
+    """Counters in a SQLite file shared by the worker processes of one host."""
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        **options: Any,
+    ) -> None:
+        # Same layout as SQLAlchemy URLs: sqlite:///relative or sqlite:////abs.
+        self._path = uri.split("://", 1)[1][1:] or ":memory:"
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid = 0
+        self._purged_at = time.monotonic()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this process's connection, opening one after a fork."""
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self._path, isolation_level=None, check_same_thread=False
+            )
+            connection.execute(f"PRAGMA busy_timeout = {_SQLITE_BUSY_TIMEOUT_MS}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_counters (key TEXT PRIMARY "
+                "KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, parameters: tuple[Any, ...] = ()) -> list[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+    def _maybe_purge(self) -> None:
+        if time.monotonic() - self._purged_at > _SQLITE_PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        self._maybe_purge()
+        now = time.time()
+        rows = self._execute(
+            "INSERT INTO rate_limit_counters (key, value, expires_at) "
+            "VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+            "value = CASE WHEN expires_at <= ? THEN excluded.value "
+            "ELSE value + excluded.value END, "
+            "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at "
+            "ELSE expires_at END RETURNING value",
+            (key, amount, now + expiry, now, now),
+        )
+        return rows[0][0]
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        rows = self._execute(
+            "UPDATE rate_limit_counters SET value = MAX(value - ?, 0) "
+            "WHERE key = ? AND expires_at > ? RETURNING value",
+            (amount, key, time.time()),
+        )
+        return rows[0][0] if rows else 0
+
+    def get(self, key: str) -> int:
+        return self._get_many((key,))[0]
+
+    def _get_many(self, keys: tuple[str, ...]) -> tuple[int, ...]:
+        placeholders = ", ".join("?" for _ in keys)
+        rows = self._execute(
+            "SELECT key, value FROM rate_limit_counters "
+            f"WHERE key IN ({placeholders}) AND expires_at > ?",
+            (*keys, time.time()),
+        )
+        values = dict(rows)
+        return tuple(values.get(key, 0) for key in keys)
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        rows = self._execute(
+            "SELECT expires_at FROM rate_limit_counters "
+            "WHERE key = ? AND expires_at > ?",
+            (key, now),
+        )
+        return rows[0][0] if rows else now
+
+    def check(self) -> bool:
+        try:
+            self._execute("SELECT 1")
+        except sqlite3.Error:
+            return False
+        return True
+
+    def reset(self) -> int | None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM rate_limit_buckets")
+            return connection.execute("DELETE FROM rate_limit_counters").rowcount
+
+    def clear(self, key: str) -> None:
+        self._execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+
+    def consume_token(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        """Take ``cost`` tokens; return 0.0, or seconds to wait when empty."""
+        self._maybe_purge()
+        with self._lock:
+            connection = self._connect()
+            # IMMEDIATE takes the write lock up front so read-modify-write
+            # is atomic across processes.
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT tat FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                new_tat, retry_after = gcra(
+                    row[0] if row else None, time.time(), rate, burst, cost
+                )
+                if new_tat is not None:
+                    connection.execute(
+                        "INSERT INTO rate_limit_buckets (key, tat) VALUES (?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET tat = excluded.tat",
+                        (key, new_tat),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return retry_after
+
+    def purge_expired(self) -> int:
+        """Delete counters and full buckets; returns the number removed."""
+        now = time.time()
+        with self._lock:
+            self._purged_at = time.monotonic()
+            connection = self._connect()
+            counters = connection.execute(
+                "DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,)
+            ).rowcount
+            buckets = connection.execute(
+                "DELETE FROM rate_limit_buckets WHERE tat <= ?", (now,)
+            ).rowcount
+        return counters + buckets
+
+
+class RespError(Exception):
+    """Raised for protocol errors and error replies from a RESP server."""
+
+
+class RespConnection:
+    """Minimal blocking RESP2 client: pipelined commands over one socket."""
+
+    def __init__(self, host: str, port: int, db: int, timeout: float) -> None:
+        self._address = (host, port)
+        self._db = db
+        self._timeout = timeout
+        self._socket: socket.socket | None = None
+        self._reader: Any = None
+        self._pid = 0
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = None
+        self._reader = None
+
+    def pipeline(self, *commands: tuple[Any, ...]) -> list[Any]:
+        """Send commands in one write and return their replies in order."""
+        if self._pid != os.getpid():
+            # A forked child must not share its parent's socket.
+            self._socket = None
+            self._reader = None
+        try:
+            if self._socket is None:
+                self._connect()
+            return self._round_trip(commands)
+        except (OSError, RespError):
+            self.close()
+            raise
+
+    def _connect(self) -> None:
+        self._socket = socket.create_connection(self._address, self._timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+        self._pid = os.getpid()
+        if self._db:
+            self._round_trip([("SELECT", self._db)])
+
+    def _round_trip(self, commands: Any) -> list[Any]:
+        assert self._socket is not None
+        self._socket.sendall(b"".join(_encode(command) for command in commands))
+        replies = [self._read() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def _read(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RespError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return RespError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read() for _ in range(length)]
+        raise RespError(f"unexpected reply type {kind!r}")
+
+
+def _encode(command: tuple[Any, ...]) -> bytes:
+    parts = [f"*{len(command)}\r\n".encode()]
+    for argument in command:
+        data = argument if isinstance(argument, bytes) else str(argument).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class RespStorage(Storage, _SlidingWindowCounters):
+    """Counters on a Redis-protocol server, shared across hosts.
+
+    Keys are namespaced with the ``key_prefix`` option (default
+    ``rate-limit:``) so ``reset`` only removes this application's counters.
+    """
+
+    STORAGE_SCHEME = ["resp"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        key_prefix: str = _DEFAULT_KEY_PREFIX,
+        socket_timeout: float = 1.0,
+        **options: Any,
+    ) -> None:
+        parsed = urllib.parse.urlparse(uri)
+        db = int(parsed.path.strip("/") or 0)
+        self._prefix = key_prefix
+        self._lock = threading.Lock()
+        self._connection = RespConnection(
+            parsed.hostname or "localhost",
+            parsed.port or _DEFAULT_RESP_PORT,
+            db,
+            float(socket_timeout),
+        )
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> tuple[type[Exception], ...]:
+        return (OSError, RespError)
+
+    def _pipeline(self, *commands: tuple[Any, ...]) -> list[Any]:
+        with self._lock:
+            return self._connection.pipeline(*commands)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        name = self._prefix + key
+        # MULTI makes "create with TTL if absent, then add" one atomic step.
+        replies = self._pipeline(
+            ("MULTI",),
+            ("SET", name, 0, "PX", int(expiry * 1000), "NX"),
+            ("INCRBY", name, amount),
+            ("EXEC",),
+        )
+        return int(replies[-1][-1])
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        return int(self._pipeline(("DECRBY", self._prefix + key, amount))[0])
+
+    def get(self, key: str) -> int:
+        return self._get_many((key,))[0]
+
+    def _get_many(self, keys: tuple[str, ...]) -> tuple[int, ...]:
+        (values,) = self._pipeline(("MGET", *(self._prefix + key for key in keys)))
+        return tuple(int(value) if value is not None else 0 for value in values)
+
+    def get_expiry(self, key: str) -> float:
+        (ttl_ms,) = self._pipeline(("PTTL", self._prefix + key))
+        return time.time() + max(ttl_ms, 0) / 1000
+
+    def check(self) -> bool:
+        try:
+            return self._pipeline(("PING",))[0] == "PONG"
+        except (OSError, RespError):
+            return False
+
+    def reset(self) -> int | None:
+        removed = 0
+        cursor = b"0"
+        while True:
+            (reply,) = self._pipeline(
+                ("SCAN", cursor, "MATCH", f"{self._prefix}*", "COUNT", 1_000)
+            )
+            cursor, keys = reply
+            if keys:
+                removed += int(self._pipeline(("DEL", *keys))[0])
+            if cursor in (b"0", "0"):
+                return removed
+
+    def clear(self, key: str) -> None:
+        self._pipeline(("DEL", self._prefix + key))
+
+    def consume_token(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        """Take ``cost`` tokens; return 0.0, or seconds to wait when empty.
+
+        Uses WATCH/MULTI/EXEC so concurrent updates retry instead of
+        overwriting each other; a bucket still contended after a few
+        attempts is treated as empty.
+        """
+        name = f"{self._prefix}bucket:{key}"
+        with self._lock:
+            for _ in range(_RESP_BUCKET_ATTEMPTS):
+                _, stored = self._connection.pipeline(("WATCH", name), ("GET", name))
+                now = time.time()
+                new_tat, retry_after = gcra(
+                    float(stored) if stored is not None else None,
+                    now,
+                    rate,
+                    burst,
+                    cost,
+                )
+                if new_tat is None:
+                    self._connection.pipeline(("UNWATCH",))
+                    return retry_after
+                ttl_ms = max(1, math.ceil((new_tat - now) * 1000))
+                replies = self._connection.pipeline(
+                    ("MULTI",), ("SET", name, repr(new_tat), "PX", ttl_ms), ("EXEC",)
+                )
+                if replies[-1] is not None:
+                    return 0.0
+        return cost / rate
+
+
+def token_buckets_from_uri(uri: str) -> Any:
+    """Return the token bucket store for a ``RATE_LIMIT_STORAGE_URI`` value."""
+    if urllib.parse.urlparse(uri).scheme == "memory":
+        return MemoryTokenBuckets()
+    storage = storage_from_string(uri)
+    if not hasattr(storage, "consume_token"):
+        raise ConfigurationError(f"{uri} does not support token bucket tiers")
+    return storage
+
+
+__all__ = [
+    "MemoryTokenBuckets",
+    "RespConnection",
+    "RespError",
+    "RespStorage",
+    "SQLiteStorage",
+    "gcra",
+    "token_buckets_from_uri",
+]
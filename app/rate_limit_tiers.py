@@ -0,0 +1,172 @@
+"""Per-user token bucket tiers for the public API routes.
+
+``TieredRateLimitMiddleware`` charges each request on a tiered route to a
+token bucket keyed by the authenticated user id, falling back to the client
+address for anonymous or invalid tokens. Catalog reads and rental writes have
+separate buckets, so a client browsing bikes never spends the allowance it
+needs to book one, and a burst of writes cannot starve reads.
+
+The bearer token is resolved from ``user_cache`` when it has been seen before;
+otherwise it is decoded once and the claims are left in the request state
+for ``get_current_user`` and the idempotency middleware to reuse.
+
+Buckets live in the storage selected by ``RATE_LIMIT_STORAGE_URI`` (see
+``app.rate_limit_storage``), so tiers are shared between workers whenever
+the slowapi counters are. Shared storages do blocking I/O per request, so
+their buckets are consumed in the threadpool rather than on the event loop.
+"""
+from __future__ import annotations
+
+import math
+import os
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from jose import JWTError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth import bearer_token, request_token_claims
+from app.rate_limit_storage import MemoryTokenBuckets, token_buckets_from_uri
+from app.rate_limiter import RATE_LIMIT_STORAGE_URI
+from app.user_cache import user_cache
+
+
+class TierPolicy(NamedTuple):
+    """A token bucket refilled at ``rate`` tokens per second up to ``burst``."""
+
+    name: str
+    rate: float
+    burst: int
+
+
+class RouteTier(NamedTuple):
+    """Requests whose path starts with ``prefix`` and use ``methods``."""
+
+    prefix: str
+    methods: frozenset[str]
+    tier: TierPolicy
+
+
+READ_TIER = TierPolicy(
+    "read",
+    float(os.getenv("RATE_LIMIT_READ_RATE", "20")),
+    int(os.getenv("RATE_LIMIT_READ_BURST", "60")),
+)
+WRITE_TIER = TierPolicy(
+    "write",
+    float(os.getenv("RATE_LIMIT_WRITE_RATE", "1")),
+    int(os.getenv("RATE_LIMIT_WRITE_BURST", "10")),
+)
+
+_READ_METHODS = frozenset({"GET", "HEAD"})
+_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# First match wins. Quotes are priced but never persisted, so they count as
+# reads even though they are POSTs.
+ROUTE_TIERS: tuple[RouteTier, ...] = (
+    RouteTier("/api/bikes", _READ_METHODS, READ_TIER),
+    RouteTier("/api/quotes", frozenset({"POST"}), READ_TIER),
+    RouteTier("/api/rentals", _READ_METHODS, READ_TIER),
+    RouteTier("/api/rentals", _WRITE_METHODS, WRITE_TIER),
+    RouteTier("/api/payments", _READ_METHODS, READ_TIER),
+    RouteTier("/api/payments", _WRITE_METHODS, WRITE_TIER),
+)
+
+token_buckets = token_buckets_from_uri(RATE_LIMIT_STORAGE_URI)
+
+
+def tier_for(
+    method: str, path: str, routes: Iterable[RouteTier] = ROUTE_TIERS
+) -> TierPolicy | None:
+    """Return the tier charged for a request, or None when it is untiered."""
+    for route in routes:
+        if method in route.methods and (
+            path == route.prefix or path.startswith(route.prefix + "/")
+        ):
+            return route.tier
+    return None
+
+
+def client_key(scope: Scope) -> str:
+    """Identify the caller by user id, or by client address when anonymous."""
+    token = bearer_token(Headers(scope=scope))
+    if token is not None:
+        cached = user_cache.get(token)
+        if cached is not None:
+            return f"user:{cached.id}"
+        try:
+            subject = request_token_claims(scope, token).get("sub")
+        except JWTError:
+            subject = None
+        if subject is not None:
+            return f"user:{subject}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class TieredRateLimitMiddleware:
+    """Pure ASGI middleware enforcing ``ROUTE_TIERS`` per caller."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        buckets: Any = None,
+        routes: Iterable[RouteTier] = ROUTE_TIERS,
+    ) -> None:
+        self.app = app
+        self.buckets = token_buckets if buckets is None else buckets
+        self.routes = tuple(routes)
+        self.enabled = True
+        # SQLite and RESP buckets do blocking I/O, so they run in the
+        # threadpool; the in-memory bucket only takes a lock.
+        self._inline = isinstance(self.buckets, MemoryTokenBuckets)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        tier = None
+        if scope["type"] == "http" and self.enabled:
+            tier = tier_for(scope["method"], scope["path"], self.routes)
+        if tier is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"tier:{tier.name}:{client_key(scope)}"
+        if self._inline:
+            retry_after = self.buckets.consume_token(key, tier.rate, tier.burst)
+        else:
+            retry_after = await run_in_threadpool(
+                self.buckets.consume_token, key, tier.rate, tier.burst
+            )
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        seconds = max(1, math.ceil(retry_after))
+        response = JSONResponse(
+            {
+                "error": {
+                    "code": "RATE_LIMITED",
+                    "message": (
+                        f"Too many {tier.name} requests; retry in {seconds} seconds."
+                    ),
+                }
+            },
+            status_code=429,
+            headers={"Retry-After": str(seconds)},
+        )
+        await response(scope, receive, send)
+
+
+__all__ = [
+    "READ_TIER",
+    "ROUTE_TIERS",
+    "RouteTier",
+    "TierPolicy",
+    "TieredRateLimitMiddleware",
+    "WRITE_TIER",
+    "client_key",
+    "tier_for",
+    "token_buckets",
+]
@@ -1,7 +1,66 @@
-"""Global rate limiter instance shared across the application."""
+"""Global rate limiter instance shared across the application.
+
+Counters live wherever ``RATE_LIMIT_STORAGE_URI`` points. The default
+``memory://`` is per process. ``sqlite:///path`` shares counters between
+the workers on one host, and ``resp://host:port`` (see
+``app.rate_limit_storage``) shares them across hosts.
+"""
+from __future__ import annotations
+
+import os
+
 from slowapi import Limiter
+from slowapi.middleware import SlowAPIASGIMiddleware
 from slowapi.util import get_remote_address
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Registers the sqlite:// and resp:// storage schemes with ``limits``.
+from app import rate_limit_storage  # noqa: F401
+
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+)
+
+
+class RateLimitMiddleware:
+    """Pure ASGI stand-in for ``SlowAPIMiddleware``.
+
+    Routes declared with ``@limiter.limit`` are enforced by their decorator.
+    The middleware only adds the limiter's default and application-wide
+    limits. slowapi's middleware is a ``BaseHTTPMiddleware``, so every
+    request pays for response streaming and a route-table scan even when no
+    such limits exist. This one passes those requests straight through and
+    hands the rest to slowapi's ASGI implementation.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Limiter = limiter) -> None:
+        self.app = app
+        self.limiter = limiter
+        self._checked = SlowAPIASGIMiddleware(app)
+
+    def _has_middleware_limits(self) -> bool:
+        # slowapi has no public accessor for the configured limit groups.
+        return bool(self.limiter._default_limits or self.limiter._application_limits)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.limiter.enabled
+            or not self._has_middleware_limits()
+        ):
+            await self.app(scope, receive, send)
+            return
+        await self._checked(scope, receive, send)
 
-limiter = Limiter(key_func=get_remote_address)
 
-__all__ = ["limiter"]
+__all__ = [
+    "RATE_LIMIT_STORAGE_URI",
+    "RATE_LIMIT_STRATEGY",
+    "RateLimitMiddleware",
+    "limiter",
+]
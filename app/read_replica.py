@@ -0,0 +1,75 @@
+"""Read-your-writes stickiness for routing reads to a replica.
+
+With ``DATABASE_READ_URL`` set, ``get_read_db`` (see ``app.db``) serves
+read-only routes from the replica. A replica may lag the primary, so a
+caller who has just written is kept on the primary for
+``READ_AFTER_WRITE_SECONDS``: ``get_async_write_db`` marks the caller in
+``RecentWriters`` when its request finishes and ``get_read_db`` checks the
+mark.
+
+Callers are identified by their bearer token only. Client addresses are
+not used: behind a reverse proxy every caller shares one, so a single write
+would pin all readers to the primary. Anonymous callers cannot write, so
+they are never sticky. Marks are per process; run several workers behind a
+load balancer with sticky sessions, or set the window above the replica's
+worst lag.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+_MAX_ENTRIES = 10_000
+
+
+def caller_keys(scope: Scope) -> tuple[str, ...]:
+    """Return the keys identifying the caller of an HTTP request."""
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return (f"token:{token}",)
+    return ()
+
+
+class RecentWriters:
+    """Callers that wrote within the last ``window_seconds``."""
+
+    def __init__(
+        self, window_seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._until: dict[str, float] = {}
+
+    def mark(self, scope: Scope) -> None:
+        """Keep the caller of ``scope`` on the primary for the window."""
+        now = self._clock()
+        until = now + self.window_seconds
+        with self._lock:
+            if len(self._until) >= _MAX_ENTRIES:
+                self._until = {
+                    key: deadline
+                    for key, deadline in self._until.items()
+                    if deadline > now
+                }
+            for key in caller_keys(scope):
+                self._until[key] = until
+
+    def is_sticky(self, scope: Scope) -> bool:
+        """Whether the caller of ``scope`` wrote within the window."""
+        now = self._clock()
+        with self._lock:
+            return any(
+                self._until.get(key, 0.0) > now for key in caller_keys(scope)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+__all__ = ["RecentWriters", "caller_keys"]
@@ -1,11 +1,33 @@
-"""Repository helpers for bike persistence operations."""
+"""Repository helpers for bike persistence operations.
+
+The routes read through the ``_async`` functions, which take an
+``AsyncSession``; the sync helpers serve the in-process caches (loaded via
+``run_sync``) and admin exports. ``get_available_bike_rows`` selects only
+the ``BikeRead`` columns and returns plain dicts, skipping ORM instances for
+listings that are serialized straight away.
+"""
 from __future__ import annotations
 
-from sqlalchemy import select
+from datetime import date
+from typing import Any
+
+from sqlalchemy import Result, Select, exists, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.bike import AvailabilityStatus, Bike
-from app.schemas.bike_schema import BikeCreate
+from app.models.rental import Rental
+from app.repositories.rental_repo import overlaps_window
+from app.schemas.bike_schema import BikeCreate, BikeRead, BikeSort
+
+# The columns ``BikeRead`` needs, for listings that skip ORM instances.
+_BIKE_READ_COLUMNS = (
+    Bike.id,
+    Bike.name,
+    Bike.type,
+    Bike.rate_per_day_cents,
+    Bike.availability_status,
+)
 
 
 def create_bike(db: Session, schema: BikeCreate) -> Bike:
@@ -22,18 +44,243 @@ def get_bike_by_id(db: Session, bike_id: int) -> Bike | None:
     return db.get(Bike, bike_id)
 
 
+async def get_bike_for_update_async(db: AsyncSession, bike_id: int) -> Bike | None:
+    """Return a freshly loaded bike, row-locked where the dialect supports it.
+
+    SQLite has no ``FOR UPDATE``; callers still detect races through the
+    bike's ``version`` column (see ``rental_repo.reserve_rental_async``).
+    """
+    result = await db.execute(_bike_for_update_statement(bike_id))
+    return result.scalar_one_or_none()
+
+
+def _bike_for_update_statement(bike_id: int) -> Select:
+    return (
+        select(Bike)
+        .where(Bike.id == bike_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+
+def _bikes_for_update_statement(bike_ids: list[int]) -> Select:
+    return (
+        select(Bike)
+        .where(Bike.id.in_(bike_ids))
+        .order_by(Bike.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+
+async def get_bikes_for_update_async(
+    db: AsyncSession, bike_ids: list[int]
+) -> list[Bike]:
+    """Return freshly loaded bikes in one query, row-locked where supported."""
+    if not bike_ids:
+        return []
+    result = await db.execute(_bikes_for_update_statement(bike_ids))
+    return result.scalars().all()
+
+
+async def get_bikes_by_ids_async(db: AsyncSession, bike_ids: list[int]) -> list[Bike]:
+    """Return the bikes with the supplied ids in a single query (unordered)."""
+    if not bike_ids:
+        return []
+    result = await db.execute(select(Bike).where(Bike.id.in_(bike_ids)))
+    return result.scalars().all()
+
+
+async def get_bike_rates_async(
+    db: AsyncSession, bike_ids: list[int]
+) -> list[tuple[int, str, int]]:
+    """Return (id, type, rate_per_day_cents) for the given bikes in one query."""
+    if not bike_ids:
+        return []
+    result = await db.execute(_bike_rates_statement(bike_ids))
+    return [tuple(row) for row in result]
+
+
+def _bike_rates_statement(bike_ids: list[int]) -> Select:
+    return select(Bike.id, Bike.type, Bike.rate_per_day_cents).where(
+        Bike.id.in_(bike_ids)
+    )
+
+
+def get_available_bike_locations(db: Session) -> list[tuple[int, float, float]]:
+    """Return (id, lat, lng) for every available bike with a known location."""
+    result = db.execute(
+        select(Bike.id, Bike.lat, Bike.lng).where(
+            Bike.availability_status == AvailabilityStatus.AVAILABLE,
+            Bike.lat.is_not(None),
+            Bike.lng.is_not(None),
+        )
+    )
+    return [tuple(row) for row in result]
+
+
+def get_bike_statuses(db: Session) -> list[tuple[int, AvailabilityStatus]]:
+    """Return (id, availability_status) for every bike."""
+    result = db.execute(select(Bike.id, Bike.availability_status).order_by(Bike.id))
+    return [tuple(row) for row in result]
+
+
 def get_all_bikes(db: Session) -> list[Bike]:
     """Return all bikes."""
     result = db.execute(select(Bike))
     return result.scalars().all()
 
 
-def get_available_bikes(db: Session) -> list[Bike]:
-    """Return only bikes that are currently available for rental."""
+def _apply_keyset(
+    statement: Select, sort: BikeSort, after: list[Any] | None
+) -> Select:
+    """Order a bike query by sort (tie-broken on id) and seek past after."""
+    column = getattr(Bike, sort.field)
+    if sort.field == "id":
+        if after is not None:
+            statement = statement.where(
+                Bike.id < after[-1] if sort.descending else Bike.id > after[-1]
+            )
+        return statement.order_by(Bike.id.desc() if sort.descending else Bike.id)
+
+    if after is not None:
+        key = tuple_(column, Bike.id)
+        bound = tuple_(*after)
+        statement = statement.where(key < bound if sort.descending else key > bound)
+    if sort.descending:
+        return statement.order_by(column.desc(), Bike.id.desc())
+    return statement.order_by(column, Bike.id)
+
+
+def bike_sort_key(bike: Bike | BikeRead, sort: BikeSort) -> list[Any]:
+    """Return the keyset values identifying bike's position in sort order."""
+    if sort.field == "id":
+        return [bike.id]
+    return [getattr(bike, sort.field), bike.id]
+
+
+def _available_bikes_statement(
+    *,
+    columns: tuple[Any, ...] = (Bike,),
+    bike_type: str | None = None,
+    min_rate_cents: int | None = None,
+    max_rate_cents: int | None = None,
+    sort: BikeSort = BikeSort.ID,
+    after: list[Any] | None = None,
+    limit: int | None = None,
+) -> Select:
+    statement = select(*columns).where(
+        Bike.availability_status == AvailabilityStatus.AVAILABLE
+    )
+    if bike_type is not None:
+        statement = statement.where(Bike.type == bike_type)
+    if min_rate_cents is not None:
+        statement = statement.where(Bike.rate_per_day_cents >= min_rate_cents)
+    if max_rate_cents is not None:
+        statement = statement.where(Bike.rate_per_day_cents <= max_rate_cents)
+
+    statement = _apply_keyset(statement, sort, after)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def get_available_bike_rows(
+    db: Session,
+    *,
+    bike_type: str | None = None,
+    min_rate_cents: int | None = None,
+    max_rate_cents: int | None = None,
+    sort: BikeSort = BikeSort.ID,
+    after: list[Any] | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Return available bikes as ``BikeRead``-shaped dicts, keyset-paged.
+
+    ``after`` is the sort key of the last bike on the previous page (see
+    ``bike_sort_key``); rows are returned strictly after it in ``sort`` order.
+    Only the listed columns are selected and no ORM instances are built;
+    validate the rows with ``BIKE_READ_LIST`` before computing cursors.
+    """
     result = db.execute(
-        select(Bike).where(Bike.availability_status == AvailabilityStatus.AVAILABLE)
+        _available_bikes_statement(
+            columns=_BIKE_READ_COLUMNS,
+            bike_type=bike_type,
+            min_rate_cents=min_rate_cents,
+            max_rate_cents=max_rate_cents,
+            sort=sort,
+            after=after,
+            limit=limit,
+        )
     )
+    return _as_dicts(result)
+
+
+async def get_available_bike_rows_async(
+    db: AsyncSession,
+    *,
+    bike_type: str | None = None,
+    min_rate_cents: int | None = None,
+    max_rate_cents: int | None = None,
+    sort: BikeSort = BikeSort.ID,
+    after: list[Any] | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Async ``get_available_bike_rows``."""
+    result = await db.execute(
+        _available_bikes_statement(
+            columns=_BIKE_READ_COLUMNS,
+            bike_type=bike_type,
+            min_rate_cents=min_rate_cents,
+            max_rate_cents=max_rate_cents,
+            sort=sort,
+            after=after,
+            limit=limit,
+        )
+    )
+    return _as_dicts(result)
+
+
+def _as_dicts(result: Result) -> list[dict[str, Any]]:
+    # Plain dicts validate several times faster than ``RowMapping`` objects.
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def _available_between_statement(start_date: date, end_date: date) -> Select:
+    booked = exists().where(
+        Rental.bike_id == Bike.id, overlaps_window(start_date, end_date)
+    )
+    return (
+        select(Bike)
+        .where(Bike.availability_status == AvailabilityStatus.AVAILABLE, ~booked)
+        .order_by(Bike.id)
+    )
+
+
+async def get_bikes_available_between_async(
+    db: AsyncSession, start_date: date, end_date: date
+) -> list[Bike]:
+    """Return available bikes with no rental overlapping [start_date, end_date).
+
+    Runs as a single anti-join so the whole fleet is checked in one query.
+    """
+    result = await db.execute(_available_between_statement(start_date, end_date))
     return result.scalars().all()
 
 
-__all__ = ["create_bike", "get_bike_by_id", "get_all_bikes", "get_available_bikes"]
+__all__ = [
+    "bike_sort_key",
+    "create_bike",
+    "get_bike_by_id",
+    "get_bike_for_update_async",
+    "get_bike_rates_async",
+    "get_bikes_for_update_async",
+    "get_all_bikes",
+    "get_bike_statuses",
+    "get_available_bike_locations",
+    "get_available_bike_rows",
+    "get_available_bike_rows_async",
+    "get_bikes_available_between_async",
+    "get_bikes_by_ids_async",
+]
@@ -0,0 +1,147 @@
+"""Repository helpers for idempotency record persistence operations."""
+from __future__ import annotations
+
+import secrets
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.idempotency import IdempotencyRecord
+
+# A conflicting record can be released or purged between our failed insert
+# and the lookup; the claim is then simply tried again.
+_CLAIM_ATTEMPTS = 3
+
+
+def claim_key(
+    db: Session,
+    scope: str,
+    key: str,
+    fingerprint: str,
+    now: datetime,
+    lease_expires_at: datetime,
+) -> tuple[IdempotencyRecord, bool]:
+    """Claim a key for a new in-flight request or return the live record.
+
+    Returns ``(record, True)`` when this caller now owns the key and
+    ``(record, False)`` when an unexpired record already exists. Expired
+    records (finished past their TTL, or abandoned in flight) are replaced.
+    A new claim gets a random ``claim_token``; only its holder can renew,
+    complete, or release the record.
+    """
+    attempts = 0
+    while True:
+        attempts += 1
+        db.execute(
+            delete(IdempotencyRecord).where(
+                IdempotencyRecord.scope == scope,
+                IdempotencyRecord.key == key,
+                IdempotencyRecord.expires_at <= now,
+            )
+        )
+        record = IdempotencyRecord(
+            scope=scope,
+            key=key,
+            fingerprint=fingerprint,
+            claim_token=secrets.token_hex(16),
+            expires_at=lease_expires_at,
+        )
+        db.add(record)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            existing = db.execute(
+                select(IdempotencyRecord).where(
+                    IdempotencyRecord.scope == scope, IdempotencyRecord.key == key
+                )
+            ).scalar_one_or_none()
+            if existing is not None:
+                return existing, False
+            if attempts >= _CLAIM_ATTEMPTS:
+                raise
+            continue
+        return record, True
+
+
+def _claimed_by(
+    record_id: int, claim_token: str
+) -> tuple[ColumnElement[bool], ...]:
+    return (
+        IdempotencyRecord.id == record_id,
+        IdempotencyRecord.claim_token == claim_token,
+        IdempotencyRecord.status_code.is_(None),
+    )
+
+
+def renew_key(
+    db: Session, record_id: int, claim_token: str, lease_expires_at: datetime
+) -> bool:
+    """Extend an in-flight claim's lease; False when the claim was lost."""
+    result = db.execute(
+        update(IdempotencyRecord)
+        .where(*_claimed_by(record_id, claim_token))
+        .values(expires_at=lease_expires_at)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def complete_key(
+    db: Session,
+    record_id: int,
+    claim_token: str,
+    status_code: int,
+    content_type: str | None,
+    response_body: bytes,
+    expires_at: datetime,
+) -> bool:
+    """Store the final response for a claimed key and extend it to the TTL.
+
+    Returns False, storing nothing, when the claim was lost: its lease
+    expired and another request replaced or purged the record.
+    """
+    result = db.execute(
+        update(IdempotencyRecord)
+        .where(*_claimed_by(record_id, claim_token))
+        .values(
+            status_code=status_code,
+            content_type=content_type,
+            response_body=response_body,
+            expires_at=expires_at,
+        )
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_key(db: Session, record_id: int, claim_token: str) -> bool:
+    """Forget a claimed key so the request can be retried from scratch.
+
+    Returns False when the claim was already lost to another request.
+    """
+    result = db.execute(
+        delete(IdempotencyRecord).where(*_claimed_by(record_id, claim_token))
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def purge_expired(db: Session, now: datetime) -> int:
+    """Delete every expired record and return how many were removed."""
+    result = db.execute(
+        delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= now)
+    )
+    db.commit()
+    return result.rowcount
+
+
+__all__ = [
+    "claim_key",
+    "complete_key",
+    "purge_expired",
+    "release_key",
+    "renew_key",
+]
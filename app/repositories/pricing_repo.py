@@ -0,0 +1,41 @@
+"""Repository helpers for pricing rule persistence operations."""
+from __future__ import annotations
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.pricing_rule import DayKind, PricingRule
+
+RuleRow = tuple[str | None, DayKind, int, int]
+
+
+def get_pricing_rules(db: Session) -> list[RuleRow]:
+    """Return (bike_type, day_kind, multiplier_percent, surcharge_cents) rows."""
+    result = db.execute(
+        select(
+            PricingRule.bike_type,
+            PricingRule.day_kind,
+            PricingRule.multiplier_percent,
+            PricingRule.surcharge_cents,
+        ).order_by(PricingRule.id)
+    )
+    return [tuple(row) for row in result]
+
+
+def get_pricing_rules_version(db: Session) -> tuple[int, int, int]:
+    """Return a cheap digest that changes whenever any rule is written.
+
+    Updates bump a rule's version, deletes change the count, and inserts
+    change the highest id.
+    """
+    count, version_sum, max_id = db.execute(
+        select(
+            func.count(PricingRule.id),
+            func.coalesce(func.sum(PricingRule.version), 0),
+            func.coalesce(func.max(PricingRule.id), 0),
+        )
+    ).one()
+    return count, version_sum, max_id
+
+
+__all__ = ["get_pricing_rules", "get_pricing_rules_version"]
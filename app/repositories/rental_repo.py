@@ -1,12 +1,53 @@
-"""Repository helpers for rental persistence operations."""
+"""Repository helpers for rental persistence operations.
+
+The routes read and reserve through the ``_async`` functions, which take an
+``AsyncSession``; the sync helpers serve the in-process caches (loaded via
+``run_sync``) and admin exports. ``get_rental_rows_for_user`` selects only
+the ``RentalWithBikeRead`` columns and returns plain dicts.
+"""
 from __future__ import annotations
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from collections.abc import Iterable, Sequence
+from datetime import date
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Update,
+    and_,
+    case,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
+from app.models.bike import Bike
 from app.models.rental import Rental
 from app.schemas.rental_schema import RentalCreate
 
+# The columns ``RentalWithBikeRead`` needs, for listings that skip ORM instances.
+_RENTAL_READ_COLUMNS = (
+    Rental.id,
+    Rental.bike_id,
+    Rental.user_id,
+    Rental.start_date,
+    Rental.end_date,
+    Rental.total_price_cents,
+    Rental.created_at,
+)
+_BIKE_READ_COLUMNS = (
+    Bike.id,
+    Bike.name,
+    Bike.type,
+    Bike.rate_per_day_cents,
+    Bike.availability_status,
+)
+
 
 def create_rental(db: Session, schema: RentalCreate) -> Rental:
     """Persist a new rental based on the provided schema."""
@@ -17,15 +58,244 @@ def create_rental(db: Session, schema: RentalCreate) -> Rental:
     return rental
 
 
+async def reserve_rental_async(
+    db: AsyncSession, schema: RentalCreate, bike_version: int
+) -> Rental | None:
+    """Persist a rental only if the bike is still at bike_version.
+
+    The bike's version is bumped in the same transaction with a conditional
+    UPDATE, so of several concurrent reservations read at the same version
+    exactly one commits. Returns None (after rolling back) when another
+    writer got there first; callers should re-check availability and retry.
+    The bike is claimed before the rental is flushed, so a lost race rolls
+    back nothing and leaves the in-process caches alone.
+    """
+    claimed = await db.execute(_claim_bike_statement(schema.bike_id, bike_version))
+    if claimed.rowcount != 1:
+        await db.rollback()
+        return None
+    rental = Rental(**schema.model_dump())
+    db.add(rental)
+    await db.commit()
+    await db.refresh(rental)
+    return rental
+
+
+def _claim_bike_statement(bike_id: int, bike_version: int) -> Update:
+    return (
+        update(Bike)
+        .where(Bike.id == bike_id, Bike.version == bike_version)
+        .values(version=bike_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reserve_rentals_async(
+    db: AsyncSession, schemas: list[RentalCreate], bike_versions: dict[int, int]
+) -> list[Rental] | None:
+    """Persist several rentals atomically if every bike is still at its version.
+
+    All bike versions are bumped with one conditional UPDATE, the rentals are
+    written with a single executemany INSERT, and everything commits once.
+    Returns None (after rolling back) when any bike changed concurrently.
+    Callers must have ruled out overlaps, so (bike_id, start_date) identifies
+    each new rental when it is reloaded.
+    """
+    claimed = await db.execute(_claim_bikes_statement(bike_versions))
+    if claimed.rowcount != len(bike_versions):
+        await db.rollback()
+        return None
+    await db.execute(insert(Rental), [schema.model_dump() for schema in schemas])
+    await db.commit()
+
+    keys = [(schema.bike_id, schema.start_date) for schema in schemas]
+    loaded = {
+        (rental.bike_id, rental.start_date): rental
+        for rental in (await db.execute(_rentals_by_key_statement(keys))).scalars()
+    }
+    return [loaded[key] for key in keys]
+
+
+def _claim_bikes_statement(bike_versions: dict[int, int]) -> Update:
+    return (
+        update(Bike)
+        .where(
+            Bike.id.in_(bike_versions),
+            Bike.version == case(bike_versions, value=Bike.id),
+        )
+        .values(version=Bike.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _rentals_by_key_statement(keys: list[tuple[int, date]]) -> Select:
+    # SQLite cannot seek an index with a row-value IN list; the plain bike_id
+    # IN lets it use the bike/date index and the tuple match narrows the rows.
+    return select(Rental).where(
+        Rental.bike_id.in_(sorted({bike_id for bike_id, _ in keys})),
+        tuple_(Rental.bike_id, Rental.start_date).in_(keys),
+    )
+
+
+async def get_overlapping_rentals_async(
+    db: AsyncSession, bike_ids: list[int], start_date: date, end_date: date
+) -> list[tuple[int, date, date | None]]:
+    """Return (bike_id, start_date, end_date) of the bikes' rentals in a window."""
+    if not bike_ids:
+        return []
+    result = await db.execute(_overlapping_statement(bike_ids, start_date, end_date))
+    return [tuple(row) for row in result]
+
+
+def _overlapping_statement(
+    bike_ids: list[int], start_date: date, end_date: date
+) -> Select:
+    return select(Rental.bike_id, Rental.start_date, Rental.end_date).where(
+        Rental.bike_id.in_(bike_ids), overlaps_window(start_date, end_date)
+    )
+
+
 def get_rental_by_id(db: Session, rental_id: int) -> Rental | None:
     """Return a rental by its primary key."""
     return db.get(Rental, rental_id)
 
 
+async def get_rental_by_id_async(db: AsyncSession, rental_id: int) -> Rental | None:
+    """Async ``get_rental_by_id``."""
+    return await db.get(Rental, rental_id)
+
+
+def overlaps_window(start_date: date, end_date: date) -> ColumnElement[bool]:
+    """Return a predicate matching rentals that overlap [start_date, end_date).
+
+    Rentals without an end date are treated as open-ended.
+    """
+    return and_(
+        Rental.start_date < end_date,
+        or_(Rental.end_date.is_(None), Rental.end_date > start_date),
+    )
+
+
+async def has_overlapping_rental_async(
+    db: AsyncSession, bike_id: int, start_date: date, end_date: date
+) -> bool:
+    """Return True when the bike already has a rental overlapping the window."""
+    result = await db.execute(_bike_overlap_statement(bike_id, start_date, end_date))
+    return result.first() is not None
+
+
+def _bike_overlap_statement(bike_id: int, start_date: date, end_date: date) -> Select:
+    return (
+        select(Rental.id)
+        .where(Rental.bike_id == bike_id, overlaps_window(start_date, end_date))
+        .limit(1)
+    )
+
+
+def get_rental_windows_between(
+    db: Session, start_date: date, end_date: date
+) -> list[tuple[int, date, date | None]]:
+    """Return (bike_id, start_date, end_date) for rentals overlapping the window."""
+    result = db.execute(
+        select(Rental.bike_id, Rental.start_date, Rental.end_date).where(
+            overlaps_window(start_date, end_date)
+        )
+    )
+    return [tuple(row) for row in result]
+
+
+def get_rental_rows_for_user(
+    db: Session,
+    user_id: int,
+    *,
+    after_id: int | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Return a user's rentals newest first as ``RentalWithBikeRead`` dicts.
+
+    Rows are ordered by ``(created_at, id)`` descending. ``after_id`` is the
+    last rental of the previous page; its ``created_at`` is read in a subquery
+    so the comparison never depends on how the backend stores timestamps.
+    Rentals and their bikes come back from one join of the needed columns,
+    without building ORM instances.
+    """
+    statement = _user_rental_rows_statement(user_id, after_id, limit)
+    return _nest_bikes(db.execute(statement))
+
+
+async def get_rental_rows_for_user_async(
+    db: AsyncSession,
+    user_id: int,
+    *,
+    after_id: int | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Async ``get_rental_rows_for_user``."""
+    statement = _user_rental_rows_statement(user_id, after_id, limit)
+    return _nest_bikes(await db.execute(statement))
+
+
+def _nest_bikes(rows: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+    split = len(_RENTAL_READ_COLUMNS)
+    rental_keys = [column.key for column in _RENTAL_READ_COLUMNS]
+    bike_keys = [column.key for column in _BIKE_READ_COLUMNS]
+    return [
+        {
+            **dict(zip(rental_keys, row[:split])),
+            "bike": dict(zip(bike_keys, row[split:])),
+        }
+        for row in rows
+    ]
+
+
+def _user_rental_rows_statement(
+    user_id: int, after_id: int | None, limit: int | None
+) -> Select:
+    statement = select(*_RENTAL_READ_COLUMNS, *_BIKE_READ_COLUMNS).join(Rental.bike)
+    return _user_rentals_page(statement, user_id, after_id, limit)
+
+
+def _user_rentals_page(
+    stmt: Select, user_id: int, after_id: int | None, limit: int | None
+) -> Select:
+    stmt = stmt.where(Rental.user_id == user_id).order_by(
+        Rental.created_at.desc(), Rental.id.desc()
+    )
+    if after_id is not None:
+        anchor = aliased(Rental)
+        anchor_created_at = (
+            select(anchor.created_at)
+            .where(anchor.id == after_id, anchor.user_id == user_id)
+            .scalar_subquery()
+        )
+        stmt = stmt.where(
+            or_(
+                Rental.created_at < anchor_created_at,
+                and_(Rental.created_at == anchor_created_at, Rental.id < after_id),
+            )
+        )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
 def get_all_rentals(db: Session) -> list[Rental]:
     """Return all rentals."""
     result = db.execute(select(Rental))
     return result.scalars().all()
 
 
-__all__ = ["create_rental", "get_rental_by_id", "get_all_rentals"]
+__all__ = [
+    "create_rental",
+    "get_rental_by_id",
+    "get_rental_by_id_async",
+    "get_rental_rows_for_user",
+    "get_rental_rows_for_user_async",
+    "get_all_rentals",
+    "get_overlapping_rentals_async",
+    "get_rental_windows_between",
+    "has_overlapping_rental_async",
+    "overlaps_window",
+    "reserve_rental_async",
+    "reserve_rentals_async",
+]
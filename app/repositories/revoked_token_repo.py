@@ -0,0 +1,50 @@
+"""Repository helpers for revoked token persistence operations."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.revoked_token import RevokedToken
+
+
+def revoke_token(db: Session, jti: str, expires_at: datetime, now: datetime) -> bool:
+    """Record a token id as revoked; return False if it already was.
+
+    Rows whose tokens have expired anyway are purged in the same transaction.
+    The unique ``jti`` constraint settles concurrent revocations of one token.
+    """
+    if is_token_revoked(db, jti):
+        db.commit()
+        return False
+    db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+    db.add(RevokedToken(jti=jti, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def is_token_revoked(db: Session, jti: str) -> bool:
+    """Return True when the token id has a revocation row."""
+    result = db.execute(select(RevokedToken.id).where(RevokedToken.jti == jti))
+    return result.scalar_one_or_none() is not None
+
+
+def get_revocations_after(
+    db: Session, after_id: int
+) -> list[tuple[int, str, datetime]]:
+    """Return (id, jti, expires_at) rows with id above after_id, in id order."""
+    result = db.execute(
+        select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+        .where(RevokedToken.id > after_id)
+        .order_by(RevokedToken.id)
+    )
+    return [tuple(row) for row in result]
+
+
+__all__ = ["get_revocations_after", "is_token_revoked", "revoke_token"]
@@ -1,7 +1,15 @@
-"""Repository helpers for user persistence operations."""
+"""Repository helpers for user persistence operations.
+
+Functions suffixed ``_async`` take an ``AsyncSession``.
+"""
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.user import User
@@ -17,15 +25,75 @@ def create_user(db: Session, schema: UserCreate) -> User:
     return user
 
 
+async def create_user_async(db: AsyncSession, schema: UserCreate) -> User:
+    """Async ``create_user``."""
+    user = User(**schema.model_dump())
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
 def get_user_by_id(db: Session, user_id: int) -> User | None:
     """Return a user by their primary key."""
     return db.get(User, user_id)
 
 
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> User | None:
+    """Async ``get_user_by_id``."""
+    return await db.get(User, user_id)
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User | None:
+    """Return the user with the supplied email, or None."""
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
+
 def get_all_users(db: Session) -> list[User]:
     """Return all users."""
     result = db.execute(select(User))
     return result.scalars().all()
 
 
-__all__ = ["create_user", "get_user_by_id", "get_all_users"]
+def get_existing_emails(db: Session, emails: Collection[str]) -> set[str]:
+    """Return which of the supplied emails already belong to a user."""
+    if not emails:
+        return set()
+    result = db.execute(select(User.email).where(User.email.in_(list(emails))))
+    return set(result.scalars())
+
+
+def insert_users(db: Session, rows: Sequence[dict[str, Any]]) -> set[str]:
+    """Insert user rows in one batch and commit; return emails that were taken.
+
+    Callers should filter out known emails first. If a concurrent insert still
+    claims one, the batch is retried row by row so only that row is rejected.
+    """
+    rejected: set[str] = set()
+    if not rows:
+        return rejected
+    try:
+        with db.begin_nested():
+            db.execute(insert(User), list(rows))
+    except IntegrityError:
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(User), [row])
+            except IntegrityError:
+                rejected.add(row["email"])
+    db.commit()
+    return rejected
+
+
+__all__ = [
+    "create_user",
+    "create_user_async",
+    "get_all_users",
+    "get_existing_emails",
+    "get_user_by_email_async",
+    "get_user_by_id",
+    "get_user_by_id_async",
+    "insert_users",
+]
@@ -0,0 +1,170 @@
+"""In-memory mirror of the revoked token table for per-request checks.
+
+Each worker keeps every unexpired revoked ``jti`` in a Bloom filter plus an
+exact dict, refreshed incrementally: at most every ``_SYNC_INTERVAL_SECONDS``
+it reads only rows above the highest id already seen. A Bloom miss proves a
+token was not revoked (as of the last sync) without any further work; on a
+hit the dict answers, and only if the dict no longer holds the id (its entry
+was pruned after expiring) is the database asked. Revocations committed in
+this process are applied immediately through session events; those from
+other workers become visible within one sync interval.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.revoked_token import RevokedToken
+from app.repositories.revoked_token_repo import (
+    get_revocations_after,
+    is_token_revoked,
+)
+
+_SYNC_INTERVAL_SECONDS = 2.0
+# Re-read a few ids below the high-water mark: rows from transactions that
+# committed after a higher id was already seen would otherwise be skipped.
+_SYNC_OVERLAP_IDS = 64
+_INITIAL_CAPACITY = 1_024
+_FALSE_POSITIVE_RATE = 0.001
+_PENDING_KEY = "revocation_pending"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity: int, false_positive_rate: float) -> None:
+        self.capacity = capacity
+        bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self._bits = max(8, bits)
+        self._hashes = max(1, round(self._bits / capacity * math.log(2)))
+        self._array = bytearray((self._bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str) -> list[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self._bits for i in range(self._hashes)]
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self._array[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+def _epoch(value: datetime) -> float:
+    """Return POSIX seconds, reading naive datetimes (SQLite) as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevocationFilter:
+    """Worker-local view of revoked token ids, synced by high-water mark."""
+
+    def __init__(
+        self,
+        sync_interval_seconds: float = _SYNC_INTERVAL_SECONDS,
+        initial_capacity: int = _INITIAL_CAPACITY,
+    ) -> None:
+        self._sync_interval = sync_interval_seconds
+        self._initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget everything and re-read the whole table on next use."""
+        with self._lock:
+            self._bloom = BloomFilter(self._initial_capacity, _FALSE_POSITIVE_RATE)
+            self._expiries: dict[str, float] = {}
+            self._high_water = 0
+            self._synced_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """Mirror one revocation without waiting for the next sync."""
+        with self._lock:
+            self._add(jti, _epoch(expires_at))
+
+    def sync(self, db: Session) -> None:
+        """Read revocations above the high-water mark and prune expired ids."""
+        rows = get_revocations_after(db, max(0, self._high_water - _SYNC_OVERLAP_IDS))
+        now = time.time()
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._add(jti, _epoch(expires_at))
+                self._high_water = max(self._high_water, row_id)
+            expired = [jti for jti, expiry in self._expiries.items() if expiry <= now]
+            for jti in expired:
+                del self._expiries[jti]
+            self._synced_at = time.monotonic()
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        """Return True when the token id has been revoked."""
+        synced_at = self._synced_at
+        if synced_at is None or time.monotonic() - synced_at > self._sync_interval:
+            self.sync(db)
+        if jti not in self._bloom:
+            return False
+        if jti in self._expiries:
+            return True
+        # Bloom false positive, or an entry pruned after its token expired.
+        return is_token_revoked(db, jti)
+
+    def _add(self, jti: str, expiry: float) -> None:
+        if jti in self._expiries:
+            return
+        self._expiries[jti] = expiry
+        self._bloom.add(jti)
+        if self._bloom.count > self._bloom.capacity:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Resize the Bloom filter to the live ids, dropping pruned ones."""
+        capacity = max(self._initial_capacity, 2 * len(self._expiries))
+        bloom = BloomFilter(capacity, _FALSE_POSITIVE_RATE)
+        for jti in self._expiries:
+            bloom.add(jti)
+        self._bloom = bloom
+
+
+revocation_filter = RevocationFilter()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_revocations(session: Session, _flush_context: object) -> None:
+    """Snapshot flushed revocations so they can be mirrored after commit."""
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, RevokedToken):
+            pending.append((obj.jti, obj.expires_at))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_revocations(session: Session) -> None:
+    """Mirror committed revocations into this worker's filter."""
+    for jti, expires_at in session.info.pop(_PENDING_KEY, ()):
+        revocation_filter.add(jti, expires_at)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revocations(session: Session) -> None:
+    """Forget uncommitted revocations."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+__all__ = ["BloomFilter", "RevocationFilter", "revocation_filter"]
@@ -1,17 +1,24 @@
-"""Authentication routes for user registration and login."""
-from __future__ import annotations
+"""Authentication routes for registration, login, tokens and user import.
 
+No ``from __future__ import annotations`` here: slowapi's ``limit`` wrapper
+hides this module's globals, so FastAPI could not resolve string annotations.
+"""
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from jose import JWTError
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import auth as auth_utils
-from app.db import get_db
-from app.models.user import User
+from app.db import get_async_db, get_async_write_db, get_db
+from app.password_hasher import HashingQueueFull, password_hasher
 from app.rate_limiter import limiter
+from app.repositories import user_repo
+from app.schemas.user_schema import UserCreate, UserImportResult
+from app.services.user_import import ImportFormatError, import_users, record_reader
+from app.user_cache import AuthenticatedUser
 
 logger = logging.getLogger("app.auth")
 
@@ -48,48 +55,88 @@ class TokenResponse(BaseModel):
     """Response containing issued JWT credentials."""
 
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
 
 
-def _user_exists(db: Session, email: str) -> bool:
-    """Return True when a user already exists with the supplied email."""
-    result = db.execute(select(User.id).where(User.email == email))
-    return result.scalar_one_or_none() is not None
+class RefreshRequest(BaseModel):
+    """Payload for exchanging or revoking a refresh token."""
+
+    refresh_token: str = Field(min_length=1)
+
+
+def _issue_tokens(user_id: int) -> TokenResponse:
+    """Issue a fresh access and refresh token pair for a user."""
+    subject = str(user_id)
+    return TokenResponse(
+        access_token=auth_utils.create_access_token(subject=subject),
+        refresh_token=auth_utils.create_refresh_token(subject=subject),
+    )
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _hashing_unavailable() -> HTTPException:
+    """Return the fast-fail error used when the hashing pool is saturated."""
+    logger.warning("Password hashing queue is full; shedding request.")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is temporarily overloaded; please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
 
 
 @router.post("/register", response_model=RegisterResponse)
 @limiter.limit("5/minute")
-def register_account(
-    payload: RegisterRequest, db: Session = Depends(get_db)
+async def register_account(
+    request: Request, payload: RegisterRequest, db: AsyncSession = Depends(get_async_db)
 ) -> RegisterResponse:
     """Create a new user account with hashed password storage."""
-    if _user_exists(db, payload.email):
+    existing = await user_repo.get_user_by_email_async(db, payload.email)
+    # End the read so no pooled connection is held while hashing.
+    await db.commit()
+    if existing is not None:
         logger.warning("Registration attempt for existing email: %s", payload.email)
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="An account with that email already exists.",
         )
 
-    hashed_password = auth_utils.get_password_hash(payload.password)
-    user = User(
-        name=payload.name,
-        email=payload.email,
-        hashed_password=hashed_password,
-        phone=payload.phone,
+    try:
+        hashed_password = await password_hasher.hash(payload.password)
+    except HashingQueueFull as exc:
+        raise _hashing_unavailable() from exc
+    user = await user_repo.create_user_async(
+        db,
+        UserCreate(
+            name=payload.name,
+            email=payload.email,
+            hashed_password=hashed_password,
+            phone=payload.phone,
+        ),
     )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
     logger.info("Registered new user: %s", user.email)
     return RegisterResponse.model_validate(user)
 
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("5/minute")
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
+async def login(
+    request: Request, payload: LoginRequest, db: AsyncSession = Depends(get_async_db)
+) -> TokenResponse:
     """Authenticate credentials and issue a bearer token."""
-    user = auth_utils.authenticate_user(db, payload.email, payload.password)
+    try:
+        user = await auth_utils.authenticate_user_async(
+            db, payload.email, payload.password
+        )
+    except HashingQueueFull as exc:
+        raise _hashing_unavailable() from exc
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -97,6 +144,102 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    token = auth_utils.create_access_token(subject=str(user.id))
     logger.info("Successfully authenticated user: %s", user.email)
-    return TokenResponse(access_token=token)
+    return _issue_tokens(user.id)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+@limiter.limit("30/minute")
+async def refresh(
+    request: Request,
+    payload: RefreshRequest,
+    db: AsyncSession = Depends(get_async_write_db),
+) -> TokenResponse:
+    """Exchange a refresh token for a new token pair, revoking the old one.
+
+    Each refresh token is single use: presenting one that was already
+    exchanged or revoked fails.
+    """
+    try:
+        claims = auth_utils.decode_token(
+            payload.refresh_token, auth_utils.REFRESH_TOKEN_TYPE
+        )
+        user_id = int(claims.get("sub"))
+    except (JWTError, TypeError, ValueError) as exc:
+        logger.warning("Refresh token rejected: %s", exc)
+        raise _invalid_refresh_token() from exc
+
+    if not await db.run_sync(auth_utils.revoke_token_claims, claims):
+        logger.warning("Refresh token reuse for user: %s", user_id)
+        raise _invalid_refresh_token()
+    if await user_repo.get_user_by_id_async(db, user_id) is None:
+        logger.warning("Refresh token subject not found: %s", user_id)
+        raise _invalid_refresh_token()
+    await db.commit()
+    return _issue_tokens(user_id)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token: str = Depends(auth_utils.oauth2_scheme),
+    payload: RefreshRequest | None = None,
+    db: AsyncSession = Depends(get_async_write_db),
+) -> Response:
+    """Revoke the caller's access token and, if supplied, its refresh token."""
+    try:
+        access_claims = auth_utils.decode_token(token, auth_utils.ACCESS_TOKEN_TYPE)
+    except JWTError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from exc
+    await db.run_sync(auth_utils.revoke_token_claims, access_claims)
+
+    if payload is not None:
+        try:
+            refresh_claims = auth_utils.decode_token(
+                payload.refresh_token, auth_utils.REFRESH_TOKEN_TYPE
+            )
+        except JWTError as exc:
+            raise _invalid_refresh_token() from exc
+        if refresh_claims.get("sub") != access_claims.get("sub"):
+            raise _invalid_refresh_token()
+        await db.run_sync(auth_utils.revoke_token_claims, refresh_claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/users/bulk", response_model=UserImportResult)
+@limiter.limit("10/minute")
+async def bulk_create_users(
+    request: Request,
+    admin: AuthenticatedUser = Depends(auth_utils.get_current_admin),
+    db: Session = Depends(get_db),
+) -> UserImportResult:
+    """Create accounts from a streamed CSV or NDJSON body (admins only).
+
+    CSV needs a header row with ``name`` and ``email`` plus ``password`` or
+    ``password_hash``; ``phone`` is optional. NDJSON takes one object per
+    line with the same fields. Rejected lines are listed with their line
+    number while every other line is still imported.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    reader = record_reader(media_type.lower())
+    if reader is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson.",
+        )
+    try:
+        result = await import_users(db, reader(request.stream()), password_hasher)
+    except ImportFormatError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    logger.info(
+        "Admin %s imported %s users (%s rejected)",
+        admin.id,
+        result.created,
+        result.failed,
+    )
+    return result
@@ -1,18 +1,244 @@
 """Router for bike-related API endpoints."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Any
 
-from app.db import get_db
-from app.repositories.bike_repo import get_available_bikes
-from app.schemas.bike_schema import BikeRead
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.catalog_cache import CatalogPage, catalog_cache
+from app.compression import COMPRESSION_MINIMUM_SIZE, negotiate_encoding
+from app.db import get_async_db, get_read_db, reads_own_writes
+from app.models.bike import AvailabilityStatus
+from app.repositories.bike_repo import (
+    bike_sort_key,
+    get_available_bike_rows_async,
+    get_bikes_available_between_async,
+    get_bikes_by_ids_async,
+)
+from app.schemas.bike_schema import (
+    BIKE_READ_LIST,
+    BikeCalendarRow,
+    BikeNearbyRead,
+    BikeRead,
+    BikeSort,
+    FleetCalendarRead,
+)
+from app.services import rental_service
+from app.services.booking_calendar import (
+    HORIZON_DAYS,
+    free_run_starts,
+    get_booking_calendar,
+    render_booked_days,
+)
+from app.services.pagination import (
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
+from app.services.spatial_index import get_bike_index
 
 router = APIRouter(prefix="/api/bikes", tags=["bikes"])
 
+_DEFAULT_PAGE_SIZE = 50
+_MAX_PAGE_SIZE = 200
+# JSON type of each sort column's value in a cursor; the id tiebreaker is int.
+_SORT_FIELD_TYPES: dict[str, type] = {"rate_per_day_cents": int, "name": str}
+_DEFAULT_NEARBY_LIMIT = 20
+_MAX_NEARBY_LIMIT = 100
+_MAX_NEARBY_RADIUS_M = 50_000
+
+
+def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
+    """Return responses that adhere to the shared error contract."""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"code": code, "message": message}},
+    )
+
+
+def _decode_bike_cursor(cursor: str, sort: BikeSort) -> list[Any]:
+    """Decode a bike listing cursor and check it carries a full sort key."""
+    key = decode_cursor(cursor, scope=f"bikes:{sort.value}")
+    expected_types: tuple[type, ...] = (int,)
+    if sort.field != "id":
+        expected_types = (_SORT_FIELD_TYPES[sort.field], int)
+    if len(key) != len(expected_types) or not all(
+        isinstance(value, expected) and not isinstance(value, bool)
+        for value, expected in zip(key, expected_types)
+    ):
+        raise ValueError("cursor is malformed")
+    return key
+
 
 @router.get("", response_model=list[BikeRead])
-def list_available_bikes(db: Session = Depends(get_db)) -> list[BikeRead]:
-    """Return all bikes currently available for rental."""
-    return get_available_bikes(db)
+async def list_available_bikes(
+    request: Request,
+    bike_type: str | None = Query(default=None, alias="type"),
+    min_rate_cents: int | None = Query(default=None, ge=0),
+    max_rate_cents: int | None = Query(default=None, ge=0),
+    sort: BikeSort = BikeSort.ID,
+    cursor: str | None = None,
+    limit: int = Query(default=_DEFAULT_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+) -> Response:
+    """
+    Return one page of bikes currently available for rental.
+
+    When more results exist, the opaque cursor for the next page is returned in
+    the ``X-Next-Cursor`` response header; pass it back as ``cursor`` together
+    with the same ``sort`` to continue. Pages are served from ``catalog_cache``
+    until the inventory changes, compressed once per accepted encoding, except
+    to callers reading their own recent writes from the primary.
+    """
+    if (
+        min_rate_cents is not None
+        and max_rate_cents is not None
+        and min_rate_cents > max_rate_cents
+    ):
+        return _error_response(
+            status.HTTP_400_BAD_REQUEST,
+            "INVALID_FILTER",
+            "min_rate_cents must not exceed max_rate_cents",
+        )
+
+    key = (bike_type, min_rate_cents, max_rate_cents, sort.value, cursor, limit)
+    # Cached pages may come from a replica that lags this caller's own write.
+    use_cache = not reads_own_writes(request)
+    page = catalog_cache.get(key) if use_cache else None
+    if page is None:
+        after = None
+        if cursor is not None:
+            try:
+                after = _decode_bike_cursor(cursor, sort)
+            except ValueError as exc:
+                return _error_response(
+                    status.HTTP_400_BAD_REQUEST, "INVALID_CURSOR", str(exc)
+                )
+
+        version = catalog_cache.version
+        rows = await get_available_bike_rows_async(
+            db,
+            bike_type=bike_type,
+            min_rate_cents=min_rate_cents,
+            max_rate_cents=max_rate_cents,
+            sort=sort,
+            after=after,
+            limit=limit + 1,
+        )
+        bikes = BIKE_READ_LIST.validate_python(rows)
+        next_cursor = None
+        if len(bikes) > limit:
+            bikes = bikes[:limit]
+            next_cursor = encode_cursor(
+                f"bikes:{sort.value}", bike_sort_key(bikes[-1], sort)
+            )
+        page = CatalogPage(
+            BIKE_READ_LIST.dump_json(bikes), next_cursor, version, {}
+        )
+        if use_cache:
+            catalog_cache.put(key, page)
+
+    body = page.body
+    headers = {"Vary": "Accept-Encoding"}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None and len(body) >= COMPRESSION_MINIMUM_SIZE:
+        body = page.encoded(encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/nearby", response_model=list[BikeNearbyRead])
+async def list_nearby_bikes(
+    lat: float = Query(ge=-90, le=90),
+    lng: float = Query(ge=-180, le=180),
+    radius: float | None = Query(default=None, gt=0, le=_MAX_NEARBY_RADIUS_M),
+    limit: int = Query(default=_DEFAULT_NEARBY_LIMIT, ge=1, le=_MAX_NEARBY_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+) -> list[BikeNearbyRead]:
+    """
+    Return available bikes nearest to a point, closest first.
+
+    ``radius`` (metres) restricts results to bikes within that distance; when
+    omitted the ``limit`` nearest bikes are returned regardless of distance.
+    """
+    # The index loads through a sync session only when it is stale.
+    index = await db.run_sync(get_bike_index)
+    matches = index.nearby(lat, lng, limit=limit, radius_m=radius)
+    bike_ids = [bike_id for bike_id, _ in matches]
+    bikes = {bike.id: bike for bike in await get_bikes_by_ids_async(db, bike_ids)}
+
+    results: list[BikeNearbyRead] = []
+    for bike_id, distance_m in matches:
+        bike = bikes.get(bike_id)
+        # The index may briefly lag writes made by other workers.
+        if bike is None or bike.availability_status != AvailabilityStatus.AVAILABLE:
+            continue
+        results.append(
+            BikeNearbyRead(
+                **BikeRead.model_validate(bike).model_dump(),
+                lat=bike.lat,
+                lng=bike.lng,
+                distance_m=round(distance_m, 1),
+            )
+        )
+    return results
+
+
+@router.get("/available", response_model=list[BikeRead])
+async def list_bikes_available_between(
+    start: date, end: date, db: AsyncSession = Depends(get_async_db)
+) -> list[BikeRead] | JSONResponse:
+    """Return every available bike with no booking overlapping [start, end)."""
+    try:
+        rental_service.validate_range(start, end)
+    except ValueError as exc:
+        return _error_response(status.HTTP_400_BAD_REQUEST, "INVALID_RANGE", str(exc))
+    return await get_bikes_available_between_async(db, start, end)
+
+
+@router.get("/calendar", response_model=FleetCalendarRead)
+async def get_fleet_calendar(
+    days: int = Query(default=HORIZON_DAYS, ge=1, le=HORIZON_DAYS),
+    free_days: int | None = Query(default=None, ge=1, le=HORIZON_DAYS),
+    bike_id: list[int] | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> FleetCalendarRead:
+    """
+    Return which of the next ``days`` days each available bike is booked.
+
+    With ``free_days`` only bikes having that many consecutive free days in the
+    window are returned, along with the first day such a run starts.
+    """
+    calendar = await db.run_sync(get_booking_calendar)
+    bike_ids, booked = calendar.snapshot(bike_id)
+    booked = booked[:days]
+
+    first_free: list[int | None] = [None] * len(bike_ids)
+    if free_days is not None:
+        run_starts = free_run_starts(booked, free_days)
+        has_run = run_starts.any(axis=0)
+        bike_ids, booked = bike_ids[has_run], booked[:, has_run]
+        first_free = run_starts[:, has_run].argmax(axis=0).tolist()
 
+    start = calendar.origin
+    return FleetCalendarRead(
+        start=start,
+        days=days,
+        bikes=[
+            BikeCalendarRow(
+                bike_id=row_bike_id,
+                booked=row_booked,
+                first_free_start=(
+                    None if offset is None else start + timedelta(days=offset)
+                ),
+            )
+            for row_bike_id, row_booked, offset in zip(
+                bike_ids.tolist(), render_booked_days(booked), first_free
+            )
+        ],
+    )
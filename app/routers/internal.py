@@ -0,0 +1,86 @@
+"""Router for internal operational endpoints, kept out of the public schema."""
+from __future__ import annotations
+
+import os
+import secrets
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.pool_metrics import pool_metrics
+
+router = APIRouter(prefix="/internal", tags=["internal"], include_in_schema=False)
+
+# Bearer token required by the metrics routes. When unset they are disabled:
+# behind a reverse proxy every request appears to come from the local host,
+# so the client address cannot stand in for a token.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+class CheckoutWaitStats(BaseModel):
+    """Time spent waiting for a pooled connection, with cumulative buckets."""
+
+    count: int
+    total_seconds: float
+    max_seconds: float
+    buckets: dict[str, int]
+
+
+class PoolStats(BaseModel):
+    """Configuration, gauges and counters of one connection pool."""
+
+    name: str
+    pool_class: str | None
+    size: int | None
+    max_overflow: int | None
+    timeout: float | None
+    checked_out: int | None
+    checked_in: int | None
+    overflow: int
+    in_use: int
+    peak_in_use: int
+    checkouts: int
+    checkout_timeouts: int
+    connections_opened: int
+    invalidations: int
+    checkout_wait: CheckoutWaitStats
+
+
+class PoolMetricsResponse(BaseModel):
+    """Pool statistics of the worker process that served the request."""
+
+    pid: int
+    pools: list[PoolStats]
+
+
+def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
+    """Return responses that adhere to the shared error contract."""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"code": code, "message": message}},
+    )
+
+
+def _metrics_allowed(request: Request) -> bool:
+    if not METRICS_TOKEN:
+        return False
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and secrets.compare_digest(
+        token.encode(), METRICS_TOKEN.encode()
+    )
+
+
+@router.get("/metrics/pool", response_model=PoolMetricsResponse)
+async def get_pool_metrics(request: Request) -> PoolMetricsResponse | JSONResponse:
+    """Report connection pool checkout wait, usage and overflow per engine."""
+    if not _metrics_allowed(request):
+        return _error_response(
+            status.HTTP_403_FORBIDDEN,
+            "FORBIDDEN",
+            "Metrics are only available to internal callers.",
+        )
+    return PoolMetricsResponse(
+        pid=os.getpid(),
+        pools=[PoolStats(**metrics.snapshot()) for metrics in pool_metrics.values()],
+    )
@@ -4,14 +4,14 @@ from __future__ import annotations
 import uuid
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, PositiveInt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user
-from app.db import get_db
-from app.models.user import User
+from app.auth import get_current_user_async
+from app.db import get_async_db
+from app.user_cache import AuthenticatedUser
 
 router = APIRouter(prefix="/api/payments", tags=["payments"])
 
@@ -34,10 +34,11 @@ class PaymentResponse(BaseModel):
     detail: str = "Payment processed successfully (stub)."
 
 
-def _require_authenticated_user(
+async def _require_authenticated_user(
+    request: Request,
     token: Annotated[str | None, Depends(_oauth2_optional)],
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_async_db),
+) -> AuthenticatedUser:
     """Return the authenticated user or raise 403 when unavailable."""
     if not token:
         raise HTTPException(
@@ -45,7 +46,7 @@ def _require_authenticated_user(
         )
 
     try:
-        return get_current_user(token=token, db=db)
+        return await get_current_user_async(request, token=token, db=db)
     except HTTPException as exc:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=_AUTH_REQUIRED_DETAIL
@@ -53,9 +54,9 @@ def _require_authenticated_user(
 
 
 @router.post("", response_model=PaymentResponse)
-def process_payment(
+async def process_payment(
     payload: PaymentRequest,
-    current_user: User = Depends(_require_authenticated_user),
+    current_user: AuthenticatedUser = Depends(_require_authenticated_user),
 ) -> PaymentResponse:
     """Simulate payment processing for authenticated users only."""
     transaction_id = f"stub-{uuid.uuid4().hex[:12]}"
@@ -0,0 +1,68 @@
+"""Router for rental price quote endpoints."""
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_db
+from app.repositories.bike_repo import get_bike_rates_async
+from app.schemas.quote_schema import BikeQuote, QuoteRead, QuoteRequest, QuoteWindowRead
+from app.services import rental_service
+from app.services.pricing import get_pricing_table_async
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+
+def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
+    """Return responses that adhere to the shared error contract."""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"code": code, "message": message}},
+    )
+
+
+@router.post("", response_model=QuoteRead)
+async def create_quotes(
+    payload: QuoteRequest, db: AsyncSession = Depends(get_async_db)
+) -> QuoteRead | JSONResponse:
+    """
+    Price every requested bike over every requested window in one pass.
+
+    Unknown bike ids are left out of the result. Pricing rules come from an
+    in-process cache, so the only per-request query loads the bikes' rates.
+    """
+    windows: list[QuoteWindowRead] = []
+    for index, window in enumerate(payload.windows):
+        try:
+            days = rental_service.validate_range(window.start_date, window.end_date)
+        except ValueError as exc:
+            return _error_response(
+                status.HTTP_400_BAD_REQUEST, "INVALID_RANGE", f"windows[{index}]: {exc}"
+            )
+        windows.append(QuoteWindowRead(**window.model_dump(), days=days))
+
+    rates = {
+        bike_id: (bike_type, rate)
+        for bike_id, bike_type, rate in await get_bike_rates_async(db, payload.bike_ids)
+    }
+    bike_ids = [
+        bike_id for bike_id in dict.fromkeys(payload.bike_ids) if bike_id in rates
+    ]
+    if not bike_ids:
+        return QuoteRead(windows=windows, quotes=[])
+
+    pricing_table = await get_pricing_table_async(db)
+    prices = pricing_table.quote(
+        [rates[bike_id][1] for bike_id in bike_ids],
+        [rates[bike_id][0] for bike_id in bike_ids],
+        [window.start_date for window in windows],
+        [window.end_date for window in windows],
+    )
+    return QuoteRead(
+        windows=windows,
+        quotes=[
+            BikeQuote(bike_id=bike_id, total_price_cents=row)
+            for bike_id, row in zip(bike_ids, prices.tolist())
+        ],
+    )
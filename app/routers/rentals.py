@@ -1,19 +1,38 @@
 """Router for rental-related API endpoints."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, status
+from collections import defaultdict
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Response, status
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user
-from app.db import get_db
-from app.models.user import User
+from app.auth import get_current_user_async
+from app.db import get_async_db, get_async_write_db, get_read_db
 from app.repositories import bike_repo, rental_repo
-from app.schemas.rental_schema import RentalCreate, RentalRead
+from app.schemas.rental_schema import (
+    RENTAL_WITH_BIKE_READ_LIST,
+    RentalBatchCreate,
+    RentalBatchError,
+    RentalBatchItemResult,
+    RentalBatchRead,
+    RentalCreate,
+    RentalRead,
+    RentalWithBikeRead,
+)
 from app.services import rental_service
+from app.services.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.services.pricing import get_pricing_table_async
+from app.user_cache import AuthenticatedUser
 
 router = APIRouter(prefix="/api/rentals", tags=["rentals"])
 
+_MAX_RESERVATION_ATTEMPTS = 5
+_DEFAULT_PAGE_SIZE = 20
+_MAX_PAGE_SIZE = 100
+_CURSOR_SCOPE = "rentals:-created_at"
+
 
 def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
     """Return responses that adhere to the shared error contract."""
@@ -23,51 +42,258 @@ def _error_response(status_code: int, code: str, message: str) -> JSONResponse:
     )
 
 
+@router.get("", response_model=list[RentalWithBikeRead])
+async def list_my_rentals(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(default=_DEFAULT_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_async),
+) -> list[RentalWithBikeRead] | JSONResponse:
+    """
+    Return one page of the current user's rentals, newest first.
+
+    Each rental includes its bike. When more results exist, the cursor for the
+    next page is returned in the ``X-Next-Cursor`` response header.
+    """
+    after_id = None
+    if cursor is not None:
+        try:
+            key = decode_cursor(cursor, scope=_CURSOR_SCOPE)
+        except ValueError as exc:
+            return _error_response(
+                status.HTTP_400_BAD_REQUEST, "INVALID_CURSOR", str(exc)
+            )
+        if len(key) != 1 or not isinstance(key[0], int):
+            return _error_response(
+                status.HTTP_400_BAD_REQUEST, "INVALID_CURSOR", "cursor is malformed"
+            )
+        after_id = key[0]
+
+    rows = await rental_repo.get_rental_rows_for_user_async(
+        db, current_user.id, after_id=after_id, limit=limit + 1
+    )
+    rentals = RENTAL_WITH_BIKE_READ_LIST.validate_python(rows)
+    if len(rentals) > limit:
+        rentals = rentals[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            _CURSOR_SCOPE, [rentals[-1].id]
+        )
+    return rentals
+
+
 @router.post("", response_model=RentalRead)
-def create_rental(
+async def create_rental(
     payload: RentalCreate,
-    db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_write_db),
+    _: AuthenticatedUser = Depends(get_current_user_async),
 ) -> RentalRead | JSONResponse:
     """
     Validate a rental request, compute pricing, and persist the rental record.
+
+    The total is priced by the same ``PricingTable`` as ``POST /api/quotes``.
     """
     try:
-        days = rental_service.validate_range(payload.start_date, payload.end_date)
+        rental_service.validate_range(payload.start_date, payload.end_date)
     except ValueError as exc:
         return _error_response(status.HTTP_400_BAD_REQUEST, "INVALID_RANGE", str(exc))
 
-    bike = bike_repo.get_bike_by_id(db, payload.bike_id)
-    if bike is None:
-        return _error_response(status.HTTP_404_NOT_FOUND, "NOT_FOUND", "Bike not found")
+    pricing_table = await get_pricing_table_async(db)
 
-    try:
-        if not rental_service.is_bike_available(
-            bike, payload.start_date, payload.end_date
-        ):
+    for _ in range(_MAX_RESERVATION_ATTEMPTS):
+        bike = await bike_repo.get_bike_for_update_async(db, payload.bike_id)
+        if bike is None:
             return _error_response(
-                status.HTTP_409_CONFLICT,
-                "UNAVAILABLE",
-                "Bike is not available for the selected dates.",
+                status.HTTP_404_NOT_FOUND, "NOT_FOUND", "Bike not found"
             )
-    except ValueError as exc:
-        return _error_response(status.HTTP_400_BAD_REQUEST, "INVALID_RANGE", str(exc))
 
-    total_price_cents = rental_service.compute_total_price_cents(
-        bike.rate_per_day_cents, days
+        try:
+            if not rental_service.is_bike_available(
+                bike, payload.start_date, payload.end_date
+            ) or await rental_repo.has_overlapping_rental_async(
+                db, bike.id, payload.start_date, payload.end_date
+            ):
+                return _error_response(
+                    status.HTTP_409_CONFLICT,
+                    "UNAVAILABLE",
+                    "Bike is not available for the selected dates.",
+                )
+        except ValueError as exc:
+            return _error_response(
+                status.HTTP_400_BAD_REQUEST, "INVALID_RANGE", str(exc)
+            )
+
+        (total_price_cents,) = pricing_table.totals(
+            [bike.rate_per_day_cents],
+            [bike.type],
+            [payload.start_date],
+            [payload.end_date],
+        ).tolist()
+
+        create_schema = payload.model_copy(
+            update={"total_price_cents": total_price_cents}
+        )
+        rental = await rental_repo.reserve_rental_async(
+            db, create_schema, bike.version
+        )
+        if rental is not None:
+            return rental
+        # Another booking for this bike committed first; re-check and retry.
+
+    return _error_response(
+        status.HTTP_409_CONFLICT,
+        "CONFLICT",
+        "Bike is being booked by another request; please retry.",
     )
 
-    create_schema = payload.model_copy(update={"total_price_cents": total_price_cents})
-    rental = rental_repo.create_rental(db, create_schema)
-    return rental
+
+def _batch_rejection(
+    item_count: int, errors: dict[int, tuple[int, str, str]]
+) -> JSONResponse:
+    """Reject a whole batch, reporting each item's outcome at its index.
+
+    The HTTP status is that of the first failing item.
+    """
+    first_status = errors[min(errors)][0]
+    results = []
+    for index in range(item_count):
+        if index in errors:
+            _, code, message = errors[index]
+            result = RentalBatchItemResult(
+                index=index,
+                status="error",
+                error=RentalBatchError(code=code, message=message),
+            )
+        else:
+            result = RentalBatchItemResult(index=index, status="valid")
+        results.append(result.model_dump(mode="json"))
+    return JSONResponse(
+        status_code=first_status,
+        content={
+            "error": {
+                "code": "BATCH_REJECTED",
+                "message": f"{len(errors)} of {item_count} items were rejected; "
+                "no rentals were created.",
+            },
+            "results": results,
+        },
+    )
+
+
+@router.post("/batch", response_model=RentalBatchRead)
+async def create_rental_batch(
+    payload: RentalBatchCreate,
+    db: AsyncSession = Depends(get_async_write_db),
+    _: AuthenticatedUser = Depends(get_current_user_async),
+) -> RentalBatchRead | JSONResponse:
+    """
+    Create several rentals in one transaction, all or nothing.
+
+    Bikes are loaded with one query and existing bookings with another; items
+    are also checked against each other. If any item fails, nothing is written
+    and every item's outcome is reported.
+    """
+    items = payload.items
+    range_errors: dict[int, tuple[int, str, str]] = {}
+    days: dict[int, int] = {}
+    for index, item in enumerate(items):
+        try:
+            days[index] = rental_service.validate_range(item.start_date, item.end_date)
+        except ValueError as exc:
+            range_errors[index] = (
+                status.HTTP_400_BAD_REQUEST,
+                "INVALID_RANGE",
+                str(exc),
+            )
+
+    bike_ids = sorted({items[index].bike_id for index in days})
+    pricing_table = await get_pricing_table_async(db)
+    for _ in range(_MAX_RESERVATION_ATTEMPTS):
+        errors = dict(range_errors)
+        bikes = {
+            bike.id: bike
+            for bike in await bike_repo.get_bikes_for_update_async(db, bike_ids)
+        }
+        booked: defaultdict[int, list[tuple[date, date | None]]] = defaultdict(list)
+        if days:
+            window_start = min(items[index].start_date for index in days)
+            window_end = max(items[index].end_date for index in days)
+            overlapping = await rental_repo.get_overlapping_rentals_async(
+                db, list(bikes), window_start, window_end
+            )
+            for bike_id, start_date, end_date in overlapping:
+                booked[bike_id].append((start_date, end_date))
+
+        for index in days:
+            item = items[index]
+            bike = bikes.get(item.bike_id)
+            if bike is None:
+                errors[index] = (
+                    status.HTTP_404_NOT_FOUND,
+                    "NOT_FOUND",
+                    "Bike not found",
+                )
+                continue
+            windows = booked[bike.id]
+            if not rental_service.is_bike_available(
+                bike, item.start_date, item.end_date
+            ) or any(
+                rental_service.windows_overlap(
+                    item.start_date, item.end_date, other_start, other_end
+                )
+                for other_start, other_end in windows
+            ):
+                errors[index] = (
+                    status.HTTP_409_CONFLICT,
+                    "UNAVAILABLE",
+                    "Bike is not available for the selected dates.",
+                )
+                continue
+            # Later items in the batch must not overlap this one either.
+            windows.append((item.start_date, item.end_date))
+
+        if errors:
+            return _batch_rejection(len(items), errors)
+
+        totals = pricing_table.totals(
+            [bikes[item.bike_id].rate_per_day_cents for item in items],
+            [bikes[item.bike_id].type for item in items],
+            [item.start_date for item in items],
+            [item.end_date for item in items],
+        ).tolist()
+        schemas = [
+            item.model_copy(update={"total_price_cents": total})
+            for item, total in zip(items, totals)
+        ]
+        rentals = await rental_repo.reserve_rentals_async(
+            db, schemas, {bike_id: bikes[bike_id].version for bike_id in bike_ids}
+        )
+        if rentals is not None:
+            return RentalBatchRead(
+                results=[
+                    RentalBatchItemResult(
+                        index=index,
+                        status="created",
+                        rental=RentalRead.model_validate(rental),
+                    )
+                    for index, rental in enumerate(rentals)
+                ]
+            )
+        # A bike in the batch was booked concurrently; re-check and retry.
+
+    return _error_response(
+        status.HTTP_409_CONFLICT,
+        "CONFLICT",
+        "Bikes are being booked by another request; please retry.",
+    )
 
 
 @router.get("/{rental_id}", response_model=RentalRead)
-def get_rental(
-    rental_id: int, db: Session = Depends(get_db)
+async def get_rental(
+    rental_id: int, db: AsyncSession = Depends(get_read_db)
 ) -> RentalRead | JSONResponse:
     """Retrieve a rental record by its identifier."""
-    rental = rental_repo.get_rental_by_id(db, rental_id)
+    rental = await rental_repo.get_rental_by_id_async(db, rental_id)
     if rental is None:
         return _error_response(
             status.HTTP_404_NOT_FOUND, "NOT_FOUND", "Rental not found"
@@ -1,7 +1,10 @@
 """Pydantic schemas for bike data transfer."""
 from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict
+from datetime import date
+from enum import Enum
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from app.models.bike import AvailabilityStatus
 
@@ -13,6 +16,8 @@ class BikeCreate(BaseModel):
     type: str
     rate_per_day_cents: int
     availability_status: AvailabilityStatus
+    lat: float | None = Field(default=None, ge=-90, le=90)
+    lng: float | None = Field(default=None, ge=-180, le=180)
 
 
 class BikeRead(BaseModel):
@@ -27,4 +32,61 @@ class BikeRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-__all__ = ["BikeCreate", "BikeRead"]
+# Validates a whole listing in one call; build it once, it compiles a validator.
+BIKE_READ_LIST: TypeAdapter[list[BikeRead]] = TypeAdapter(list[BikeRead])
+
+
+class BikeNearbyRead(BikeRead):
+    """Schema for a bike returned from a location search, with its distance."""
+
+    lat: float
+    lng: float
+    distance_m: float
+
+
+class BikeCalendarRow(BaseModel):
+    """Booked days for one bike; ``booked`` holds one '1'/'0' character per day."""
+
+    bike_id: int
+    booked: str
+    first_free_start: date | None = None
+
+
+class FleetCalendarRead(BaseModel):
+    """Day-by-bike booking calendar starting at ``start`` for ``days`` days."""
+
+    start: date
+    days: int
+    bikes: list[BikeCalendarRow]
+
+
+class BikeSort(str, Enum):
+    """Supported sort orders for bike listings; a leading '-' sorts descending."""
+
+    ID = "id"
+    ID_DESC = "-id"
+    RATE = "rate_per_day_cents"
+    RATE_DESC = "-rate_per_day_cents"
+    NAME = "name"
+    NAME_DESC = "-name"
+
+    @property
+    def field(self) -> str:
+        """Return the column name this sort order applies to."""
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        """Return True when the sort order is descending."""
+        return self.value.startswith("-")
+
+
+__all__ = [
+    "BIKE_READ_LIST",
+    "BikeCalendarRow",
+    "BikeCreate",
+    "BikeNearbyRead",
+    "BikeRead",
+    "BikeSort",
+    "FleetCalendarRead",
+]
@@ -0,0 +1,49 @@
+"""Pydantic schemas for rental price quotes."""
+from __future__ import annotations
+
+from datetime import date
+
+from pydantic import BaseModel, Field
+
+
+class QuoteWindow(BaseModel):
+    """Rental date window to price, as a half-open [start_date, end_date)."""
+
+    start_date: date
+    end_date: date
+
+
+class QuoteRequest(BaseModel):
+    """Schema for pricing every listed bike over every listed window."""
+
+    bike_ids: list[int] = Field(min_length=1, max_length=500)
+    windows: list[QuoteWindow] = Field(min_length=1, max_length=20)
+
+
+class QuoteWindowRead(QuoteWindow):
+    """Priced window with its rental length in days."""
+
+    days: int
+
+
+class BikeQuote(BaseModel):
+    """Total prices for one bike, one entry per requested window."""
+
+    bike_id: int
+    total_price_cents: list[int]
+
+
+class QuoteRead(BaseModel):
+    """Quotes for the requested bikes that exist, in request order."""
+
+    windows: list[QuoteWindowRead]
+    quotes: list[BikeQuote]
+
+
+__all__ = [
+    "BikeQuote",
+    "QuoteRead",
+    "QuoteRequest",
+    "QuoteWindow",
+    "QuoteWindowRead",
+]
@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 from datetime import date, datetime
+from typing import Literal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from app.schemas.bike_schema import BikeRead
 
 
 class RentalCreate(BaseModel):
@@ -30,4 +33,52 @@ class RentalRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-__all__ = ["RentalCreate", "RentalRead"]
+class RentalWithBikeRead(RentalRead):
+    """Schema for reading a rental together with its bike."""
+
+    bike: BikeRead
+
+
+RENTAL_WITH_BIKE_READ_LIST: TypeAdapter[list[RentalWithBikeRead]] = TypeAdapter(
+    list[RentalWithBikeRead]
+)
+
+
+class RentalBatchCreate(BaseModel):
+    """Schema for creating several rentals in one all-or-nothing request."""
+
+    items: list[RentalCreate] = Field(min_length=1, max_length=100)
+
+
+class RentalBatchError(BaseModel):
+    """Error details for a single rejected batch item."""
+
+    code: str
+    message: str
+
+
+class RentalBatchItemResult(BaseModel):
+    """Outcome for one batch item, reported at its request index."""
+
+    index: int
+    status: Literal["created", "valid", "error"]
+    rental: RentalRead | None = None
+    error: RentalBatchError | None = None
+
+
+class RentalBatchRead(BaseModel):
+    """Per-item results of a batch rental request."""
+
+    results: list[RentalBatchItemResult]
+
+
+__all__ = [
+    "RENTAL_WITH_BIKE_READ_LIST",
+    "RentalBatchCreate",
+    "RentalBatchError",
+    "RentalBatchItemResult",
+    "RentalBatchRead",
+    "RentalCreate",
+    "RentalRead",
+    "RentalWithBikeRead",
+]
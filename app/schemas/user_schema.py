@@ -1,7 +1,9 @@
 """Pydantic schemas for user data transfer."""
 from __future__ import annotations
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
+
+from app.password_hasher import pwd_context
 
 
 class UserCreate(BaseModel):
@@ -24,4 +26,51 @@ class UserRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-__all__ = ["UserCreate", "UserRead"]
+class UserImportRow(BaseModel):
+    """One account in a bulk import; exactly one password field is required.
+
+    ``password_hash`` accepts an existing bcrypt hash, for migrations from
+    systems that already store bcrypt, and skips hashing entirely.
+    """
+
+    name: str = Field(min_length=1, max_length=255)
+    email: EmailStr
+    password: str | None = Field(default=None, min_length=8, max_length=128)
+    password_hash: str | None = Field(default=None, max_length=255)
+    phone: str | None = Field(default=None, max_length=50)
+
+    @model_validator(mode="after")
+    def check_password_fields(self) -> UserImportRow:
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError("provide exactly one of password or password_hash")
+        if self.password_hash is not None and pwd_context.identify(
+            self.password_hash, required=False
+        ) is None:
+            raise ValueError("password_hash is not a supported bcrypt hash")
+        return self
+
+
+class UserImportError(BaseModel):
+    """Why one line of a bulk import was not created."""
+
+    line: int
+    email: str | None = None
+    code: str
+    message: str
+
+
+class UserImportResult(BaseModel):
+    """Outcome of a bulk import: counts plus an error per rejected line."""
+
+    created: int = 0
+    failed: int = 0
+    errors: list[UserImportError] = Field(default_factory=list)
+
+
+__all__ = [
+    "UserCreate",
+    "UserImportError",
+    "UserImportResult",
+    "UserImportRow",
+    "UserRead",
+]
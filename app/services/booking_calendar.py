@@ -0,0 +1,283 @@
+"""Precomputed day-by-bike booking bitmap for the fleet availability calendar.
+
+The calendar holds a ``(days, bikes)`` boolean NumPy matrix covering the next
+``HORIZON_DAYS`` days, where ``True`` marks a booked day. It is loaded lazily
+from the database, updated incrementally from committed rentals and bike
+writes through session events, and reloaded when the day rolls over or after
+``_MAX_AGE_SECONDS`` so other workers' writes are picked up. Range questions
+such as "free for N consecutive days" are answered with a cumulative sum over
+the day axis instead of walking rentals.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+import numpy as np
+from numpy.typing import NDArray
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.rental import Rental
+from app.repositories.bike_repo import get_bike_statuses
+from app.repositories.rental_repo import get_rental_windows_between
+
+HORIZON_DAYS = 90
+_MAX_AGE_SECONDS = 60.0
+_INITIAL_CAPACITY = 64
+_PENDING_KEY = "booking_calendar_pending"
+
+RentalWindow = tuple[int, date, date | None]
+
+
+class BookingCalendar:
+    """Booked-day bitmap for every bike over a fixed horizon from an origin day."""
+
+    def __init__(
+        self,
+        horizon_days: int = HORIZON_DAYS,
+        max_age_seconds: float = _MAX_AGE_SECONDS,
+    ) -> None:
+        self._horizon = horizon_days
+        self._max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._origin: date | None = None
+        self._loaded_at: float | None = None
+        self._columns: dict[int, int] = {}
+        self._bike_ids = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+        self._available = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._booked = np.zeros((horizon_days, _INITIAL_CAPACITY), dtype=bool)
+
+    @property
+    def horizon_days(self) -> int:
+        return self._horizon
+
+    @property
+    def origin(self) -> date | None:
+        return self._origin
+
+    def is_stale(self, today: date) -> bool:
+        """Return True when never loaded, loaded on another day, or too old."""
+        loaded_at = self._loaded_at
+        return (
+            loaded_at is None
+            or self._origin != today
+            or time.monotonic() - loaded_at > self._max_age_seconds
+        )
+
+    def clear(self) -> None:
+        """Drop all state and force a reload on next use."""
+        with self._lock:
+            self._origin = None
+            self._loaded_at = None
+            self._columns = {}
+
+    def load(
+        self,
+        origin: date,
+        bikes: Iterable[tuple[int, bool]],
+        rentals: Iterable[RentalWindow],
+    ) -> None:
+        """Rebuild the bitmap from (bike_id, is_available) and rental windows."""
+        bike_rows = list(bikes)
+        capacity = max(_INITIAL_CAPACITY, len(bike_rows))
+        bike_ids = np.zeros(capacity, dtype=np.int64)
+        available = np.zeros(capacity, dtype=bool)
+        if bike_rows:
+            bike_ids[: len(bike_rows)], available[: len(bike_rows)] = zip(*bike_rows)
+        columns = {bike_id: column for column, (bike_id, _) in enumerate(bike_rows)}
+
+        # Difference array over (day, bike): +1 where a booking starts, -1 after
+        # it ends; a running sum over days then yields the booked mask.
+        delta = np.zeros((self._horizon + 1, capacity), dtype=np.int32)
+        starts: list[int] = []
+        ends: list[int] = []
+        rental_columns: list[int] = []
+        for bike_id, start_date, end_date in rentals:
+            column = columns.get(bike_id)
+            if column is None:
+                continue
+            first = max(0, (start_date - origin).days)
+            last = self._horizon
+            if end_date is not None:
+                last = min(self._horizon, (end_date - origin).days)
+            if first < last:
+                starts.append(first)
+                ends.append(last)
+                rental_columns.append(column)
+        np.add.at(delta, (starts, rental_columns), 1)
+        np.add.at(delta, (ends, rental_columns), -1)
+        booked = np.cumsum(delta[:-1], axis=0) > 0
+
+        with self._lock:
+            self._origin = origin
+            self._columns = columns
+            self._bike_ids = bike_ids
+            self._available = available
+            self._booked = booked
+            self._loaded_at = time.monotonic()
+
+    def set_bike(self, bike_id: int, is_available: bool) -> None:
+        """Add a bike column if missing and record whether it can be rented."""
+        with self._lock:
+            column = self._column(bike_id)
+            self._available[column] = is_available
+
+    def mark_booked(
+        self, bike_id: int, start_date: date, end_date: date | None
+    ) -> None:
+        """Mark the days of [start_date, end_date) as booked for the bike."""
+        with self._lock:
+            if self._origin is None:
+                return
+            first = max(0, (start_date - self._origin).days)
+            last = self._horizon
+            if end_date is not None:
+                last = min(self._horizon, (end_date - self._origin).days)
+            if first < last:
+                column = self._column(bike_id)
+                self._booked[first:last, column] = True
+
+    def snapshot(
+        self, bike_ids: Iterable[int] | None = None
+    ) -> tuple[NDArray[np.int64], NDArray[np.bool_]]:
+        """Return (bike_ids, booked) for available bikes, booked shaped (days, bikes).
+
+        When ``bike_ids`` is given only those (available) bikes are returned.
+        """
+        with self._lock:
+            size = len(self._columns)
+            columns = np.flatnonzero(self._available[:size])
+            if bike_ids is not None:
+                known = [self._columns.get(bike_id) for bike_id in bike_ids]
+                wanted = np.array(
+                    [column for column in known if column is not None], dtype=np.int64
+                )
+                columns = np.intersect1d(columns, wanted)
+            return self._bike_ids[columns], self._booked[:, columns].copy()
+
+    def _column(self, bike_id: int) -> int:
+        column = self._columns.get(bike_id)
+        if column is not None:
+            return column
+        column = len(self._columns)
+        if column == len(self._bike_ids):
+            self._grow()
+        self._columns[bike_id] = column
+        self._bike_ids[column] = bike_id
+        self._available[column] = False
+        self._booked[:, column] = False
+        return column
+
+    def _grow(self) -> None:
+        capacity = len(self._bike_ids) * 2
+        self._bike_ids = np.resize(self._bike_ids, capacity)
+        self._available = np.resize(self._available, capacity)
+        booked = np.zeros((self._horizon, capacity), dtype=bool)
+        booked[:, : self._booked.shape[1]] = self._booked
+        self._booked = booked
+
+
+def free_run_starts(booked: NDArray[np.bool_], run_days: int) -> NDArray[np.bool_]:
+    """Return a (days - run_days + 1, bikes) mask of days starting a free run.
+
+    Entry ``[d, b]`` is True when bike ``b`` has no booking on any of the
+    ``run_days`` days starting at day ``d``.
+    """
+    days = booked.shape[0]
+    if run_days > days:
+        return np.zeros((0, booked.shape[1]), dtype=bool)
+    counts = np.zeros((days + 1, booked.shape[1]), dtype=np.int32)
+    np.cumsum(booked, axis=0, out=counts[1:])
+    return counts[run_days:] - counts[:-run_days] == 0
+
+
+def render_booked_days(booked: NDArray[np.bool_]) -> list[str]:
+    """Render each bike column as a string with one '1' (booked) or '0' per day."""
+    characters = np.where(booked.T, ord("1"), ord("0")).astype(np.uint8)
+    return [row.tobytes().decode("ascii") for row in characters]
+
+
+booking_calendar = BookingCalendar()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_calendar_writes(session: Session, _flush_context: object) -> None:
+    """Snapshot flushed rentals and bikes so they can be applied after commit."""
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, Rental):
+            pending.append(("rental", obj.bike_id, obj.start_date, obj.end_date))
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Bike) and obj.id is not None:
+            is_available = obj.availability_status == AvailabilityStatus.AVAILABLE
+            pending.append(("bike", obj.id, is_available, None))
+    for obj in session.deleted:
+        if isinstance(obj, Bike) and obj.id is not None:
+            pending.append(("bike", obj.id, False, None))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_rental_inserts(orm_execute_state: ORMExecuteState) -> None:
+    """Snapshot rentals written by bulk ``insert(Rental)`` executemany calls."""
+    if not orm_execute_state.is_insert:
+        return
+    if orm_execute_state.statement.table.name != Rental.__tablename__:
+        return
+    parameters = orm_execute_state.parameters
+    rows = parameters if isinstance(parameters, list) else [parameters or {}]
+    pending = orm_execute_state.session.info.setdefault(_PENDING_KEY, [])
+    for row in rows:
+        if "bike_id" in row and "start_date" in row:
+            pending.append(
+                ("rental", row["bike_id"], row["start_date"], row.get("end_date"))
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_calendar_writes(session: Session) -> None:
+    """Apply committed rentals and bike changes to the shared calendar."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or booking_calendar.origin is None:
+        return
+    for kind, bike_id, first, second in pending:
+        if kind == "bike":
+            booking_calendar.set_bike(bike_id, first)
+        else:
+            booking_calendar.mark_booked(bike_id, first, second)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_calendar_writes(session: Session) -> None:
+    """Drop pending changes; force a reload since savepoint scope is unknown."""
+    if session.info.pop(_PENDING_KEY, None):
+        booking_calendar.clear()
+
+
+def get_booking_calendar(db: Session, today: date | None = None) -> BookingCalendar:
+    """Return the shared calendar, (re)loading it from the database when stale."""
+    today = today or date.today()
+    if booking_calendar.is_stale(today):
+        horizon_end = today + timedelta(days=booking_calendar.horizon_days)
+        booking_calendar.load(
+            today,
+            (
+                (bike_id, status == AvailabilityStatus.AVAILABLE)
+                for bike_id, status in get_bike_statuses(db)
+            ),
+            get_rental_windows_between(db, today, horizon_end),
+        )
+    return booking_calendar
+
+
+__all__ = [
+    "BookingCalendar",
+    "HORIZON_DAYS",
+    "booking_calendar",
+    "free_run_starts",
+    "get_booking_calendar",
+    "render_booked_days",
+]
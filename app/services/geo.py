@@ -0,0 +1,91 @@
+"""Great-circle distance helpers vectorized over NumPy arrays.
+
+Distances use the haversine formula on a sphere of the IUGG mean Earth radius.
+Compared with the WGS84 geodesic (geopy's default) the error stays below 0.6%,
+which is well inside what ranking nearby bikes or distance-based pricing needs,
+and whole candidate sets are scored in a single NumPy pass.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Return the great-circle distance in metres between two points."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    half_dphi = (phi2 - phi1) / 2.0
+    half_dlambda = math.radians(lng2 - lng1) / 2.0
+    a = (
+        math.sin(half_dphi) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _as_degrees(values: ArrayLike, name: str) -> NDArray[np.float64]:
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim != 1:
+        raise ValueError(f"{name} must be a one-dimensional array")
+    return array
+
+
+def _haversine(
+    phi1: NDArray[np.float64] | float,
+    lambda1: NDArray[np.float64] | float,
+    phi2: NDArray[np.float64],
+    lambda2: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Vectorized haversine over radians; broadcasting follows NumPy rules."""
+    a = (
+        np.sin((phi2 - phi1) / 2.0) ** 2
+        + np.cos(phi1) * np.cos(phi2) * np.sin((lambda2 - lambda1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distances_from_point(
+    lat: float, lng: float, lats: ArrayLike, lngs: ArrayLike
+) -> NDArray[np.float64]:
+    """Return metres from one point to each of N points given as lat/lng arrays."""
+    lat_array = _as_degrees(lats, "lats")
+    lng_array = _as_degrees(lngs, "lngs")
+    if lat_array.shape != lng_array.shape:
+        raise ValueError("lats and lngs must have the same length")
+    return _haversine(
+        math.radians(lat),
+        math.radians(lng),
+        np.radians(lat_array),
+        np.radians(lng_array),
+    )
+
+
+def pairwise_distances(
+    lats1: ArrayLike, lngs1: ArrayLike, lats2: ArrayLike, lngs2: ArrayLike
+) -> NDArray[np.float64]:
+    """Return metres between N point pairs, element i of set 1 to element i of set 2."""
+    arrays = [
+        _as_degrees(values, name)
+        for values, name in (
+            (lats1, "lats1"),
+            (lngs1, "lngs1"),
+            (lats2, "lats2"),
+            (lngs2, "lngs2"),
+        )
+    ]
+    if len({array.shape for array in arrays}) != 1:
+        raise ValueError("all coordinate arrays must have the same length")
+    return _haversine(*(np.radians(array) for array in arrays))
+
+
+__all__ = [
+    "EARTH_RADIUS_M",
+    "distances_from_point",
+    "haversine_m",
+    "pairwise_distances",
+]
@@ -0,0 +1,33 @@
+"""Opaque cursor helpers for keyset-paginated list endpoints."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(scope: str, key: list[Any]) -> str:
+    """Encode the last-seen sort key of a page into an opaque cursor string."""
+    payload = json.dumps({"s": scope, "k": key}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> list[Any]:
+    """Return the sort key stored in a cursor, validating it belongs to scope."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("cursor is malformed") from exc
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("k"), list):
+        raise ValueError("cursor is malformed")
+    if payload.get("s") != scope:
+        raise ValueError("cursor does not match the requested sort order")
+    return payload["k"]
+
+
+__all__ = ["NEXT_CURSOR_HEADER", "decode_cursor", "encode_cursor"]
@@ -0,0 +1,225 @@
+"""Vectorized rental quotes driven by cached pricing rules.
+
+``PricingTable`` resolves the ``pricing_rules`` table into a daily multiplier
+and surcharge per bike type for weekdays and weekend days. Quoting a matrix of
+bikes x date windows is then one NumPy pass: each bike gets a (weekday,
+weekend) daily price and each window a (weekday, weekend) day count, and the
+totals are their matrix product.
+
+``PricingRuleCache`` keeps the resolved table in process. It re-checks a cheap
+version digest of the rules table at most every ``_VERSION_CHECK_SECONDS``
+and reloads only when the digest changed; rule writes committed in this
+process invalidate it immediately through session events. Quotes and
+bookings both price through it, so a quoted total is what a booking for the
+same bike and dates is charged.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from datetime import date
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.pricing_rule import DayKind, PricingRule
+from app.repositories.pricing_repo import (
+    RuleRow,
+    get_pricing_rules,
+    get_pricing_rules_version,
+)
+
+_VERSION_CHECK_SECONDS = 5.0
+_PENDING_KEY = "pricing_rules_changed"
+
+# Column order of the per-type adjustment arrays.
+_DAY_KINDS = (DayKind.WEEKDAY, DayKind.WEEKEND)
+
+
+class PricingTable:
+    """Daily price adjustments per bike type, resolved from pricing rules."""
+
+    def __init__(self, rules: Iterable[RuleRow] = ()) -> None:
+        self._rules = list(rules)
+        self._adjustments: dict[str | None, tuple[list[float], list[int]]] = {}
+
+    def adjustment(self, bike_type: str | None) -> tuple[list[float], list[int]]:
+        """Return ([weekday, weekend] factors, [weekday, weekend] surcharges)."""
+        cached = self._adjustments.get(bike_type)
+        if cached is not None:
+            return cached
+        factors = [1.0, 1.0]
+        surcharges = [0, 0]
+        for rule_type, day_kind, multiplier_percent, surcharge_cents in self._rules:
+            if rule_type is not None and rule_type != bike_type:
+                continue
+            for column, kind in enumerate(_DAY_KINDS):
+                if day_kind in (DayKind.ALL, kind):
+                    factors[column] *= multiplier_percent / 100.0
+                    surcharges[column] += surcharge_cents
+        self._adjustments[bike_type] = (factors, surcharges)
+        return factors, surcharges
+
+    def daily_prices(
+        self, rates: ArrayLike, bike_types: Sequence[str]
+    ) -> NDArray[np.int64]:
+        """Return a (bikes, 2) array of weekday and weekend daily prices in cents.
+
+        Adjusted rates are rounded half up to whole cents before surcharges.
+        """
+        rate_array = np.asarray(rates, dtype=np.float64)
+        if rate_array.shape != (len(bike_types),):
+            raise ValueError("rates and bike_types must have the same length")
+        types, inverse = np.unique(
+            np.asarray(bike_types, dtype=object), return_inverse=True
+        )
+        adjustments = [self.adjustment(bike_type) for bike_type in types.tolist()]
+        factors = np.array([factor for factor, _ in adjustments], dtype=np.float64)
+        surcharges = np.array([charge for _, charge in adjustments], dtype=np.int64)
+        factors = factors.reshape(-1, 2)[inverse]
+        surcharges = surcharges.reshape(-1, 2)[inverse]
+        adjusted = np.floor(rate_array[:, None] * factors + 0.5).astype(np.int64)
+        return adjusted + surcharges
+
+    def quote(
+        self,
+        rates: ArrayLike,
+        bike_types: Sequence[str],
+        starts: Sequence[date],
+        ends: Sequence[date],
+    ) -> NDArray[np.int64]:
+        """Return a (bikes, windows) matrix of total prices in cents.
+
+        Windows are half-open ``[start, end)`` day ranges.
+        """
+        return self.daily_prices(rates, bike_types) @ day_counts(starts, ends)
+
+    def totals(
+        self,
+        rates: ArrayLike,
+        bike_types: Sequence[str],
+        starts: Sequence[date],
+        ends: Sequence[date],
+    ) -> NDArray[np.int64]:
+        """Return the total price in cents of each bike over its own window.
+
+        This is the diagonal of ``quote``: bike ``i`` over window ``i``.
+        """
+        daily = self.daily_prices(rates, bike_types)
+        return (daily * day_counts(starts, ends).T).sum(axis=1)
+
+
+def day_counts(starts: Sequence[date], ends: Sequence[date]) -> NDArray[np.int64]:
+    """Return a (2, windows) array of weekday and weekend day counts."""
+    start_days = np.array(starts, dtype="datetime64[D]")
+    end_days = np.array(ends, dtype="datetime64[D]")
+    if start_days.shape != end_days.shape:
+        raise ValueError("starts and ends must have the same length")
+    total = (end_days - start_days).astype(np.int64)
+    weekdays = np.busday_count(start_days, end_days).astype(np.int64)
+    return np.stack([weekdays, total - weekdays])
+
+
+class PricingRuleCache:
+    """Process-wide ``PricingTable`` refreshed when the rules table changes."""
+
+    def __init__(self, check_interval_seconds: float = _VERSION_CHECK_SECONDS) -> None:
+        self._check_interval = check_interval_seconds
+        self._lock = threading.Lock()
+        self._table: PricingTable | None = None
+        self._version: tuple[int, int, int] | None = None
+        self._checked_at: float | None = None
+        # Bumped by ``invalidate``/``clear`` so a load that raced a rule write
+        # does not mark the cache fresh.
+        self._generation = 0
+
+    def invalidate(self) -> None:
+        """Force a version check (and reload if changed) on next use."""
+        with self._lock:
+            self._checked_at = None
+            self._generation += 1
+
+    def clear(self) -> None:
+        """Drop the cached table entirely."""
+        with self._lock:
+            self._table = None
+            self._version = None
+            self._checked_at = None
+            self._generation += 1
+
+    def get(self, db: Session) -> PricingTable:
+        """Return the cached table, reloading it when the rules changed.
+
+        The rules are queried without holding the lock: on an async session
+        the queries need the event loop, which a waiting caller would block.
+        """
+        now = time.monotonic()
+        with self._lock:
+            table, version = self._table, self._version
+            checked_at, generation = self._checked_at, self._generation
+        if (
+            table is not None
+            and checked_at is not None
+            and now - checked_at <= self._check_interval
+        ):
+            return table
+
+        latest = get_pricing_rules_version(db)
+        if table is None or latest != version:
+            table = PricingTable(get_pricing_rules(db))
+        with self._lock:
+            if self._generation == generation:
+                self._table = table
+                self._version = latest
+                self._checked_at = now
+        return table
+
+
+pricing_rules = PricingRuleCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_rule_writes(session: Session, _flush_context: object) -> None:
+    """Note flushed pricing rule changes so the cache can drop them on commit."""
+    if any(
+        isinstance(obj, PricingRule)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_rule_writes(session: Session) -> None:
+    """Invalidate the cached rules after a committed rule change."""
+    if session.info.pop(_PENDING_KEY, False):
+        pricing_rules.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rule_writes(session: Session) -> None:
+    """Forget uncommitted rule changes."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_pricing_table(db: Session) -> PricingTable:
+    """Return the shared pricing table, refreshing it when rules changed."""
+    return pricing_rules.get(db)
+
+
+async def get_pricing_table_async(db: AsyncSession) -> PricingTable:
+    """``get_pricing_table`` on an ``AsyncSession``; quotes and bookings use it."""
+    return await db.run_sync(get_pricing_table)
+
+
+__all__ = [
+    "PricingRuleCache",
+    "PricingTable",
+    "day_counts",
+    "get_pricing_table",
+    "get_pricing_table_async",
+    "pricing_rules",
+]
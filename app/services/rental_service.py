@@ -48,16 +48,38 @@ def compute_total_price_cents(rate_per_day_cents: int, days: int) -> int:
     return rate_per_day_cents * days
 
 
+def windows_overlap(
+    start_date: date,
+    end_date: date | None,
+    other_start: date,
+    other_end: date | None,
+) -> bool:
+    """Return True when two half-open [start, end) windows share a day.
+
+    A missing end date means the window is open-ended.
+    """
+    return (other_end is None or start_date < other_end) and (
+        end_date is None or other_start < end_date
+    )
+
+
 def is_bike_available(bike: Any, start_date: Any, end_date: Any) -> bool:
-    """Return True when bike status is 'available' and rental dates are valid."""
+    """Return True when bike status is 'available' and rental dates are valid.
+
+    Accepts ORM bikes (``availability_status``) as well as objects or dicts
+    exposing a plain ``status``. Overlapping bookings are checked separately
+    against stored rentals via ``rental_repo.has_overlapping_rental_async``.
+    """
     validate_range(start_date, end_date)
 
     status: Any
     if hasattr(bike, "status"):
         status = getattr(bike, "status")
+    elif hasattr(bike, "availability_status"):
+        status = getattr(bike, "availability_status")
     elif isinstance(bike, dict) and "status" in bike:
         status = bike["status"]
     else:
         raise ValueError("bike must expose a 'status' attribute or key")
 
-    return str(status).lower() == "available"
+    return str(getattr(status, "value", status)).lower() == "available"
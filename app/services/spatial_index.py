@@ -0,0 +1,284 @@
+"""In-process grid index answering "bikes near me" queries without table scans.
+
+Available bikes with a known location are bucketed into fixed-size lat/lng
+cells. Radius and k-nearest queries only compute distances for bikes in the
+cells that can contain a match. The index is loaded lazily from the database,
+kept in sync with committed ORM writes through session events, and fully
+reloaded after ``_MAX_AGE_SECONDS`` so writes made by other worker processes
+are eventually picked up.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections.abc import Iterable
+
+import numpy as np
+from numpy.typing import NDArray
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.bike import AvailabilityStatus, Bike
+from app.repositories.bike_repo import get_available_bike_locations
+from app.services.geo import EARTH_RADIUS_M, distances_from_point
+
+_METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+_CELL_SIZE_DEGREES = 0.01
+_MAX_AGE_SECONDS = 60.0
+_PENDING_KEY = "bike_index_pending"
+
+CellKey = tuple[int, int]
+
+
+class BikeSpatialIndex:
+    """Uniform lat/lng grid of available bike locations keyed by bike id."""
+
+    def __init__(
+        self,
+        cell_size_degrees: float = _CELL_SIZE_DEGREES,
+        max_age_seconds: float = _MAX_AGE_SECONDS,
+    ) -> None:
+        self._cell_size = cell_size_degrees
+        self._rows = math.ceil(180.0 / cell_size_degrees)
+        self._columns = math.ceil(360.0 / cell_size_degrees)
+        self._max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._cells: dict[CellKey, dict[int, tuple[float, float]]] = {}
+        self._bike_cells: dict[int, CellKey] = {}
+        self._loaded_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._bike_cells)
+
+    def is_stale(self) -> bool:
+        """Return True when the index has never been loaded or is too old."""
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self._max_age_seconds
+
+    def clear(self) -> None:
+        """Drop all entries and force a reload on next use."""
+        with self._lock:
+            self._cells = {}
+            self._bike_cells = {}
+            self._loaded_at = None
+
+    def load(self, locations: Iterable[tuple[int, float, float]]) -> None:
+        """Replace the index contents with (bike_id, lat, lng) rows."""
+        cells: dict[CellKey, dict[int, tuple[float, float]]] = {}
+        bike_cells: dict[int, CellKey] = {}
+        for bike_id, lat, lng in locations:
+            key = self._cell_key(lat, lng)
+            cells.setdefault(key, {})[bike_id] = (lat, lng)
+            bike_cells[bike_id] = key
+        with self._lock:
+            self._cells = cells
+            self._bike_cells = bike_cells
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, bike_id: int, lat: float, lng: float) -> None:
+        """Insert or move a bike to the supplied location."""
+        with self._lock:
+            self._discard(bike_id)
+            key = self._cell_key(lat, lng)
+            self._cells.setdefault(key, {})[bike_id] = (lat, lng)
+            self._bike_cells[bike_id] = key
+
+    def remove(self, bike_id: int) -> None:
+        """Remove a bike from the index if present."""
+        with self._lock:
+            self._discard(bike_id)
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        limit: int,
+        radius_m: float | None = None,
+    ) -> list[tuple[int, float]]:
+        """Return up to limit (bike_id, distance_m) pairs ordered by distance.
+
+        With ``radius_m`` only bikes within that distance are considered;
+        without it the ``limit`` nearest bikes are returned.
+        """
+        with self._lock:
+            if radius_m is not None:
+                keys = self._cells_within(lat, lng, radius_m)
+                bike_ids, distances = self._score(keys, lat, lng)
+                within = distances <= radius_m
+                bike_ids, distances = bike_ids[within], distances[within]
+            else:
+                bike_ids, distances = self._k_nearest(lat, lng, limit)
+        order = np.lexsort((bike_ids, distances))[:limit]
+        return list(zip(bike_ids[order].tolist(), distances[order].tolist()))
+
+    def _discard(self, bike_id: int) -> None:
+        key = self._bike_cells.pop(bike_id, None)
+        if key is None:
+            return
+        bucket = self._cells[key]
+        del bucket[bike_id]
+        if not bucket:
+            del self._cells[key]
+
+    def _cell_key(self, lat: float, lng: float) -> CellKey:
+        row = min(int((lat + 90.0) // self._cell_size), self._rows - 1)
+        column = int((lng + 180.0) // self._cell_size) % self._columns
+        return row, column
+
+    def _score(
+        self, keys: Iterable[CellKey], lat: float, lng: float
+    ) -> tuple[NDArray[np.int64], NDArray[np.float64]]:
+        """Return ids and distances of every bike in the supplied cells."""
+        bike_ids: list[int] = []
+        points: list[tuple[float, float]] = []
+        for key in keys:
+            bucket = self._cells.get(key)
+            if bucket:
+                bike_ids.extend(bucket)
+                points.extend(bucket.values())
+        if not points:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        coordinates = np.array(points, dtype=np.float64)
+        distances = distances_from_point(
+            lat, lng, coordinates[:, 0], coordinates[:, 1]
+        )
+        return np.array(bike_ids, dtype=np.int64), distances
+
+    def _cells_within(self, lat: float, lng: float, radius_m: float) -> list[CellKey]:
+        """Return occupied cell keys overlapping the radius bounding box."""
+        dlat = radius_m / _METRES_PER_DEGREE
+        max_abs_lat = min(90.0, abs(lat) + dlat)
+        cos_lat = math.cos(math.radians(max_abs_lat))
+        dlng = 360.0 if cos_lat < 1e-6 else dlat / cos_lat
+
+        first_row = max(0, int((lat - dlat + 90.0) // self._cell_size))
+        last_row = min(self._rows - 1, int((lat + dlat + 90.0) // self._cell_size))
+        first_column = int((lng - dlng + 180.0) // self._cell_size)
+        last_column = int((lng + dlng + 180.0) // self._cell_size)
+        column_span = min(self._columns, last_column - first_column + 1)
+        rows = range(first_row, last_row + 1)
+
+        if len(rows) * column_span > len(self._cells):
+            # Sparse grid: walking occupied cells is cheaper than the box.
+            columns = None
+            if column_span < self._columns:
+                columns = {
+                    (first_column + offset) % self._columns
+                    for offset in range(column_span)
+                }
+            return [
+                key
+                for key in self._cells
+                if first_row <= key[0] <= last_row
+                and (columns is None or key[1] in columns)
+            ]
+        return [
+            (row, (first_column + offset) % self._columns)
+            for row in rows
+            for offset in range(column_span)
+        ]
+
+    def _k_nearest(
+        self, lat: float, lng: float, limit: int
+    ) -> tuple[NDArray[np.int64], NDArray[np.float64]]:
+        """Expand square rings of cells until the limit nearest are settled."""
+        center_row, center_column = self._cell_key(lat, lng)
+        found_ids: list[NDArray[np.int64]] = []
+        found_distances: list[NDArray[np.float64]] = []
+        found_count = 0
+        ring = 0
+        while True:
+            ring_size = 1 if ring == 0 else 8 * ring
+            if ring_size > len(self._cells) or ring >= self._rows:
+                # Remaining bikes are sparse; score every occupied cell once.
+                return self._score(list(self._cells), lat, lng)
+
+            keys = self._ring(center_row, center_column, ring)
+            bike_ids, distances = self._score(keys, lat, lng)
+            found_ids.append(bike_ids)
+            found_distances.append(distances)
+            found_count += len(bike_ids)
+            if found_count >= limit:
+                # Anything outside the searched square is at least this far away.
+                max_abs_lat = min(90.0, abs(lat) + (ring + 1) * self._cell_size)
+                cos_lat = max(math.cos(math.radians(max_abs_lat)), 0.0)
+                covered_m = ring * self._cell_size * _METRES_PER_DEGREE * cos_lat
+                all_distances = np.concatenate(found_distances)
+                if np.partition(all_distances, limit - 1)[limit - 1] <= covered_m:
+                    return np.concatenate(found_ids), all_distances
+            ring += 1
+
+    def _ring(self, center_row: int, center_column: int, ring: int) -> list[CellKey]:
+        if ring == 0:
+            return [(center_row, center_column)]
+        keys: list[CellKey] = []
+        for d_row in range(-ring, ring + 1):
+            row = center_row + d_row
+            if not 0 <= row < self._rows:
+                continue
+            if abs(d_row) == ring:
+                offsets: Iterable[int] = range(-ring, ring + 1)
+            else:
+                offsets = (-ring, ring)
+            keys.extend(
+                (row, (center_column + offset) % self._columns) for offset in offsets
+            )
+        return keys
+
+
+bike_index = BikeSpatialIndex()
+
+
+def _is_indexable(bike: Bike) -> bool:
+    return (
+        bike.availability_status == AvailabilityStatus.AVAILABLE
+        and bike.lat is not None
+        and bike.lng is not None
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _record_bike_writes(session: Session, _flush_context: object) -> None:
+    """Snapshot flushed bike changes so they can be applied after commit."""
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Bike) and obj.id is not None:
+            if _is_indexable(obj):
+                pending.append((obj.id, obj.lat, obj.lng))
+            else:
+                pending.append((obj.id, None, None))
+    for obj in session.deleted:
+        if isinstance(obj, Bike) and obj.id is not None:
+            pending.append((obj.id, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_bike_writes(session: Session) -> None:
+    """Apply committed bike changes to the shared index."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or bike_index.is_stale():
+        return
+    for bike_id, lat, lng in pending:
+        if lat is None or lng is None:
+            bike_index.remove(bike_id)
+        else:
+            bike_index.upsert(bike_id, lat, lng)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_bike_writes(session: Session) -> None:
+    """Drop pending changes; force a reload since savepoint scope is unknown."""
+    if session.info.pop(_PENDING_KEY, None):
+        bike_index.clear()
+
+
+def get_bike_index(db: Session) -> BikeSpatialIndex:
+    """Return the shared index, (re)loading it from the database when stale."""
+    if bike_index.is_stale():
+        bike_index.load(get_available_bike_locations(db))
+    return bike_index
+
+
+__all__ = ["BikeSpatialIndex", "bike_index", "get_bike_index"]
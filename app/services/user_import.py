@@ -0,0 +1,272 @@
+"""Streaming bulk user import from CSV or NDJSON request bodies.
+
+Lines are parsed as the body arrives and accepted rows are processed in
+chunks of ``IMPORT_CHUNK_SIZE``. Each chunk costs one ``IN`` query to find
+emails that are already taken, one ``hash_many`` call that spreads bcrypt over
+the password hashing pool, and one batched insert and commit. A bad line is
+reported and skipped; it never aborts the rest of the import, and chunks
+that were already committed stay committed.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.password_hasher import PasswordHasher
+from app.repositories import user_repo
+from app.schemas.user_schema import UserImportError, UserImportResult, UserImportRow
+
+IMPORT_CHUNK_SIZE = 500
+
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPES = frozenset({"application/x-ndjson", "application/jsonl"})
+
+_REQUIRED_CSV_COLUMNS = frozenset({"name", "email"})
+
+# (line number, parsed fields or None, parse error or None)
+ImportRecord = tuple[int, dict[str, Any] | None, str | None]
+
+
+class ImportFormatError(ValueError):
+    """Raised when the body as a whole cannot be read, e.g. a bad CSV header."""
+
+
+async def _iter_lines(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, str | None]]:
+    """Yield (line number, text) per line; text is None when not valid UTF-8."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            yield line_number, _decode_line(raw, line_number)
+    if buffer:
+        line_number += 1
+        yield line_number, _decode_line(buffer, line_number)
+
+
+def _decode_line(raw: bytes, line_number: int) -> str | None:
+    if line_number == 1:
+        raw = raw.removeprefix(codecs.BOM_UTF8)
+    try:
+        return raw.rstrip(b"\r").decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_ndjson_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[ImportRecord]:
+    """Parse one JSON object per line, skipping blank lines."""
+    async for line_number, text in _iter_lines(chunks):
+        if text is None:
+            yield line_number, None, "line is not valid UTF-8"
+            continue
+        if not text.strip():
+            continue
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as exc:
+            yield line_number, None, f"invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(value, dict):
+            yield line_number, None, "expected a JSON object"
+            continue
+        yield line_number, value, None
+
+
+async def iter_csv_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[ImportRecord]:
+    """Parse CSV with a header row; quoted fields may span lines.
+
+    Empty cells are treated as absent so optional columns can be left blank.
+    """
+    header: list[str] | None = None
+    pending: list[str] = []
+    start_line = 0
+    async for line_number, text in _iter_lines(chunks):
+        if text is None:
+            if header is None:
+                raise ImportFormatError("CSV header is not valid UTF-8")
+            yield line_number, None, "line is not valid UTF-8"
+            pending = []
+            continue
+        if not pending:
+            if not text.strip():
+                continue
+            start_line = line_number
+        pending.append(text)
+        # An odd number of quotes so far means a quoted field is still open.
+        if sum(line.count('"') for line in pending) % 2:
+            continue
+        values = next(csv.reader(line + "\n" for line in pending))
+        pending = []
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            missing = _REQUIRED_CSV_COLUMNS.difference(header)
+            if missing:
+                raise ImportFormatError(
+                    f"CSV header is missing columns: {', '.join(sorted(missing))}"
+                )
+            continue
+        if len(values) != len(header):
+            message = f"expected {len(header)} fields, got {len(values)}"
+            yield start_line, None, message
+            continue
+        fields = {column: value for column, value in zip(header, values) if value}
+        yield start_line, fields, None
+    if pending:
+        yield start_line, None, "unterminated quoted field"
+
+
+def record_reader(
+    media_type: str,
+) -> Callable[[AsyncIterable[bytes]], AsyncIterator[ImportRecord]] | None:
+    """Return the record parser for a request media type, if supported."""
+    if media_type == CSV_MEDIA_TYPE:
+        return iter_csv_records
+    if media_type in NDJSON_MEDIA_TYPES:
+        return iter_ndjson_records
+    return None
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _reject(
+    result: UserImportResult,
+    line: int,
+    email: object,
+    code: str,
+    message: str,
+) -> None:
+    result.failed += 1
+    result.errors.append(
+        UserImportError(
+            line=line,
+            email=email if isinstance(email, str) else None,
+            code=code,
+            message=message,
+        )
+    )
+
+
+def _find_existing_emails(db: Session, emails: list[str]) -> set[str]:
+    """Look up taken emails, ending the read so hashing holds no connection."""
+    existing = user_repo.get_existing_emails(db, emails)
+    db.commit()
+    return existing
+
+
+async def _import_chunk(
+    db: Session,
+    chunk: list[tuple[int, UserImportRow]],
+    hasher: PasswordHasher,
+    result: UserImportResult,
+) -> None:
+    existing = await run_in_threadpool(
+        _find_existing_emails, db, [row.email for _, row in chunk]
+    )
+    fresh: list[tuple[int, UserImportRow]] = []
+    for line, row in chunk:
+        if row.email in existing:
+            _reject(
+                result,
+                line,
+                row.email,
+                "EMAIL_EXISTS",
+                "An account with that email already exists.",
+            )
+        else:
+            fresh.append((line, row))
+
+    plain = [row.password for _, row in fresh if row.password_hash is None]
+    hashes = iter(await hasher.hash_many(plain) if plain else ())
+    rows = [
+        {
+            "name": row.name,
+            "email": row.email,
+            "hashed_password": row.password_hash or next(hashes),
+            "phone": row.phone,
+        }
+        for _, row in fresh
+    ]
+    taken = await run_in_threadpool(user_repo.insert_users, db, rows)
+    for line, row in fresh:
+        if row.email in taken:
+            _reject(
+                result,
+                line,
+                row.email,
+                "EMAIL_EXISTS",
+                "An account with that email already exists.",
+            )
+        else:
+            result.created += 1
+
+
+async def import_users(
+    db: Session,
+    records: AsyncIterable[ImportRecord],
+    hasher: PasswordHasher,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> UserImportResult:
+    """Validate, hash and insert streamed records chunk by chunk."""
+    result = UserImportResult()
+    seen: set[str] = set()
+    chunk: list[tuple[int, UserImportRow]] = []
+    async for line, fields, error in records:
+        email = fields.get("email") if fields is not None else None
+        if error is None:
+            try:
+                row = UserImportRow.model_validate(fields)
+            except ValidationError as exc:
+                error = _describe(exc)
+        if error is not None:
+            _reject(result, line, email, "INVALID_ROW", error)
+            continue
+        if row.email in seen:
+            _reject(
+                result,
+                line,
+                row.email,
+                "DUPLICATE_EMAIL",
+                "This email appears earlier in the import.",
+            )
+            continue
+        seen.add(row.email)
+        chunk.append((line, row))
+        if len(chunk) >= chunk_size:
+            await _import_chunk(db, chunk, hasher, result)
+            chunk = []
+    if chunk:
+        await _import_chunk(db, chunk, hasher, result)
+    return result
+
+
+__all__ = [
+    "CSV_MEDIA_TYPE",
+    "IMPORT_CHUNK_SIZE",
+    "ImportFormatError",
+    "ImportRecord",
+    "NDJSON_MEDIA_TYPES",
+    "import_users",
+    "iter_csv_records",
+    "iter_ndjson_records",
+    "record_reader",
+]
@@ -0,0 +1,158 @@
+"""Opt-in tuning for file-backed SQLite deployments.
+
+With ``SQLITE_PROFILE=tuned`` (see ``app.db``) every new connection switches
+the database to write-ahead logging, relaxes fsync to once per checkpoint,
+enlarges the page cache and memory map, enforces foreign keys and waits
+``SQLITE_BUSY_TIMEOUT_MS`` for a lock instead of failing at once. Readers
+then never block the writer, or each other.
+
+SQLite still allows one writer at a time. Rather than letting every writing
+request poll the database lock, ``WriterLock`` queues them in the process in
+arrival order; ``get_async_write_db`` holds it for the request's session.
+The busy timeout still covers writers in other worker processes.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine, make_url
+
+
+def tuned_pragmas(
+    busy_timeout_ms: int = 5000,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_size: int = -64 * 1024,
+) -> tuple[tuple[str, Any], ...]:
+    """Return the ``PRAGMA`` settings of the tuned profile, in order.
+
+    A negative ``cache_size`` is in KiB rather than pages.
+    """
+    return (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", busy_timeout_ms),
+        ("foreign_keys", "ON"),
+        ("mmap_size", mmap_size),
+        ("cache_size", cache_size),
+    )
+
+
+def is_tunable(database_url: str | URL) -> bool:
+    """Whether ``database_url`` names an SQLite database file."""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def apply_pragmas(engine: Engine, pragmas: tuple[tuple[str, Any], ...]) -> None:
+    """Run ``pragmas`` on every connection ``engine`` opens.
+
+    Pass ``AsyncEngine.sync_engine`` for asyncio engines; the aiosqlite
+    adapter runs the statements synchronously during connect.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _apply(dbapi_connection: Any, _record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+class WriterLock:
+    """First-come, first-served lock shared by threads and event loops.
+
+    ``asyncio.Lock`` is bound to a single event loop and ``threading.Lock``
+    would block one, so waiters here are callbacks: a thread waits on an
+    event, a coroutine on a future woken through its own loop. ``release``
+    hands the lock straight to the oldest waiter.
+    """
+
+    def __init__(self) -> None:
+        self._mutex = threading.Lock()
+        self._locked = False
+        self._waiters: deque[Callable[[], None]] = deque()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    def acquire(self) -> None:
+        """Block the calling thread until the lock is held."""
+        with self._mutex:
+            if not self._locked:
+                self._locked = True
+                return
+            granted = threading.Event()
+            self._waiters.append(granted.set)
+        granted.wait()
+
+    async def acquire_async(self) -> None:
+        """Wait on the running event loop until the lock is held."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def grant() -> None:
+            # The waiter was cancelled after the lock was handed over.
+            if future.cancelled():
+                self.release()
+            else:
+                future.set_result(None)
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(grant)
+
+        with self._mutex:
+            if not self._locked:
+                self._locked = True
+                return
+            self._waiters.append(wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._mutex:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+                    raise
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._mutex:
+            if not self._waiters:
+                self._locked = False
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+    def __enter__(self) -> WriterLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.release()
+
+    async def __aenter__(self) -> WriterLock:
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        self.release()
+
+
+__all__ = [
+    "WriterLock",
+    "apply_pragmas",
+    "is_tunable",
+    "tuned_pragmas",
+]
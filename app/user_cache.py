@@ -0,0 +1,159 @@
+"""Process-local cache of verified bearer tokens to authenticated users.
+
+``get_current_user`` otherwise decodes the JWT and loads the user row on every
+authenticated request. ``UserCache`` maps a token that has already been
+verified to a lightweight ``AuthenticatedUser`` (id, email, role), bounded in size
+with least-recently-used eviction. Entries live for at most
+``AUTH_USER_CACHE_TTL_SECONDS`` and never past the token's own expiry. User
+rows updated or deleted through the ORM evict that user's entries on commit.
+Set ``AUTH_USER_CACHE_ENABLED=false`` to always hit the database.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+AUTH_USER_CACHE_ENABLED = os.getenv("AUTH_USER_CACHE_ENABLED", "true").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+
+_PENDING_KEY = "user_cache_pending"
+
+
+class AuthenticatedUser(NamedTuple):
+    """Identity of the caller behind a verified bearer token.
+
+    ``token_id`` is the token's ``jti`` claim, used to check and record
+    revocation; tokens issued without one cannot be revoked.
+    """
+
+    id: int
+    email: str
+    token_id: str | None = None
+    is_admin: bool = False
+
+
+class UserCache:
+    """Bounded LRU of token -> ``AuthenticatedUser`` with per-entry expiry."""
+
+    def __init__(
+        self,
+        max_size: int = AUTH_USER_CACHE_SIZE,
+        ttl_seconds: float = AUTH_USER_CACHE_TTL_SECONDS,
+        enabled: bool = AUTH_USER_CACHE_ENABLED,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.enabled = enabled
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[AuthenticatedUser, float]] = (
+            OrderedDict()
+        )
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> AuthenticatedUser | None:
+        """Return the cached user for a token, or None on a miss or expiry."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if self._clock() >= expires_at:
+                self._discard(token)
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def put(
+        self, token: str, user: AuthenticatedUser, token_expires_at: float | None
+    ) -> None:
+        """Cache a verified token until the TTL or the token's ``exp`` passes."""
+        if not self.enabled or self._max_size <= 0:
+            return
+        expires_at = self._clock() + self._ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._discard(token)
+            self._entries[token] = (user, expires_at)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self._max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Evict every cached token belonging to a user."""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._discard(token)
+
+    def clear(self) -> None:
+        """Evict every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _discard(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].id]
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _record_user_writes(session: Session, _flush_context: object) -> None:
+    """Note users changed or deleted in this flush for eviction on commit."""
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.dirty | session.deleted:
+        if isinstance(obj, User) and obj.id is not None:
+            pending.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_writes(session: Session) -> None:
+    """Evict cached tokens of users whose rows were committed."""
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        user_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_writes(session: Session) -> None:
+    """Forget uncommitted user changes."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+__all__ = [
+    "AUTH_USER_CACHE_ENABLED",
+    "AUTH_USER_CACHE_SIZE",
+    "AUTH_USER_CACHE_TTL_SECONDS",
+    "AuthenticatedUser",
+    "UserCache",
+    "user_cache",
+]
@@ -0,0 +1,166 @@
+"""Compare requests/sec of the async bike listing with a threadpool route.
+
+The "threadpool" app serves ``GET /api/bikes`` from a sync route on a sync
+session (the previous behaviour); the "asyncio" app mounts the real bikes
+router on an ``AsyncSession``. Both read the same file-backed SQLite database
+through pools sized by the ``DB_POOL_*`` settings while many clients hit them at once. Run from
+the repository root:
+
+    python benchmarks/bench_async_routes.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+# Fail fast when a pool is exhausted rather than after the default 30s.
+os.environ.setdefault("DB_POOL_TIMEOUT", "5")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app.db import Base, _pool_args, get_async_db  # noqa: E402
+from app.models import AvailabilityStatus, Bike  # noqa: E402
+from app.pool_metrics import TimedAsyncAdaptedQueuePool  # noqa: E402
+from app.repositories.bike_repo import get_available_bike_rows  # noqa: E402
+from app.routers import bikes  # noqa: E402
+from app.schemas.bike_schema import BikeRead  # noqa: E402
+
+_BIKES = 500
+_REQUESTS = 2_000
+_CONCURRENCY = (10, 100, 500)
+
+
+def _threadpool_app(session_factory: sessionmaker[Session]) -> FastAPI:
+    bench_app = FastAPI()
+
+    def _get_db() -> Iterator[Session]:
+        with session_factory() as db:
+            yield db
+
+    @bench_app.get("/api/bikes", response_model=list[BikeRead])
+    def list_available_bikes(
+        limit: int = 50, db: Session = Depends(_get_db)
+    ) -> list[dict[str, Any]]:
+        return get_available_bike_rows(db, limit=limit)
+
+    return bench_app
+
+
+def _asyncio_app(session_factory: async_sessionmaker[AsyncSession]) -> FastAPI:
+    bench_app = FastAPI()
+    bench_app.include_router(bikes.router)
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as db:
+            yield db
+
+    bench_app.dependency_overrides[get_async_db] = _get_async_db
+    return bench_app
+
+
+def _seed(session_factory: sessionmaker[Session]) -> None:
+    with session_factory() as db:
+        db.add_all(
+            Bike(
+                name=f"bike {i}",
+                type="city",
+                rate_per_day_cents=1000 + i,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for i in range(_BIKES)
+        )
+        db.commit()
+
+
+async def _run(
+    bench_app: FastAPI, concurrency: int
+) -> tuple[float, list[float], int]:
+    transport = ASGITransport(app=bench_app, raise_app_exceptions=False)
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    failures = 0
+
+    async def one(client: AsyncClient) -> None:
+        nonlocal failures
+        async with gate:
+            started = time.perf_counter()
+            response = await client.get("/api/bikes", params={"limit": 50})
+            latencies.append((time.perf_counter() - started) * 1e3)
+            failures += response.status_code != 200
+
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(*(one(client) for _ in range(50)))  # warm up
+        latencies.clear()
+        failures = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(_REQUESTS)))
+        elapsed = time.perf_counter() - started
+    return (_REQUESTS - failures) / elapsed, latencies, failures
+
+
+async def _compare(apps: dict[str, FastAPI]) -> None:
+    for concurrency in _CONCURRENCY:
+        print(f"{_REQUESTS} requests, {concurrency} in flight")
+        for name, bench_app in apps.items():
+            _report(f"  {name}", *await _run(bench_app, concurrency))
+
+
+def _report(
+    label: str, throughput: float, latencies: list[float], failures: int
+) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<24} {throughput:8.0f} req/s p50={quantiles[49]:8.2f}ms "
+        f"p99={quantiles[98]:8.2f}ms failed={failures}"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_engine(
+            url, connect_args={"check_same_thread": False}, **_pool_args(url)
+        )
+        Base.metadata.create_all(engine)
+        _seed(sessionmaker(bind=engine))
+        async_url = url.replace("sqlite://", "sqlite+aiosqlite://")
+        async_engine = create_async_engine(
+            async_url, **_pool_args(async_url, TimedAsyncAdaptedQueuePool)
+        )
+        apps = {
+            "threadpool": _threadpool_app(sessionmaker(bind=engine)),
+            "asyncio": _asyncio_app(
+                async_sessionmaker(bind=async_engine, expire_on_commit=False)
+            ),
+        }
+        try:
+            # One event loop throughout: pooled aiosqlite connections belong
+            # to the loop that opened them.
+            asyncio.run(_compare(apps))
+        finally:
+            asyncio.run(async_engine.dispose())
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
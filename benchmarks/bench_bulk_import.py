@@ -0,0 +1,151 @@
+"""Measure ``POST /auth/users/bulk`` against one ``/auth/register`` per user.
+
+Imports ``_HASHED_ROWS`` users that arrive with existing bcrypt hashes (the
+migration case), then ``_PLAIN_ROWS`` users with plaintext passwords that
+must be hashed in the pool, and compares per-user cost with the register
+route. Run from the repository root after creating ``.env`` (slowapi
+requires it):
+
+    cp .env.example .env
+    python benchmarks/bench_bulk_import.py
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+import app.auth as auth_utils  # noqa: E402
+from app.db import Base, get_db  # noqa: E402
+from app.models import User  # noqa: E402
+from app.password_hasher import hash_password, password_hasher  # noqa: E402
+from app.routers import auth as auth_router  # noqa: E402
+
+_HASHED_ROWS = 10_000
+_PLAIN_ROWS = 64
+_REGISTERS = 16
+_PASSWORD = "benchmark-password"
+
+
+def _build_app(session_factory: sessionmaker[Session]) -> FastAPI:
+    auth_router.limiter.enabled = False
+    bench_app = FastAPI()
+    bench_app.state.limiter = auth_router.limiter
+    bench_app.include_router(auth_router.router)
+
+    def _get_db() -> Iterator[Session]:
+        with session_factory() as db:
+            yield db
+
+    bench_app.dependency_overrides[get_db] = _get_db
+    return bench_app
+
+
+def _seed_admin(session_factory: sessionmaker[Session]) -> str:
+    with session_factory() as db:
+        admin = User(
+            name="admin",
+            email="admin@example.com",
+            hashed_password=hash_password(_PASSWORD),
+            is_admin=True,
+        )
+        db.add(admin)
+        db.commit()
+        return auth_utils.create_access_token(str(admin.id))
+
+
+def _ndjson(prefix: str, count: int, **fields: str) -> bytes:
+    rows = (
+        {"name": f"{prefix} {i}", "email": f"{prefix}{i}@example.com", **fields}
+        for i in range(count)
+    )
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+async def _import(client: AsyncClient, token: str, body: bytes) -> float:
+    started = time.perf_counter()
+    response = await client.post(
+        "/auth/users/bulk",
+        content=body,
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/x-ndjson",
+        },
+    )
+    response.raise_for_status()
+    assert response.json()["failed"] == 0, response.json()["errors"][:3]
+    return time.perf_counter() - started
+
+
+async def _register(client: AsyncClient) -> float:
+    started = time.perf_counter()
+    for i in range(_REGISTERS):
+        response = await client.post(
+            "/auth/register",
+            json={
+                "name": f"register {i}",
+                "email": f"register{i}@example.com",
+                "password": _PASSWORD,
+            },
+        )
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def _run(bench_app: FastAPI, token: str) -> None:
+    transport = ASGITransport(app=bench_app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        existing_hash = hash_password(_PASSWORD)
+        hashed = _ndjson("hashed", _HASHED_ROWS, password_hash=existing_hash)
+        elapsed = await _import(client, token, hashed)
+        _report(f"bulk, {_HASHED_ROWS} pre-hashed", elapsed, _HASHED_ROWS)
+
+        plain = _ndjson("plain", _PLAIN_ROWS, password=_PASSWORD)
+        elapsed = await _import(client, token, plain)
+        _report(f"bulk, {_PLAIN_ROWS} plaintext", elapsed, _PLAIN_ROWS)
+
+        elapsed = await _register(client)
+        _report(f"register x{_REGISTERS}", elapsed, _REGISTERS)
+
+
+def _report(label: str, elapsed: float, rows: int) -> None:
+    print(
+        f"{label:<28} total={elapsed:7.2f}s per-user={elapsed / rows * 1e3:8.2f}ms "
+        f"({rows / elapsed:8.1f} users/s)"
+    )
+
+
+def main() -> None:
+    logging.getLogger("app.auth").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        token = _seed_admin(session_factory)
+        try:
+            asyncio.run(_run(_build_app(session_factory), token))
+        finally:
+            password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Measure JSON rendering and the catalog bytes cache on the list routes.
+
+``GET /api/bikes?limit=200`` is timed with ``catalog_cache`` disabled (every
+request reads, validates and encodes the page) and enabled (repeat requests
+return the cached bytes). ``GET /api/rentals?limit=100`` is timed with the
+stdlib-backed ``JSONResponse`` and with ``ORJSONResponse`` as the app's
+default response class, which is what ``ORJSON_RESPONSES=true`` selects. Run
+from the repository root:
+
+    python benchmarks/bench_catalog_responses.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from app.auth import get_current_user_async  # noqa: E402
+from app.catalog_cache import catalog_cache  # noqa: E402
+from app.db import Base, get_async_db, get_read_db  # noqa: E402
+from app.models import AvailabilityStatus, Bike, Rental, User  # noqa: E402
+from app.routers import bikes, rentals  # noqa: E402
+
+_BIKES = 1_000
+_REQUESTS = 500
+
+
+def _seed(url: str) -> User:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as db:
+        user = User(name="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.add_all(
+            Bike(
+                name=f"bike {i}",
+                type="city",
+                rate_per_day_cents=1_000 + i,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for i in range(_BIKES)
+        )
+        db.flush()
+        first = date(2024, 1, 1)
+        db.add_all(
+            Rental(
+                bike_id=i + 1,
+                user_id=user.id,
+                start_date=first + timedelta(days=i),
+                end_date=first + timedelta(days=i + 1),
+                total_price_cents=1_000,
+            )
+            for i in range(_BIKES)
+        )
+        db.commit()
+    engine.dispose()
+    return user
+
+
+async def _requests_per_second(bench_app: FastAPI, url: str) -> float:
+    transport = ASGITransport(app=bench_app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        assert (await client.get(url)).status_code == 200
+        started = time.perf_counter()
+        for _ in range(_REQUESTS):
+            await client.get(url)
+        return _REQUESTS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/catalog.db"
+        user = _seed(url.replace("+aiosqlite", ""))
+        async_engine = create_async_engine(
+            url, poolclass=AsyncAdaptedQueuePool, pool_size=5, max_overflow=0
+        )
+        session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+        async def _get_async_db() -> AsyncIterator[AsyncSession]:
+            async with session_factory() as db:
+                yield db
+
+        def build(response_class: type[JSONResponse]) -> FastAPI:
+            bench_app = FastAPI(default_response_class=response_class)
+            bench_app.include_router(bikes.router)
+            bench_app.include_router(rentals.router)
+            bench_app.dependency_overrides[get_async_db] = _get_async_db
+            bench_app.dependency_overrides[get_read_db] = _get_async_db
+            bench_app.dependency_overrides[get_current_user_async] = lambda: user
+            return bench_app
+
+        async def run() -> None:
+            try:
+                print(f"{_REQUESTS} sequential requests per case")
+                for enabled in (False, True):
+                    catalog_cache.enabled = enabled
+                    catalog_cache.clear()
+                    rate = await _requests_per_second(
+                        build(JSONResponse), "/api/bikes?limit=200"
+                    )
+                    label = "cached" if enabled else "uncached"
+                    print(f"GET /api/bikes   {label:<14} {rate:8.0f} req/s")
+                for response_class in (JSONResponse, ORJSONResponse):
+                    rate = await _requests_per_second(
+                        build(response_class), "/api/rentals?limit=100"
+                    )
+                    print(
+                        f"GET /api/rentals {response_class.__name__:<14} "
+                        f"{rate:8.0f} req/s"
+                    )
+            finally:
+                await async_engine.dispose()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Measure payload sizes and the cost of compressing the bike catalog.
+
+Prints the size of a 200-bike ``GET /api/bikes`` page uncompressed, gzipped
+and brotli-compressed at the configured levels, then times requests through
+``CompressionMiddleware`` for each encoding with ``catalog_cache`` disabled
+(every response is encoded and compressed again) and enabled (repeat
+requests reuse the page's compressed bytes). Run from the repository root:
+
+    python benchmarks/bench_compression.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from app.catalog_cache import catalog_cache  # noqa: E402
+from app.compression import CompressionMiddleware, compress  # noqa: E402
+from app.db import Base, get_read_db  # noqa: E402
+from app.models import AvailabilityStatus, Bike  # noqa: E402
+from app.routers import bikes  # noqa: E402
+
+_BIKES = 1_000
+_REQUESTS = 500
+_URL = "/api/bikes?limit=200"
+
+
+def _seed(url: str) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            Bike(
+                name=f"bike {i}",
+                type=("city", "road", "mountain")[i % 3],
+                rate_per_day_cents=1_000 + i,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for i in range(_BIKES)
+        )
+        db.commit()
+    engine.dispose()
+
+
+async def _requests_per_second(client: AsyncClient, encoding: str) -> float:
+    headers = {"Accept-Encoding": encoding}
+    assert (await client.get(_URL, headers=headers)).status_code == 200
+    started = time.perf_counter()
+    for _ in range(_REQUESTS):
+        await client.get(_URL, headers=headers)
+    return _REQUESTS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/compression.db"
+        _seed(url.replace("+aiosqlite", ""))
+        async_engine = create_async_engine(
+            url, poolclass=AsyncAdaptedQueuePool, pool_size=5, max_overflow=0
+        )
+        session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+        async def _get_read_db() -> AsyncIterator[AsyncSession]:
+            async with session_factory() as db:
+                yield db
+
+        bench_app = FastAPI()
+        bench_app.include_router(bikes.router)
+        bench_app.add_middleware(CompressionMiddleware)
+        bench_app.dependency_overrides[get_read_db] = _get_read_db
+
+        async def run() -> None:
+            transport = ASGITransport(app=bench_app)
+            client = AsyncClient(transport=transport, base_url="http://bench")
+            try:
+                async with client:
+                    plain = await client.get(
+                        _URL, headers={"Accept-Encoding": "identity"}
+                    )
+                    body = plain.content
+                    print(f"page of 200 bikes: {len(body)} bytes uncompressed")
+                    for encoding in ("gzip", "br"):
+                        print(f"  {encoding:<4} {len(compress(body, encoding))} bytes")
+
+                    print(f"{_REQUESTS} sequential requests per case")
+                    for enabled in (False, True):
+                        catalog_cache.enabled = enabled
+                        catalog_cache.clear()
+                        label = "cached" if enabled else "uncached"
+                        for encoding in ("identity", "gzip", "br"):
+                            rate = await _requests_per_second(client, encoding)
+                            print(f"  {label:<9} {encoding:<9} {rate:8.0f} req/s")
+            finally:
+                await async_engine.dispose()
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
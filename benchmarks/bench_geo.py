@@ -0,0 +1,65 @@
+"""Compare per-pair geopy distance calls with the vectorized haversine module.
+
+Run from the repository root:
+
+    python benchmarks/bench_geo.py
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from geopy.distance import distance as geodesic
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.geo import distances_from_point, haversine_m  # noqa: E402
+
+_CANDIDATE_COUNTS = (1_000, 10_000, 100_000)
+_ORIGIN = (51.5, -0.12)
+
+
+def _time(func, repeat: int = 3) -> float:
+    """Return the best wall-clock time in seconds over repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(
+        f"{'candidates':>10} {'geopy loop':>12} {'math loop':>12} "
+        f"{'numpy':>10} {'speedup':>9}"
+    )
+    for count in _CANDIDATE_COUNTS:
+        lats = _ORIGIN[0] + rng.uniform(-0.2, 0.2, count)
+        lngs = _ORIGIN[1] + rng.uniform(-0.3, 0.3, count)
+        lat_list, lng_list = lats.tolist(), lngs.tolist()
+
+        geopy_seconds = _time(
+            lambda: [geodesic(_ORIGIN, point).m for point in zip(lat_list, lng_list)],
+            repeat=1,
+        )
+        math_seconds = _time(
+            lambda: [
+                haversine_m(_ORIGIN[0], _ORIGIN[1], lat, lng)
+                for lat, lng in zip(lat_list, lng_list)
+            ]
+        )
+        numpy_seconds = _time(lambda: distances_from_point(*_ORIGIN, lats, lngs))
+        print(
+            f"{count:>10} {geopy_seconds * 1e3:>10.1f}ms {math_seconds * 1e3:>10.1f}ms "
+            f"{numpy_seconds * 1e3:>8.2f}ms {geopy_seconds / numpy_seconds:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
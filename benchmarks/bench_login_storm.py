@@ -0,0 +1,166 @@
+"""Measure /api/bikes latency while a storm of logins hashes passwords.
+
+Compares verifying bcrypt inline on the request threadpool (the previous
+behaviour) with the bounded process pool in ``app.password_hasher``. Run from
+the repository root after creating ``.env`` (slowapi requires it):
+
+    cp .env.example .env
+    python benchmarks/bench_login_storm.py
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+import app.auth as auth_utils  # noqa: E402
+from app.db import Base, get_async_db  # noqa: E402
+from app.models import AvailabilityStatus, Bike, User  # noqa: E402
+from app.password_hasher import (  # noqa: E402
+    PasswordHasher,
+    check_password,
+    hash_password,
+)
+from app.routers import auth as auth_router  # noqa: E402
+from app.routers import bikes  # noqa: E402
+
+_LOGINS = 64
+_PROBES = 200
+_PASSWORD = "benchmark-password"
+
+
+class _InlineHasher:
+    """Previous behaviour: bcrypt on the request threadpool."""
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await run_in_threadpool(check_password, plain_password, hashed_password)
+
+
+def _build_app(session_factory: async_sessionmaker[AsyncSession]) -> FastAPI:
+    auth_router.limiter.enabled = False
+    bench_app = FastAPI()
+    bench_app.state.limiter = auth_router.limiter
+    bench_app.include_router(auth_router.router)
+    bench_app.include_router(bikes.router)
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as db:
+            yield db
+
+    bench_app.dependency_overrides[get_async_db] = _get_async_db
+    return bench_app
+
+
+def _seed(session_factory: sessionmaker[Session]) -> None:
+    hashed = hash_password(_PASSWORD)
+    with session_factory() as db:
+        db.add_all(
+            User(name=f"user {i}", email=f"user{i}@example.com", hashed_password=hashed)
+            for i in range(_LOGINS)
+        )
+        db.add_all(
+            Bike(
+                name=f"bike {i}",
+                type="city",
+                rate_per_day_cents=1000 + i,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for i in range(200)
+        )
+        db.commit()
+
+
+async def _probe(client: AsyncClient, count: int) -> list[float]:
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get("/api/bikes", params={"limit": 50})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1e3)
+    return latencies
+
+
+async def _run(bench_app: FastAPI, storm: bool) -> list[float]:
+    transport = ASGITransport(app=bench_app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _probe(client, 10)  # warm up
+        logins = []
+        if storm:
+            logins = [
+                asyncio.create_task(
+                    client.post(
+                        "/auth/login",
+                        json={"email": f"user{i}@example.com", "password": _PASSWORD},
+                    )
+                )
+                for i in range(_LOGINS)
+            ]
+            await asyncio.sleep(0.05)
+        latencies = await _probe(client, _PROBES)
+        statuses = [response.status_code for response in await asyncio.gather(*logins)]
+        if storm:
+            shed = statuses.count(503)
+            print(f"    logins ok={statuses.count(200)} shed(503)={shed}")
+        return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{label:<28} p50={quantiles[49]:7.2f}ms p99={quantiles[98]:7.2f}ms "
+        f"max={max(latencies):7.2f}ms"
+    )
+
+
+def main() -> None:
+    logging.getLogger("app.auth").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False}
+        )
+        Base.metadata.create_all(engine)
+        _seed(sessionmaker(bind=engine))
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        bench_app = _build_app(
+            async_sessionmaker(bind=async_engine, expire_on_commit=False)
+        )
+
+        _report("idle", asyncio.run(_run(bench_app, storm=False)))
+
+        auth_utils.password_hasher = _InlineHasher()
+        _report("storm, inline threadpool", asyncio.run(_run(bench_app, storm=True)))
+
+        pool = PasswordHasher()
+        auth_utils.password_hasher = pool
+        try:
+            _report("storm, process pool", asyncio.run(_run(bench_app, storm=True)))
+        finally:
+            pool.shutdown()
+            asyncio.run(async_engine.dispose())
+
+
+if __name__ == "__main__":
+    main()
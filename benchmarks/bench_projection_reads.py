@@ -0,0 +1,173 @@
+"""Compare ORM and column-projection listings at 10k rows.
+
+"orm" loads ``Bike`` (or ``Rental`` with its joined ``Bike``) instances and
+validates them into the read schemas through ``from_attributes``, as the
+list routes used to. "rows" selects only the schema's columns with
+``get_available_bike_rows`` / ``get_rental_rows_for_user`` and validates the
+plain rows once through the shared ``TypeAdapter``. Both then serialize to
+JSON. Reports the best wall time and the peak traced allocation of each
+path. Run from the repository root:
+
+    python benchmarks/bench_projection_reads.py
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session, joinedload, sessionmaker  # noqa: E402
+
+from app.db import Base  # noqa: E402
+from app.models import AvailabilityStatus, Bike, Rental, User  # noqa: E402
+from app.repositories import bike_repo, rental_repo  # noqa: E402
+from app.schemas.bike_schema import BIKE_READ_LIST, BikeRead  # noqa: E402
+from app.schemas.rental_schema import (  # noqa: E402
+    RENTAL_WITH_BIKE_READ_LIST,
+    RentalWithBikeRead,
+)
+
+_ROWS = 10_000
+_RUNS = 5
+
+# What FastAPI does with ORM results: validate each object by attribute.
+_BIKES_FROM_ORM = TypeAdapter(list[BikeRead])
+_RENTALS_FROM_ORM = TypeAdapter(list[RentalWithBikeRead])
+
+
+def _seed(session_factory: sessionmaker[Session]) -> int:
+    with session_factory() as db:
+        user = User(name="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.add_all(
+            Bike(
+                name=f"bike {i}",
+                type="city",
+                rate_per_day_cents=1_000 + i % 500,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for i in range(_ROWS)
+        )
+        db.flush()
+        first = date(2020, 1, 1)
+        db.add_all(
+            Rental(
+                bike_id=i + 1,
+                user_id=user.id,
+                start_date=first + timedelta(days=i),
+                end_date=first + timedelta(days=i + 1),
+                total_price_cents=1_000,
+            )
+            for i in range(_ROWS)
+        )
+        db.commit()
+        return user.id
+
+
+def _orm_bikes(db: Session) -> list[Bike]:
+    statement = (
+        select(Bike)
+        .where(Bike.availability_status == AvailabilityStatus.AVAILABLE)
+        .order_by(Bike.id)
+    )
+    return db.execute(statement).scalars().all()
+
+
+def _orm_rentals(db: Session, user_id: int) -> list[Rental]:
+    statement = (
+        select(Rental)
+        .options(joinedload(Rental.bike))
+        .where(Rental.user_id == user_id)
+        .order_by(Rental.created_at.desc(), Rental.id.desc())
+    )
+    return db.execute(statement).scalars().all()
+
+
+def _measure(
+    session_factory: sessionmaker[Session], read: Callable[[Session], bytes]
+) -> tuple[float, float]:
+    """Return (best seconds, peak MiB) of ``read`` on a fresh session."""
+    best = float("inf")
+    for _ in range(_RUNS):
+        with session_factory() as db:
+            started = time.perf_counter()
+            read(db)
+            best = min(best, time.perf_counter() - started)
+
+    with session_factory() as db:
+        tracemalloc.start()
+        read(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/projection.db")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        user_id = _seed(session_factory)
+
+        cases: dict[str, dict[str, Callable[[Session], bytes]]] = {
+            "bikes": {
+                "orm": lambda db: _BIKES_FROM_ORM.dump_json(
+                    _BIKES_FROM_ORM.validate_python(
+                        _orm_bikes(db), from_attributes=True
+                    )
+                ),
+                "rows": lambda db: BIKE_READ_LIST.dump_json(
+                    BIKE_READ_LIST.validate_python(
+                        bike_repo.get_available_bike_rows(db)
+                    )
+                ),
+            },
+            "rentals": {
+                "orm": lambda db: _RENTALS_FROM_ORM.dump_json(
+                    _RENTALS_FROM_ORM.validate_python(
+                        _orm_rentals(db, user_id),
+                        from_attributes=True,
+                    )
+                ),
+                "rows": lambda db: RENTAL_WITH_BIKE_READ_LIST.dump_json(
+                    RENTAL_WITH_BIKE_READ_LIST.validate_python(
+                        rental_repo.get_rental_rows_for_user(db, user_id)
+                    )
+                ),
+            },
+        }
+
+        print(f"{_ROWS} rows, best of {_RUNS} runs")
+        for listing, paths in cases.items():
+            results: dict[str, Any] = {}
+            for path, read in paths.items():
+                seconds, peak = _measure(session_factory, read)
+                results[path] = (seconds, peak)
+                print(
+                    f"{listing:<8} {path:<5} {seconds * 1e3:8.1f} ms "
+                    f"peak {peak:6.1f} MiB"
+                )
+            (orm_s, orm_peak), (rows_s, rows_peak) = results["orm"], results["rows"]
+            print(
+                f"{listing:<8} rows/orm: {rows_s / orm_s:.2f}x time, "
+                f"{rows_peak / orm_peak:.2f}x peak memory"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
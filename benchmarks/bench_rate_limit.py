@@ -0,0 +1,157 @@
+"""Measure rate limiting overhead per request and per counter hit.
+
+Part one times an unlimited route through a bare app, slowapi's
+``SlowAPIMiddleware``, and ``app.rate_limiter.RateLimitMiddleware``. The ASGI
+app is called directly, so no HTTP client cost is included. Part two times one
+sliding-window ``hit`` against each storage, and part three one token bucket
+``consume_token`` as used by the per-user tiers. Set ``RATE_LIMIT_BENCH_RESP_URI``
+(for example ``resp://localhost:6379/0``) to include a Redis-protocol server.
+Run from the repository root after creating ``.env`` (slowapi requires it):
+
+    cp .env.example .env
+    python benchmarks/bench_rate_limit.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI  # noqa: E402
+from limits import parse  # noqa: E402
+from limits.storage import storage_from_string  # noqa: E402
+from limits.strategies import SlidingWindowCounterRateLimiter  # noqa: E402
+from slowapi import Limiter  # noqa: E402
+from slowapi.middleware import SlowAPIMiddleware  # noqa: E402
+from slowapi.util import get_remote_address  # noqa: E402
+
+from app.rate_limit_storage import token_buckets_from_uri  # noqa: E402
+from app.rate_limiter import RateLimitMiddleware  # noqa: E402
+
+_REQUESTS = 5_000
+_HITS = 5_000
+
+
+def _build_app(middleware: type | None) -> FastAPI:
+    bench_app = FastAPI()
+    limiter = Limiter(key_func=get_remote_address)
+    bench_app.state.limiter = limiter
+    if middleware is RateLimitMiddleware:
+        bench_app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    elif middleware is not None:
+        bench_app.add_middleware(middleware)
+
+    @bench_app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return bench_app
+
+
+async def _call(bench_app: FastAPI, count: int) -> list[float]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def send(_message: dict) -> None:
+        return None
+
+    timings = []
+    for _ in range(count):
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive() -> dict:
+            if messages:
+                return messages.pop()
+            # Like a server: block until the client disconnects.
+            await asyncio.Event().wait()
+            return {"type": "http.disconnect"}
+
+        started = time.perf_counter()
+        await bench_app(dict(scope), receive, send)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    quantiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{label:<30} mean={statistics.fmean(timings):7.1f}us "
+        f"p50={quantiles[49]:7.1f}us p99={quantiles[98]:7.1f}us"
+    )
+
+
+def _bench_middleware() -> None:
+    for label, middleware in (
+        ("no middleware", None),
+        ("SlowAPIMiddleware", SlowAPIMiddleware),
+        ("RateLimitMiddleware", RateLimitMiddleware),
+    ):
+        bench_app = _build_app(middleware)
+        asyncio.run(_call(bench_app, 200))  # warm up
+        _report(label, asyncio.run(_call(bench_app, _REQUESTS)))
+
+
+def _bench_storage(label: str, uri: str) -> None:
+    storage = storage_from_string(uri)
+    limiter = SlidingWindowCounterRateLimiter(storage)
+    item = parse(f"{_HITS * 10}/minute")
+    timings = []
+    for i in range(_HITS):
+        started = time.perf_counter()
+        limiter.hit(item, f"client-{i % 100}")
+        timings.append((time.perf_counter() - started) * 1e6)
+    storage.reset()
+    _report(label, timings)
+
+
+def _bench_buckets(label: str, uri: str) -> None:
+    buckets = token_buckets_from_uri(uri)
+    timings = []
+    for i in range(_HITS):
+        started = time.perf_counter()
+        buckets.consume_token(f"tier:read:user:{i % 100}", rate=1_000.0, burst=100)
+        timings.append((time.perf_counter() - started) * 1e6)
+    buckets.reset()
+    _report(label, timings)
+
+
+def main() -> None:
+    print(f"unlimited route, {_REQUESTS} requests:")
+    _bench_middleware()
+    print(f"\nsliding-window hit, {_HITS} hits over 100 keys:")
+    _bench_storage("memory://", "memory://")
+    with tempfile.TemporaryDirectory() as tmp:
+        _bench_storage("sqlite:// (file, WAL)", f"sqlite:///{tmp}/limits.db")
+    resp_uri = os.getenv("RATE_LIMIT_BENCH_RESP_URI")
+    if resp_uri:
+        _bench_storage("resp://", resp_uri)
+    print(f"\ntoken bucket consume, {_HITS} requests over 100 users:")
+    _bench_buckets("memory://", "memory://")
+    with tempfile.TemporaryDirectory() as tmp:
+        _bench_buckets("sqlite:// (file, WAL)", f"sqlite:///{tmp}/limits.db")
+    if resp_uri:
+        _bench_buckets("resp://", resp_uri)
+
+
+if __name__ == "__main__":
+    main()
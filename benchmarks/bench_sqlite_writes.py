@@ -0,0 +1,208 @@
+"""Measure rental write throughput on SQLite with and without the tuned profile.
+
+"default" is SQLite as ``DATABASE_URL`` gets it out of the box: a rollback
+journal, an fsync per commit and writers contending for the database lock.
+"tuned" applies ``app.sqlite_profile.tuned_pragmas`` (WAL,
+``synchronous=NORMAL``) and queues writers on ``WriterLock``.
+
+Two workloads per profile: booking every bike once through
+``POST /api/rentals`` with many requests in flight, and a storm of small
+rental commits from several threads on sync sessions, which isolates the
+cost of a commit from the cost of the HTTP stack. Run from the repository
+root:
+
+    python benchmarks/bench_sqlite_writes.py
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+from datetime import date
+from pathlib import Path
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+import app.db as db_module  # noqa: E402
+from app.auth import get_current_user_async  # noqa: E402
+from app.db import Base, get_async_db  # noqa: E402
+from app.models import AvailabilityStatus, Bike, Rental, User  # noqa: E402
+from app.routers import rentals  # noqa: E402
+from app.sqlite_profile import WriterLock, apply_pragmas, tuned_pragmas  # noqa: E402
+
+_BIKES = 1_000
+_IN_FLIGHT = 100
+_THREADS = 8
+_COMMITS_PER_THREAD = 250
+
+
+def _seed(url: str) -> User:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as db:
+        user = User(name="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.add_all(
+            Bike(
+                name=f"bike {i}",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for i in range(_BIKES)
+        )
+        db.commit()
+    engine.dispose()
+    return user
+
+
+async def _book_all(bench_app: FastAPI, user: User) -> tuple[float, Counter]:
+    gate = asyncio.Semaphore(_IN_FLIGHT)
+    transport = ASGITransport(app=bench_app, raise_app_exceptions=False)
+
+    async def book(client: AsyncClient, bike_id: int) -> int:
+        async with gate:
+            response = await client.post(
+                "/api/rentals",
+                json={
+                    "bike_id": bike_id,
+                    "user_id": user.id,
+                    "start_date": date(2024, 8, 1).isoformat(),
+                    "end_date": date(2024, 8, 3).isoformat(),
+                    "total_price_cents": 0,
+                },
+            )
+            return response.status_code
+
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        statuses = await asyncio.gather(
+            *(book(client, bike_id) for bike_id in range(1, _BIKES + 1))
+        )
+        elapsed = time.perf_counter() - started
+    return elapsed, Counter(statuses)
+
+
+def _scenario(directory: str, tuned: bool) -> None:
+    url = f"sqlite+aiosqlite:///{directory}/{'tuned' if tuned else 'default'}.db"
+    user = _seed(url.replace("+aiosqlite", ""))
+    async_engine = create_async_engine(
+        url, poolclass=AsyncAdaptedQueuePool, pool_size=10, max_overflow=0
+    )
+    if tuned:
+        apply_pragmas(async_engine.sync_engine, tuned_pragmas())
+    session_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as db:
+            yield db
+
+    bench_app = FastAPI()
+    bench_app.include_router(rentals.router)
+    bench_app.dependency_overrides[get_async_db] = _get_async_db
+    bench_app.dependency_overrides[get_current_user_async] = lambda: user
+    db_module.sqlite_writer_lock = WriterLock() if tuned else None
+
+    async def run() -> tuple[float, Counter]:
+        try:
+            return await _book_all(bench_app, user)
+        finally:
+            await async_engine.dispose()
+
+    elapsed, statuses = asyncio.run(run())
+    booked = statuses[200]
+    print(
+        f"{'tuned' if tuned else 'default':<8} {booked / elapsed:8.0f} bookings/s "
+        f"booked={booked} failed={_BIKES - booked} statuses={dict(statuses)}"
+    )
+
+
+def _commit_storm(directory: str, tuned: bool) -> None:
+    url = f"sqlite:///{directory}/storm-{'tuned' if tuned else 'default'}.db"
+    user = _seed(url)
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=_THREADS,
+        max_overflow=0,
+    )
+    if tuned:
+        apply_pragmas(engine, tuned_pragmas())
+    writer_lock = WriterLock() if tuned else None
+    failures = 0
+
+    def commit(db: Session, day: int, bike_id: int) -> None:
+        start = date.fromordinal(date(2024, 1, 1).toordinal() + day)
+        db.add(
+            Rental(
+                bike_id=bike_id,
+                user_id=user.id,
+                start_date=start,
+                end_date=start,
+                total_price_cents=0,
+            )
+        )
+        db.commit()
+
+    def writer(offset: int) -> None:
+        nonlocal failures
+        with Session(engine) as db:
+            for day in range(_COMMITS_PER_THREAD):
+                try:
+                    if writer_lock is None:
+                        commit(db, day, offset + 1)
+                    else:
+                        with writer_lock:
+                            commit(db, day, offset + 1)
+                except OperationalError:
+                    db.rollback()
+                    failures += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(_THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    committed = _THREADS * _COMMITS_PER_THREAD - failures
+    print(
+        f"{'tuned' if tuned else 'default':<8} {committed / elapsed:8.0f} commits/s "
+        f"committed={committed} failed={failures}"
+    )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{_BIKES} bookings, {_IN_FLIGHT} in flight, pool of 10 connections")
+        _scenario(tmp, tuned=False)
+        _scenario(tmp, tuned=True)
+        print(f"{_THREADS} threads x {_COMMITS_PER_THREAD} rental commits")
+        _commit_storm(tmp, tuned=False)
+        _commit_storm(tmp, tuned=True)
+
+
+if __name__ == "__main__":
+    main()
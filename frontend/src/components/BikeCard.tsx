@@ -54,7 +54,7 @@ export function BikeCard({ bike }: BikeCardProps) {
       <button
         type="button"
         className="bike-card__rent-button"
-        onClick={() => navigate(`/rent/${bike.id}`)}
+        onClick={() => navigate(`/rent/${bike.id}`, { state: { bike } })}
         disabled={!isAvailable}
       >
         Rent
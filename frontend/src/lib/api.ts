@@ -10,4 +10,23 @@ export const api = axios.create({
   baseURL: baseURL || undefined,
 })
 
+// List routes return one page at a time and name the next one in this header.
+const NEXT_CURSOR_HEADER = 'x-next-cursor'
+
+export type Page<T> = {
+  items: T[]
+  nextCursor: string | null
+}
+
+export async function getPage<T>(url: string, cursor?: string | null): Promise<Page<T>> {
+  const response = await api.get<T[]>(url, {
+    params: cursor ? { cursor } : undefined,
+  })
+  const next = response.headers[NEXT_CURSOR_HEADER]
+  return {
+    items: response.data,
+    nextCursor: typeof next === 'string' && next ? next : null,
+  }
+}
+
 export default api
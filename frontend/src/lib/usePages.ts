@@ -0,0 +1,79 @@
+import { useCallback, useEffect, useState } from 'react'
+import axios from 'axios'
+import { getPage } from './api'
+
+export type PagesStatus = 'idle' | 'loading' | 'success' | 'error'
+
+function describeError(error: unknown): string {
+  if (axios.isAxiosError(error) && error.response?.status === 429) {
+    const retryAfter = error.response.headers['retry-after']
+    return retryAfter
+      ? `Too many requests. Please try again in ${retryAfter} seconds.`
+      : 'Too many requests. Please try again shortly.'
+  }
+  return 'Something went wrong. Please try again.'
+}
+
+/**
+ * Load a cursor-paginated list one page at a time.
+ *
+ * The first page loads on mount; `loadMore` appends the next one. A failed
+ * `loadMore` keeps the pages already shown and reports `loadMoreError`.
+ */
+export function usePages<T>(url: string) {
+  const [items, setItems] = useState<T[]>([])
+  const [status, setStatus] = useState<PagesStatus>('idle')
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
+  const [loadMoreError, setLoadMoreError] = useState<string | null>(null)
+
+  useEffect(() => {
+    let isActive = true
+
+    async function loadFirstPage() {
+      setStatus('loading')
+      try {
+        const page = await getPage<T>(url)
+        if (!isActive) return
+        setItems(page.items)
+        setNextCursor(page.nextCursor)
+        setStatus('success')
+      } catch (error) {
+        console.error(`Failed to fetch ${url}`, error)
+        if (!isActive) return
+        setStatus('error')
+      }
+    }
+
+    loadFirstPage()
+
+    return () => {
+      isActive = false
+    }
+  }, [url])
+
+  const loadMore = useCallback(async () => {
+    if (!nextCursor || isLoadingMore) return
+    setIsLoadingMore(true)
+    setLoadMoreError(null)
+    try {
+      const page = await getPage<T>(url, nextCursor)
+      setItems((previous) => [...previous, ...page.items])
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      console.error(`Failed to fetch more of ${url}`, error)
+      setLoadMoreError(describeError(error))
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }, [url, nextCursor, isLoadingMore])
+
+  return {
+    items,
+    status,
+    hasMore: nextCursor !== null,
+    isLoadingMore,
+    loadMoreError,
+    loadMore,
+  }
+}
@@ -1,38 +1,16 @@
-import { useEffect, useState } from 'react'
 import { BikeCard } from '../components/BikeCard'
 import type { Bike } from '../components/BikeCard'
-import api from '../lib/api'
-
-type FetchState = 'idle' | 'loading' | 'success' | 'error'
+import { usePages } from '../lib/usePages'
 
 export function BikeList() {
-  const [bikes, setBikes] = useState<Bike[]>([])
-  const [status, setStatus] = useState<FetchState>('idle')
-
-  useEffect(() => {
-    let isActive = true
-
-    async function loadBikes() {
-      setStatus('loading')
-
-      try {
-        const response = await api.get<Bike[]>('/api/bikes')
-        if (!isActive) return
-        setBikes(response.data)
-        setStatus('success')
-      } catch (error) {
-        console.error('Failed to fetch bikes', error)
-        if (!isActive) return
-        setStatus('error')
-      }
-    }
-
-    loadBikes()
-
-    return () => {
-      isActive = false
-    }
-  }, [])
+  const {
+    items: bikes,
+    status,
+    hasMore,
+    isLoadingMore,
+    loadMoreError,
+    loadMore,
+  } = usePages<Bike>('/api/bikes')
 
   const showEmptyState = status === 'success' && bikes.length === 0
 
@@ -66,6 +44,19 @@ export function BikeList() {
           ))}
         </section>
       )}
+
+      {loadMoreError && <p role="alert">{loadMoreError}</p>}
+
+      {status === 'success' && hasMore && (
+        <button
+          type="button"
+          className="load-more-button"
+          onClick={loadMore}
+          disabled={isLoadingMore}
+        >
+          {isLoadingMore ? 'Loading…' : 'Load more bikes'}
+        </button>
+      )}
     </main>
   )
 }
@@ -1,9 +1,10 @@
 import { useEffect, useMemo, useState } from 'react'
 import type { FormEvent } from 'react'
 import axios from 'axios'
-import { useNavigate, useParams } from 'react-router-dom'
+import { useLocation, useNavigate, useParams } from 'react-router-dom'
 import type { Bike } from '../components/BikeCard'
 import api from '../lib/api'
+import { usePages } from '../lib/usePages'
 
 type FormValues = {
   name: string
@@ -16,8 +17,6 @@ type FormValues = {
 
 type FieldErrors = Partial<Record<keyof FormValues, string>>
 
-type FetchStatus = 'idle' | 'loading' | 'success' | 'error'
-
 function calculateDurationDays(start: string, end: string): number | null {
   if (!start || !end) {
     return null
@@ -40,8 +39,16 @@ export function RentalForm() {
   const navigate = useNavigate()
   const { bikeId: bikeIdParam } = useParams<{ bikeId?: string }>()
 
-  const [bikes, setBikes] = useState<Bike[]>([])
-  const [bikeFetchStatus, setBikeFetchStatus] = useState<FetchStatus>('idle')
+  // The bike chosen on the bike list, which may not be on the first page here.
+  const chosenBike = (useLocation().state as { bike?: Bike } | null)?.bike
+  const {
+    items: bikePages,
+    status: bikeFetchStatus,
+    hasMore: hasMoreBikes,
+    isLoadingMore: isLoadingMoreBikes,
+    loadMoreError: loadMoreBikesError,
+    loadMore: loadMoreBikes,
+  } = usePages<Bike>('/api/bikes')
   const [values, setValues] = useState<FormValues>({
     name: '',
     email: '',
@@ -54,33 +61,13 @@ export function RentalForm() {
   const [formError, setFormError] = useState<string | null>(null)
   const [isSubmitting, setIsSubmitting] = useState(false)
 
-  useEffect(() => {
-    let isMounted = true
-
-    async function loadBikes() {
-      setBikeFetchStatus('loading')
-      try {
-        const response = await api.get<Bike[]>('/api/bikes')
-        if (!isMounted) {
-          return
-        }
-        setBikes(response.data)
-        setBikeFetchStatus('success')
-      } catch (error) {
-        console.error('Failed to fetch bikes for rental form', error)
-        if (!isMounted) {
-          return
-        }
-        setBikeFetchStatus('error')
-      }
-    }
-
-    loadBikes()
-
-    return () => {
-      isMounted = false
-    }
-  }, [])
+  const bikes = useMemo(
+    () =>
+      chosenBike && !bikePages.some((bike) => bike.id === chosenBike.id)
+        ? [chosenBike, ...bikePages]
+        : bikePages,
+    [bikePages, chosenBike],
+  )
 
   const availableBikes = useMemo(
     () => bikes.filter((bike) => bike.availability_status === 'available'),
@@ -415,6 +402,19 @@ export function RentalForm() {
             )}
           </label>
 
+          {loadMoreBikesError && <p role="alert">{loadMoreBikesError}</p>}
+
+          {hasMoreBikes && (
+            <button
+              type="button"
+              className="load-more-button"
+              onClick={loadMoreBikes}
+              disabled={isLoadingMoreBikes}
+            >
+              {isLoadingMoreBikes ? 'Loading…' : 'Load more bikes'}
+            </button>
+          )}
+
           {selectedBike &&
             normalizedDurationDays !== null &&
             normalizedDurationDays > 0 &&
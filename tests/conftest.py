@@ -2,16 +2,28 @@
 from __future__ import annotations
 
 import asyncio
+import importlib
 import os
+import sqlite3
 import sys
 import uuid
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from pathlib import Path
+from types import ModuleType
 
+import aiosqlite
 import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -22,27 +34,80 @@ if str(ROOT) not in sys.path:
 # Ensure authentication layer has required secret during tests.
 os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
 
-from app.auth import get_current_user
-from app.db import Base, get_db
+from app.auth import get_current_user, get_current_user_async
+from app.catalog_cache import catalog_cache
+from app.db import SLOW_QUERY_MS, Base, get_async_db, get_db
 from app.models.user import User
-from app.routers import bikes, rentals
+from app.query_metrics import QueryStats, instrument_engine, track_queries
+from app.routers import bikes, quotes, rentals
+from app.revocation import revocation_filter
+from app.user_cache import user_cache
 
-TEST_DATABASE_URL = "sqlite+pysqlite:///:memory:"
+# One in-memory database shared by a sync and an asyncio engine: both wrap the
+# same SQLite connection, so async routes see rows a test added through
+# ``db_session`` and everything rolls back together.
+_test_connection = sqlite3.connect(":memory:", check_same_thread=False)
 
 engine = create_engine(
-    TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
+    "sqlite+pysqlite://",
+    creator=lambda: _test_connection,
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+_ASYNC_CONNECTION_KEY = "async_connection"
+
+
+async def _connect_async() -> aiosqlite.Connection:
+    return await aiosqlite.Connection(lambda: _test_connection, 64)
+
+
+async_engine = create_async_engine(
+    "sqlite+aiosqlite://", async_creator=_connect_async, poolclass=StaticPool
+)
+instrument_engine(engine, SLOW_QUERY_MS / 1000)
+instrument_engine(async_engine.sync_engine, SLOW_QUERY_MS / 1000)
+
+
+# pysqlite defers BEGIN on its own, which lets route-level commits release the
+# per-test savepoint and leak rows; emit BEGIN explicitly so rollback holds.
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, _connection_record) -> None:
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection) -> None:
+    connection.exec_driver_sql("BEGIN")
+
+
 @pytest.fixture(scope="session", autouse=True)
 def create_test_database() -> Iterator[None]:
     """Create all tables in an in-memory database for the test session."""
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # Stops aiosqlite's worker thread, which would otherwise keep pytest alive.
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache() -> Iterator[None]:
+    """Keep cached token lookups and revocations from leaking between tests."""
+    user_cache.clear()
+    revocation_filter.clear()
+    yield
+    user_cache.clear()
+    revocation_filter.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_catalog_cache() -> Iterator[None]:
+    """Keep encoded catalog pages from outliving the rows each test added."""
+    catalog_cache.clear()
+    yield
+    catalog_cache.clear()
 
 
 @pytest.fixture()
@@ -52,19 +117,90 @@ def db_session() -> Iterator[Session]:
     transaction = connection.begin()
     session = TestingSessionLocal(bind=connection)
 
+    savepoint = session.begin_nested()
+
     @event.listens_for(session, "after_transaction_end")
     def restart_savepoint(session_, transaction_) -> None:  # type: ignore[unused-ignore]
-        if transaction_.nested and transaction_._parent is not None:
-            session_.begin_nested()
-
-    session.begin_nested()
+        # Restart only the per-test savepoint, not savepoints opened by app code.
+        nonlocal savepoint
+        if transaction_ is savepoint and transaction_._parent is not None:
+            savepoint = session_.begin_nested()
 
     try:
         yield session
     finally:
+        async_connection = session.info.pop(_ASYNC_CONNECTION_KEY, None)
         session.close()
         transaction.rollback()
         connection.close()
+        if async_connection is not None:
+            # Closed last: its rollback would end the shared transaction early.
+            asyncio.run(async_connection.close())
+
+
+@pytest.fixture()
+def async_db_session(db_session: Session) -> Iterator[AsyncSession]:
+    """Provide an ``AsyncSession`` inside ``db_session``'s transaction.
+
+    Its commits only release a savepoint; the rows are rolled back with the
+    rest of the test.
+    """
+
+    async def _begin() -> AsyncConnection:
+        connection = await async_engine.connect()
+        # The connection shares the sync test transaction; BEGIN emits no SQL.
+        await connection.begin()
+        return connection
+
+    connection = asyncio.run(_begin())
+    db_session.info[_ASYNC_CONNECTION_KEY] = connection
+    session = AsyncSession(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    try:
+        yield session
+    finally:
+        asyncio.run(session.close())
+
+
+def override_async_db(test_app: FastAPI, session: AsyncSession) -> None:
+    """Route ``get_async_db`` to ``session`` for the duration of a test."""
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        yield session
+
+    test_app.dependency_overrides[get_async_db] = _get_async_db
+
+
+@pytest.fixture()
+def query_budget() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """Fail the test when a block runs more SQL statements than its budget.
+
+    ``with query_budget(5): ...`` counts the statements issued inside the
+    block, including those of routes called through the test clients.
+    Savepoints belong to the per-test transaction and are not counted.
+    """
+
+    @contextmanager
+    def budget(limit: int) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        counted = [
+            statement
+            for statement, count in stats.statements.items()
+            for _ in range(count)
+            if "SAVEPOINT" not in statement
+        ]
+        if len(counted) > limit:
+            pytest.fail(
+                f"{len(counted)} statements exceeded the budget of {limit}:\n"
+                + "\n".join(counted)
+            )
+
+    return budget
 
 
 @pytest.fixture(scope="session")
@@ -72,6 +208,7 @@ def app() -> FastAPI:
     """Construct a lightweight FastAPI app for integration tests."""
     test_app = FastAPI(title="Test Personal Transport API")
     test_app.include_router(bikes.router)
+    test_app.include_router(quotes.router)
     test_app.include_router(rentals.router)
     return test_app
 
@@ -90,7 +227,12 @@ def test_user(db_session: Session) -> User:
 
 
 @pytest.fixture()
-def override_dependencies(app: FastAPI, db_session: Session, test_user: User) -> Iterator[None]:
+def override_dependencies(
+    app: FastAPI,
+    db_session: Session,
+    async_db_session: AsyncSession,
+    test_user: User,
+) -> Iterator[None]:
     """Override global dependencies with test equivalents."""
     def _get_db() -> Iterator[Session]:
         yield db_session
@@ -99,12 +241,13 @@ def override_dependencies(app: FastAPI, db_session: Session, test_user: User) ->
         return test_user
 
     app.dependency_overrides[get_db] = _get_db
+    override_async_db(app, async_db_session)
     app.dependency_overrides[get_current_user] = _get_current_user
+    app.dependency_overrides[get_current_user_async] = _get_current_user
     try:
         yield
     finally:
-        app.dependency_overrides.pop(get_db, None)
-        app.dependency_overrides.pop(get_current_user, None)
+        app.dependency_overrides.clear()
 
 
 @pytest.fixture()
@@ -116,3 +259,80 @@ def async_client(app: FastAPI, override_dependencies: None) -> Iterator[AsyncCli
         yield client
     finally:
         asyncio.run(client.aclose())
+
+
+@pytest.fixture(scope="session")
+def auth_router(tmp_path_factory: pytest.TempPathFactory) -> ModuleType:
+    """Import the auth router, which rate limits and so needs a ``.env`` file."""
+    # slowapi's Limiter insists on reading a .env file from the working directory.
+    env_dir = tmp_path_factory.mktemp("env")
+    (env_dir / ".env").touch()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(env_dir)
+        return importlib.import_module("app.routers.auth")
+
+
+@pytest.fixture()
+def auth_client(
+    db_session: Session, async_db_session: AsyncSession, auth_router: ModuleType
+) -> Iterator[AsyncClient]:
+    """Provide a client for the auth routes with fresh rate limits."""
+    limiter = auth_router.limiter
+    auth_app = FastAPI()
+    auth_app.state.limiter = limiter
+    auth_app.include_router(auth_router.router)
+
+    def _get_db() -> Iterator[Session]:
+        yield db_session
+
+    auth_app.dependency_overrides[get_db] = _get_db
+    override_async_db(auth_app, async_db_session)
+    client = AsyncClient(transport=ASGITransport(app=auth_app), base_url="http://t")
+    limiter.reset()
+    try:
+        yield client
+    finally:
+        asyncio.run(client.aclose())
+        limiter.reset()
+
+
+@pytest.fixture()
+def file_engine(tmp_path: Path) -> Iterator[Engine]:
+    """Provide a file-backed SQLite engine for tests needing real concurrency.
+
+    The shared in-memory engine funnels everything through one connection and
+    one outer transaction; tests exercising commits from many sessions at once
+    use this engine instead.
+    """
+    file_db_engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=file_db_engine)
+    try:
+        yield file_db_engine
+    finally:
+        file_db_engine.dispose()
+
+
+@pytest.fixture()
+def file_session_factory(file_engine: Engine) -> sessionmaker:
+    """Return a session factory bound to the file-backed test engine."""
+    return sessionmaker(bind=file_engine, autoflush=False, autocommit=False)
+
+
+@pytest.fixture()
+def file_async_session_factory(
+    file_engine: Engine,
+) -> Iterator[async_sessionmaker[AsyncSession]]:
+    """Return an ``AsyncSession`` factory for the file-backed test database."""
+    async_file_engine = create_async_engine(
+        file_engine.url.set(drivername="sqlite+aiosqlite"),
+        connect_args={"timeout": 30},
+    )
+    try:
+        yield async_sessionmaker(
+            bind=async_file_engine, autoflush=False, expire_on_commit=False
+        )
+    finally:
+        asyncio.run(async_file_engine.dispose())
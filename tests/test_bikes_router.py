@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Iterator
+from datetime import date, timedelta
 
+import pytest
 from sqlalchemy.orm import Session
 
 from app.models.bike import AvailabilityStatus, Bike
+from app.models.rental import Rental
+from app.services.pagination import encode_cursor
+from app.services.booking_calendar import booking_calendar
+from app.services.spatial_index import bike_index
 
 
 def test_list_available_bikes_returns_only_available(
@@ -38,3 +45,352 @@ def test_list_available_bikes_returns_only_available(
             "availability_status": AvailabilityStatus.AVAILABLE.value,
         }
     ]
+
+
+def _add_bikes(db_session: Session, specs: list[tuple[str, str, int]]) -> list[Bike]:
+    bikes = [
+        Bike(
+            name=name,
+            type=bike_type,
+            rate_per_day_cents=rate,
+            availability_status=AvailabilityStatus.AVAILABLE,
+        )
+        for name, bike_type, rate in specs
+    ]
+    db_session.add_all(bikes)
+    db_session.flush()
+    return bikes
+
+
+def test_list_available_bikes_pages_with_cursor(
+    async_client, db_session: Session
+) -> None:
+    bikes = _add_bikes(
+        db_session, [(f"Bike {index}", "city", 1000) for index in range(5)]
+    )
+
+    first = asyncio.run(async_client.get("/api/bikes", params={"limit": 2}))
+    assert first.status_code == 200
+    assert [bike["id"] for bike in first.json()] == [bikes[0].id, bikes[1].id]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = asyncio.run(
+        async_client.get("/api/bikes", params={"limit": 2, "cursor": cursor})
+    )
+    assert [bike["id"] for bike in second.json()] == [bikes[2].id, bikes[3].id]
+
+    last = asyncio.run(
+        async_client.get(
+            "/api/bikes",
+            params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]},
+        )
+    )
+    assert [bike["id"] for bike in last.json()] == [bikes[4].id]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_list_available_bikes_filters_and_sorts_by_rate(
+    async_client, db_session: Session
+) -> None:
+    _add_bikes(
+        db_session,
+        [
+            ("Cheap City", "city", 900),
+            ("Pricey City", "city", 3000),
+            ("Mid City A", "city", 1500),
+            ("Mid City B", "city", 1500),
+            ("Mid Road", "road", 1500),
+        ],
+    )
+    params = {
+        "type": "city",
+        "min_rate_cents": 1000,
+        "sort": "-rate_per_day_cents",
+        "limit": 2,
+    }
+
+    first = asyncio.run(async_client.get("/api/bikes", params=params))
+    assert [bike["name"] for bike in first.json()] == ["Pricey City", "Mid City B"]
+
+    second = asyncio.run(
+        async_client.get(
+            "/api/bikes",
+            params={**params, "cursor": first.headers["X-Next-Cursor"]},
+        )
+    )
+    assert [bike["name"] for bike in second.json()] == ["Mid City A"]
+
+
+def test_list_available_bikes_rejects_cursor_from_other_sort(
+    async_client, db_session: Session
+) -> None:
+    _add_bikes(db_session, [("One", "city", 1000), ("Two", "city", 1000)])
+    first = asyncio.run(async_client.get("/api/bikes", params={"limit": 1}))
+
+    response = asyncio.run(
+        async_client.get(
+            "/api/bikes",
+            params={"cursor": first.headers["X-Next-Cursor"], "sort": "name"},
+        )
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+@pytest.mark.parametrize(
+    ("sort", "key"),
+    [
+        ("id", ["1"]),
+        ("id", [True]),
+        ("name", [1, 1]),
+        ("name", ["One", None]),
+        ("rate_per_day_cents", [[1000], 1]),
+        ("-rate_per_day_cents", [1000.5, 1]),
+    ],
+)
+def test_list_available_bikes_rejects_cursor_with_mistyped_key(
+    async_client, sort: str, key: list
+) -> None:
+    cursor = encode_cursor(f"bikes:{sort}", key)
+
+    response = asyncio.run(
+        async_client.get("/api/bikes", params={"cursor": cursor, "sort": sort})
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+@pytest.fixture()
+def fresh_bike_index() -> Iterator[None]:
+    bike_index.clear()
+    yield
+    bike_index.clear()
+
+
+def _add_located_bike(
+    db_session: Session,
+    name: str,
+    lat: float,
+    lng: float,
+    status: AvailabilityStatus = AvailabilityStatus.AVAILABLE,
+) -> Bike:
+    bike = Bike(
+        name=name,
+        type="city",
+        rate_per_day_cents=1000,
+        availability_status=status,
+        lat=lat,
+        lng=lng,
+    )
+    db_session.add(bike)
+    db_session.flush()
+    return bike
+
+
+def test_list_nearby_bikes_orders_by_distance_within_radius(
+    async_client, db_session: Session, fresh_bike_index: None
+) -> None:
+    far = _add_located_bike(db_session, "Far", 51.5100, -0.1000)
+    near = _add_located_bike(db_session, "Near", 51.5010, -0.1000)
+    _add_located_bike(
+        db_session, "Booked", 51.5001, -0.1000, AvailabilityStatus.UNAVAILABLE
+    )
+    _add_located_bike(db_session, "Out Of Range", 51.6000, -0.1000)
+
+    response = asyncio.run(
+        async_client.get(
+            "/api/bikes/nearby", params={"lat": 51.5, "lng": -0.1, "radius": 2000}
+        )
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [bike["id"] for bike in data] == [near.id, far.id]
+    assert data[0]["distance_m"] == pytest.approx(111.2, abs=0.5)
+    assert data[0]["lat"] == 51.5010
+
+
+def test_list_nearby_bikes_tracks_committed_writes(
+    async_client, db_session: Session, fresh_bike_index: None
+) -> None:
+    bike = _add_located_bike(db_session, "Mover", 51.5, -0.1)
+    params = {"lat": 51.5, "lng": -0.1, "radius": 500}
+    first = asyncio.run(async_client.get("/api/bikes/nearby", params=params))
+    assert [item["id"] for item in first.json()] == [bike.id]
+
+    bike.lat, bike.lng = 48.85, 2.35
+    db_session.commit()
+
+    moved = asyncio.run(async_client.get("/api/bikes/nearby", params=params))
+    assert moved.json() == []
+
+
+def test_list_nearby_bikes_validates_coordinates(
+    async_client, fresh_bike_index: None
+) -> None:
+    response = asyncio.run(
+        async_client.get("/api/bikes/nearby", params={"lat": 95, "lng": 0})
+    )
+
+    assert response.status_code == 422
+
+
+def test_list_bikes_available_between_excludes_overlapping_rentals(
+    async_client, db_session: Session, test_user
+) -> None:
+    free, booked, open_ended = _add_bikes(
+        db_session,
+        [("Free", "city", 1000), ("Booked", "city", 1000), ("Open", "city", 1000)],
+    )
+    db_session.add_all(
+        [
+            Rental(
+                bike_id=booked.id,
+                user_id=test_user.id,
+                start_date=date(2024, 7, 2),
+                end_date=date(2024, 7, 4),
+                total_price_cents=2000,
+            ),
+            Rental(
+                bike_id=free.id,
+                user_id=test_user.id,
+                start_date=date(2024, 6, 28),
+                end_date=date(2024, 7, 1),
+                total_price_cents=3000,
+            ),
+            Rental(
+                bike_id=open_ended.id,
+                user_id=test_user.id,
+                start_date=date(2024, 6, 1),
+                end_date=None,
+                total_price_cents=0,
+            ),
+        ]
+    )
+    db_session.flush()
+
+    response = asyncio.run(
+        async_client.get(
+            "/api/bikes/available", params={"start": "2024-07-01", "end": "2024-07-03"}
+        )
+    )
+
+    assert response.status_code == 200
+    assert [bike["id"] for bike in response.json()] == [free.id]
+
+
+def test_list_bikes_available_between_rejects_invalid_range(async_client) -> None:
+    response = asyncio.run(
+        async_client.get(
+            "/api/bikes/available", params={"start": "2024-07-03", "end": "2024-07-01"}
+        )
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_RANGE"
+
+
+@pytest.fixture()
+def fresh_booking_calendar() -> Iterator[None]:
+    booking_calendar.clear()
+    yield
+    booking_calendar.clear()
+
+
+def test_get_fleet_calendar_reports_booked_days_and_free_runs(
+    async_client, db_session: Session, test_user, fresh_booking_calendar: None
+) -> None:
+    today = date.today()
+    busy, idle = _add_bikes(
+        db_session, [("Busy", "city", 1000), ("Idle", "city", 1000)]
+    )
+    db_session.add(
+        Rental(
+            bike_id=busy.id,
+            user_id=test_user.id,
+            start_date=today + timedelta(days=1),
+            end_date=today + timedelta(days=3),
+            total_price_cents=2000,
+        )
+    )
+    db_session.flush()
+
+    response = asyncio.run(
+        async_client.get("/api/bikes/calendar", params={"days": 5, "free_days": 2})
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["start"] == today.isoformat()
+    assert body["bikes"] == [
+        {
+            "bike_id": busy.id,
+            "booked": "01100",
+            "first_free_start": (today + timedelta(days=3)).isoformat(),
+        },
+        {"bike_id": idle.id, "booked": "00000", "first_free_start": today.isoformat()},
+    ]
+
+
+def test_get_fleet_calendar_applies_committed_rentals_incrementally(
+    async_client, db_session: Session, test_user, fresh_booking_calendar: None
+) -> None:
+    today = date.today()
+    (bike,) = _add_bikes(db_session, [("Solo", "city", 1000)])
+    bike.status = "available"  # type: ignore[attr-defined]
+    params = {"days": 4, "bike_id": bike.id}
+    before = asyncio.run(async_client.get("/api/bikes/calendar", params=params))
+    assert before.json()["bikes"][0]["booked"] == "0000"
+
+    created = asyncio.run(
+        async_client.post(
+            "/api/rentals",
+            json={
+                "bike_id": bike.id,
+                "user_id": test_user.id,
+                "start_date": today.isoformat(),
+                "end_date": (today + timedelta(days=2)).isoformat(),
+                "total_price_cents": 0,
+            },
+        )
+    )
+    assert created.status_code == 200, created.json()
+
+    after = asyncio.run(async_client.get("/api/bikes/calendar", params=params))
+    assert after.json()["bikes"][0]["booked"] == "1100"
+
+
+def test_get_fleet_calendar_applies_committed_batch_rentals(
+    async_client, db_session: Session, test_user, fresh_booking_calendar: None
+) -> None:
+    today = date.today()
+    first, second = _add_bikes(
+        db_session, [("Group A", "city", 1000), ("Group B", "city", 1000)]
+    )
+    params = {"days": 3, "bike_id": [first.id, second.id]}
+    asyncio.run(async_client.get("/api/bikes/calendar", params=params))
+
+    created = asyncio.run(
+        async_client.post(
+            "/api/rentals/batch",
+            json={
+                "items": [
+                    {
+                        "bike_id": bike.id,
+                        "user_id": test_user.id,
+                        "start_date": (today + timedelta(days=offset)).isoformat(),
+                        "end_date": (today + timedelta(days=offset + 1)).isoformat(),
+                        "total_price_cents": 0,
+                    }
+                    for offset, bike in enumerate([first, second])
+                ]
+            },
+        )
+    )
+    assert created.status_code == 200, created.json()
+
+    after = asyncio.run(async_client.get("/api/bikes/calendar", params=params))
+    rows = {row["bike_id"]: row["booked"] for row in after.json()["bikes"]}
+    assert rows == {first.id: "100", second.id: "010"}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.booking_calendar import (
+    BookingCalendar,
+    free_run_starts,
+    render_booked_days,
+)
+
+ORIGIN = date(2024, 7, 1)
+
+
+def _day(offset: int) -> date:
+    return ORIGIN + timedelta(days=offset)
+
+
+def test_load_marks_rental_windows_clipped_to_horizon():
+    calendar = BookingCalendar(horizon_days=10)
+
+    calendar.load(
+        ORIGIN,
+        [(1, True), (2, True), (3, False)],
+        [
+            (1, _day(-2), _day(2)),
+            (2, _day(8), None),
+            (3, _day(0), _day(5)),
+        ],
+    )
+    bike_ids, booked = calendar.snapshot()
+
+    assert bike_ids.tolist() == [1, 2]
+    assert render_booked_days(booked) == ["1100000000", "0000000011"]
+
+
+def test_incremental_updates_grow_columns_and_mark_days():
+    calendar = BookingCalendar(horizon_days=5)
+    calendar.load(ORIGIN, [], [])
+
+    for bike_id in range(1, 101):
+        calendar.set_bike(bike_id, True)
+    calendar.mark_booked(100, _day(1), _day(3))
+    calendar.set_bike(50, False)
+
+    bike_ids, booked = calendar.snapshot([49, 50, 100, 999])
+
+    assert bike_ids.tolist() == [49, 100]
+    assert render_booked_days(booked) == ["00000", "01100"]
+
+
+def test_free_run_starts_matches_brute_force():
+    rng = np.random.default_rng(11)
+    booked = rng.random((30, 40)) < 0.3
+
+    result = free_run_starts(booked, 3)
+
+    expected = np.array(
+        [
+            [not booked[day : day + 3, bike].any() for bike in range(40)]
+            for day in range(28)
+        ]
+    )
+    assert np.array_equal(result, expected)
+
+
+def test_free_run_starts_longer_than_horizon_is_empty():
+    assert free_run_starts(np.zeros((5, 3), dtype=bool), 6).shape == (0, 3)
+
+
+def test_is_stale_after_day_rollover():
+    calendar = BookingCalendar()
+    calendar.load(ORIGIN, [], [])
+
+    assert not calendar.is_stale(ORIGIN)
+    assert calendar.is_stale(_day(1))
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy.orm import Session
+
+import app.catalog_cache as catalog_cache_module
+from app.catalog_cache import CatalogCache, CatalogPage
+from app.routers import bikes as bikes_router
+from app.models.bike import AvailabilityStatus, Bike
+
+
+def test_pages_expire_and_are_dropped_by_a_new_version():
+    now = [0.0]
+    cache = CatalogCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", CatalogPage(b"[]", None, cache.version, {}))
+    assert cache.get("a") == CatalogPage(b"[]", None, 0, {})
+
+    now[0] = 10
+    assert cache.get("a") is None
+
+    stale_version = cache.version
+    cache.invalidate()
+    # Read before the invalidation finished, so it must not be cached.
+    cache.put("b", CatalogPage(b"[1]", None, stale_version, {}))
+    assert cache.get("b") is None and cache.version == stale_version + 1
+
+
+def test_pages_are_evicted_least_recently_used_first():
+    cache = CatalogCache(max_size=2, ttl_seconds=60)
+    for key in ("a", "b"):
+        cache.put(key, CatalogPage(key.encode(), None, cache.version, {}))
+    cache.get("a")
+    cache.put("c", CatalogPage(b"c", None, cache.version, {}))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def _bike(name: str) -> Bike:
+    return Bike(
+        name=name,
+        type="city",
+        rate_per_day_cents=1000,
+        availability_status=AvailabilityStatus.AVAILABLE,
+    )
+
+
+def test_catalog_is_served_from_cache_until_bikes_change(
+    async_client, db_session: Session, query_budget
+) -> None:
+    bikes = [_bike("First"), _bike("Second")]
+    db_session.add_all(bikes)
+    db_session.flush()
+    params = {"limit": 1}
+
+    first = asyncio.run(async_client.get("/api/bikes", params=params))
+    with query_budget(0):
+        cached = asyncio.run(async_client.get("/api/bikes", params=params))
+
+    assert cached.content == first.content
+    assert cached.headers["content-type"] == "application/json"
+    assert cached.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert cached.json()[0]["name"] == "First"
+
+    bikes[0].name = "Renamed"
+    db_session.commit()
+
+    refreshed = asyncio.run(async_client.get("/api/bikes", params=params))
+    assert refreshed.json()[0]["name"] == "Renamed"
+
+
+def test_catalog_pages_are_compressed_once_per_encoding(
+    async_client, db_session: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    db_session.add_all([_bike("First"), _bike("Second")])
+    db_session.flush()
+    calls: list[str] = []
+    compress = catalog_cache_module.compress
+
+    def counting_compress(body: bytes, encoding: str) -> bytes:
+        calls.append(encoding)
+        return compress(body, encoding)
+
+    monkeypatch.setattr(bikes_router, "COMPRESSION_MINIMUM_SIZE", 10)
+    monkeypatch.setattr(catalog_cache_module, "compress", counting_compress)
+
+    async def fetch(encoding: str):
+        return await async_client.get(
+            "/api/bikes", headers={"Accept-Encoding": encoding}
+        )
+
+    async def scenario():
+        return [await fetch(encoding) for encoding in ("br", "br", "gzip", "gzip")]
+
+    responses = asyncio.run(scenario())
+
+    assert calls == ["br", "gzip"]
+    assert [r.headers["content-encoding"] for r in responses] == [
+        "br",
+        "br",
+        "gzip",
+        "gzip",
+    ]
+    assert all(r.headers["vary"] == "Accept-Encoding" for r in responses)
+    assert [bike["name"] for bike in responses[-1].json()] == ["First", "Second"]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from httpx import ASGITransport, AsyncClient
+
+from app.compression import CompressionMiddleware, compress, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*;q=0.3", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate_encoding_prefers_the_highest_weight(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+def test_compress_round_trips():
+    body = b'{"bikes": []}' * 100
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert brotli.decompress(compress(body, "br")) == body
+    with pytest.raises(ValueError):
+        compress(body, "deflate")
+
+
+def _request(path: str, accept_encoding: str):
+    compressed_app = FastAPI()
+    compressed_app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @compressed_app.get("/large")
+    def large() -> JSONResponse:
+        return JSONResponse([{"id": index, "name": "bike"} for index in range(50)])
+
+    @compressed_app.get("/small")
+    def small() -> JSONResponse:
+        return JSONResponse({"id": 1})
+
+    @compressed_app.get("/image")
+    def image() -> Response:
+        return Response(b"\x89PNG" * 100, media_type="image/png")
+
+    async def scenario():
+        transport = ASGITransport(app=compressed_app)
+        async with AsyncClient(transport=transport, base_url="http://t") as http:
+            return await http.get(path, headers={"Accept-Encoding": accept_encoding})
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_large_json_responses_are_compressed(encoding):
+    response = _request("/large", encoding)
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json()[49] == {"id": 49, "name": "bike"}
+
+
+def test_small_and_binary_responses_are_left_alone():
+    small = _request("/small", "gzip")
+    image = _request("/image", "gzip")
+    identity = _request("/large", "identity")
+
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"id": 1}
+    assert "content-encoding" not in image.headers
+    assert "content-encoding" not in identity.headers
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+from app.services.geo import distances_from_point, haversine_m, pairwise_distances
+
+# Spherical haversine vs. the WGS84 ellipsoid never diverges by more than ~0.56%.
+_MAX_RELATIVE_ERROR = 0.006
+
+
+def _random_coordinates(count: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-89.0, 89.0, count), rng.uniform(-180.0, 180.0, count)
+
+
+def test_haversine_matches_known_distance():
+    # London -> Paris is roughly 343.5 km along the great circle.
+    distance = haversine_m(51.5074, -0.1278, 48.8566, 2.3522)
+
+    assert distance == pytest.approx(343_500, rel=0.005)
+
+
+def test_pairwise_distances_bounded_against_geodesic():
+    lats1, lngs1 = _random_coordinates(500, seed=1)
+    lats2, lngs2 = _random_coordinates(500, seed=2)
+
+    result = pairwise_distances(lats1, lngs1, lats2, lngs2)
+
+    expected = np.array(
+        [
+            geodesic((lat1, lng1), (lat2, lng2)).m
+            for lat1, lng1, lat2, lng2 in zip(lats1, lngs1, lats2, lngs2)
+        ]
+    )
+    assert np.all(np.abs(result - expected) <= expected * _MAX_RELATIVE_ERROR)
+
+
+def test_distances_from_point_bounded_against_geodesic_at_city_scale():
+    rng = np.random.default_rng(3)
+    lats = 51.5 + rng.uniform(-0.2, 0.2, 1_000)
+    lngs = -0.12 + rng.uniform(-0.3, 0.3, 1_000)
+
+    result = distances_from_point(51.5, -0.12, lats, lngs)
+
+    expected = np.array(
+        [geodesic((51.5, -0.12), (lat, lng)).m for lat, lng in zip(lats, lngs)]
+    )
+    assert np.all(np.abs(result - expected) <= expected * _MAX_RELATIVE_ERROR + 0.01)
+
+
+def test_vectorized_results_match_scalar_haversine():
+    lats, lngs = _random_coordinates(50, seed=4)
+
+    result = distances_from_point(10.0, 20.0, lats, lngs)
+
+    assert result.tolist() == pytest.approx(
+        [haversine_m(10.0, 20.0, lat, lng) for lat, lng in zip(lats, lngs)]
+    )
+
+
+def test_antipodal_points_are_half_circumference_apart():
+    result = pairwise_distances([0.0], [0.0], [0.0], [180.0])
+
+    assert result[0] == pytest.approx(np.pi * 6_371_008.8)
+
+
+def test_mismatched_lengths_raise_value_error():
+    with pytest.raises(ValueError, match="same length"):
+        distances_from_point(0.0, 0.0, [1.0, 2.0], [1.0])
+    with pytest.raises(ValueError, match="same length"):
+        pairwise_distances([1.0], [1.0], [1.0, 2.0], [1.0, 2.0])
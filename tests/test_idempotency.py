@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.auth import create_access_token, decode_token, revoke_token_claims
+from app.db import get_async_db
+from app.idempotency import IdempotencyMiddleware
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.idempotency import IdempotencyRecord
+from app.models.rental import Rental
+from app.models.user import User
+from app.repositories import idempotency_repo
+from app.routers import payments, rentals
+
+
+@pytest.fixture()
+def seeded(file_session_factory: sessionmaker) -> tuple[User, list[Bike]]:
+    with file_session_factory(expire_on_commit=False) as setup:
+        user = User(name="Retry", email="retry@example.com", hashed_password="x")
+        bikes = [
+            Bike(
+                name=f"Bike {index}",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for index in range(2)
+        ]
+        setup.add(user)
+        setup.add_all(bikes)
+        setup.commit()
+    return user, bikes
+
+
+@pytest.fixture()
+def idempotent_client(
+    file_session_factory: sessionmaker,
+    file_async_session_factory: async_sessionmaker[AsyncSession],
+    seeded: tuple[User, list[Bike]],
+) -> Iterator[AsyncClient]:
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with file_async_session_factory() as db:
+            yield db
+
+    test_app = FastAPI()
+    test_app.include_router(rentals.router)
+    test_app.include_router(payments.router)
+    test_app.add_middleware(
+        IdempotencyMiddleware,
+        paths=["/api/rentals", "/api/payments"],
+        session_factory=file_session_factory,
+    )
+    test_app.dependency_overrides[get_async_db] = _get_async_db
+    user, _ = seeded
+    client = AsyncClient(
+        transport=ASGITransport(app=test_app),
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {create_access_token(str(user.id))}"},
+    )
+    try:
+        yield client
+    finally:
+        asyncio.run(client.aclose())
+
+
+def _rental_payload(bike: Bike, user: User, start_day: int = 1) -> dict:
+    return {
+        "bike_id": bike.id,
+        "user_id": user.id,
+        "start_date": date(2024, 9, start_day).isoformat(),
+        "end_date": date(2024, 9, start_day + 2).isoformat(),
+        "total_price_cents": 0,
+    }
+
+
+def _rental_count(file_session_factory: sessionmaker) -> int:
+    with file_session_factory() as check:
+        return check.scalar(select(func.count()).select_from(Rental))
+
+
+def test_retried_rental_is_replayed_without_new_rows(
+    idempotent_client: AsyncClient, seeded, file_session_factory: sessionmaker
+) -> None:
+    user, bikes = seeded
+    headers = {"Idempotency-Key": "rental-1"}
+
+    first = asyncio.run(
+        idempotent_client.post(
+            "/api/rentals", json=_rental_payload(bikes[0], user), headers=headers
+        )
+    )
+    retry = asyncio.run(
+        idempotent_client.post(
+            "/api/rentals", json=_rental_payload(bikes[0], user), headers=headers
+        )
+    )
+
+    assert first.status_code == 200, first.json()
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert _rental_count(file_session_factory) == 1
+
+
+def test_revoked_token_is_not_replayed(
+    idempotent_client: AsyncClient, seeded, file_session_factory: sessionmaker
+) -> None:
+    user, bikes = seeded
+    headers = {"Idempotency-Key": "rental-revoked"}
+    first = asyncio.run(
+        idempotent_client.post(
+            "/api/rentals", json=_rental_payload(bikes[0], user), headers=headers
+        )
+    )
+    token = idempotent_client.headers["Authorization"].removeprefix("Bearer ")
+    with file_session_factory() as db:
+        assert revoke_token_claims(db, decode_token(token, "access"))
+        db.commit()
+
+    retry = asyncio.run(
+        idempotent_client.post(
+            "/api/rentals", json=_rental_payload(bikes[0], user), headers=headers
+        )
+    )
+
+    assert first.status_code == 200, first.json()
+    assert retry.status_code == 401
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_reused_key_with_different_body_is_rejected(
+    idempotent_client: AsyncClient, seeded
+) -> None:
+    user, bikes = seeded
+    headers = {"Idempotency-Key": "rental-2"}
+    asyncio.run(
+        idempotent_client.post(
+            "/api/rentals", json=_rental_payload(bikes[0], user), headers=headers
+        )
+    )
+
+    response = asyncio.run(
+        idempotent_client.post(
+            "/api/rentals", json=_rental_payload(bikes[1], user), headers=headers
+        )
+    )
+
+    assert response.status_code == 422
+    assert response.json()["error"]["code"] == "IDEMPOTENCY_KEY_REUSED"
+
+
+def test_concurrent_duplicates_wait_for_first_request(
+    idempotent_client: AsyncClient, seeded, file_session_factory: sessionmaker
+) -> None:
+    user, bikes = seeded
+    payload = _rental_payload(bikes[0], user)
+
+    async def _fire() -> list:
+        return await asyncio.gather(
+            *(
+                idempotent_client.post(
+                    "/api/rentals", json=payload, headers={"Idempotency-Key": "burst"}
+                )
+                for _ in range(20)
+            )
+        )
+
+    responses = asyncio.run(_fire())
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert _rental_count(file_session_factory) == 1
+
+
+def test_payment_retry_returns_same_transaction(
+    idempotent_client: AsyncClient,
+) -> None:
+    payload = {"rental_id": 1, "amount_cents": 2500}
+    headers = {"Idempotency-Key": "pay-1"}
+
+    first = asyncio.run(
+        idempotent_client.post("/api/payments", json=payload, headers=headers)
+    )
+    retry = asyncio.run(
+        idempotent_client.post("/api/payments", json=payload, headers=headers)
+    )
+    fresh = asyncio.run(idempotent_client.post("/api/payments", json=payload))
+
+    assert first.status_code == 200
+    assert retry.json()["transaction_id"] == first.json()["transaction_id"]
+    assert fresh.json()["transaction_id"] != first.json()["transaction_id"]
+
+
+def test_purge_expired_evicts_only_stale_records(
+    file_session_factory: sessionmaker,
+) -> None:
+    now = datetime.now(tz=timezone.utc)
+    with file_session_factory() as db:
+        idempotency_repo.claim_key(db, "1:POST:/x", "old", "f", now, now - timedelta(1))
+        idempotency_repo.claim_key(db, "1:POST:/x", "new", "f", now, now + timedelta(1))
+
+        removed = idempotency_repo.purge_expired(db, now)
+
+        assert removed == 1
+        assert db.scalars(select(IdempotencyRecord.key)).all() == ["new"]
+
+
+def test_claim_retries_when_the_conflicting_record_is_released(
+    file_session_factory: sessionmaker, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = datetime.now(tz=timezone.utc)
+    lease = now + timedelta(minutes=1)
+    with file_session_factory() as other:
+        held, _ = idempotency_repo.claim_key(other, "1:POST:/x", "k", "f", now, lease)
+        held_id, held_token = held.id, held.claim_token
+
+    with file_session_factory() as db:
+        rollback = db.rollback
+        released: list[int] = []
+
+        def rollback_then_release() -> None:
+            rollback()
+            released.append(held_id)
+            # The holder finishes with a 5xx and releases the key meanwhile.
+            with file_session_factory() as other:
+                idempotency_repo.release_key(other, held_id, held_token)
+
+        monkeypatch.setattr(db, "rollback", rollback_then_release)
+        record, claimed = idempotency_repo.claim_key(
+            db, "1:POST:/x", "k", "f", now, lease
+        )
+
+        assert released == [held_id]
+        assert claimed and record.fingerprint == "f"
+
+
+def test_request_outliving_its_lease_is_not_run_twice(
+    file_session_factory: sessionmaker, seeded
+) -> None:
+    user, _ = seeded
+    runs: list[int] = []
+    test_app = FastAPI()
+
+    @test_app.post("/slow")
+    async def slow() -> dict:
+        runs.append(len(runs) + 1)
+        await asyncio.sleep(1.0)
+        return {"run": len(runs)}
+
+    test_app.add_middleware(
+        IdempotencyMiddleware,
+        paths=["/slow"],
+        session_factory=file_session_factory,
+        lease=timedelta(seconds=0.3),
+    )
+    headers = {
+        "Authorization": f"Bearer {create_access_token(str(user.id))}",
+        "Idempotency-Key": "slow-1",
+    }
+
+    async def _fire() -> list:
+        async with AsyncClient(
+            transport=ASGITransport(app=test_app), base_url="http://test"
+        ) as client:
+            first = asyncio.create_task(client.post("/slow", headers=headers))
+            # The retry arrives after the first lease would have expired.
+            await asyncio.sleep(0.6)
+            retry = await client.post("/slow", headers=headers)
+            return [await first, retry]
+
+    first, retry = asyncio.run(_fire())
+
+    assert runs == [1]
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_lost_claim_cannot_complete_or_release(
+    file_session_factory: sessionmaker,
+) -> None:
+    now = datetime.now(tz=timezone.utc)
+    with file_session_factory() as other:
+        stale, _ = idempotency_repo.claim_key(other, "1:POST:/x", "k", "f", now, now)
+        stale_id, stale_token = stale.id, stale.claim_token
+
+    with file_session_factory() as db:
+        # The stale lease has expired, so a retry takes the key over.
+        current, claimed = idempotency_repo.claim_key(
+            db, "1:POST:/x", "k", "f", now, now + timedelta(minutes=1)
+        )
+        assert claimed
+
+        assert not idempotency_repo.complete_key(
+            db, stale_id, stale_token, 200, None, b"stale", now + timedelta(1)
+        )
+        assert not idempotency_repo.release_key(db, stale_id, stale_token)
+        assert not idempotency_repo.renew_key(db, stale_id, stale_token, now)
+
+        db.refresh(current)
+        assert current.status_code is None
+        assert idempotency_repo.complete_key(
+            db, current.id, current.claim_token, 200, None, b"ok", now + timedelta(1)
+        )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from types import ModuleType
+
+import pytest
+from httpx import AsyncClient
+
+from app.password_hasher import HashingQueueFull, PasswordHasher, password_hasher
+
+
+@pytest.fixture(scope="module")
+def hasher() -> Iterator[PasswordHasher]:
+    pool = PasswordHasher(max_workers=1, queue_size=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_hash_and_verify_run_in_worker_pool(hasher: PasswordHasher) -> None:
+    async def scenario() -> tuple[bool, bool]:
+        hashed = await hasher.hash("correct horse")
+        return (
+            await hasher.verify("correct horse", hashed),
+            await hasher.verify("wrong horse", hashed),
+        )
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert hasher.pending == 0
+
+
+def test_full_queue_fails_fast(hasher: PasswordHasher) -> None:
+    async def scenario() -> str:
+        running = asyncio.create_task(hasher.hash("first password"))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingQueueFull):
+            await hasher.hash("second password")
+        return await running
+
+    assert asyncio.run(scenario()).startswith("$2b$")
+
+
+def test_register_and_login_hash_off_the_event_loop(
+    auth_client: AsyncClient,
+) -> None:
+    credentials = {"email": "pool-user@example.com", "password": "s3cret-pass"}
+
+    async def scenario() -> tuple[int, int, int]:
+        registered = await auth_client.post(
+            "/auth/register", json={"name": "Pool User", **credentials}
+        )
+        logged_in = await auth_client.post("/auth/login", json=credentials)
+        rejected = await auth_client.post(
+            "/auth/login", json={**credentials, "password": "wrong-pass"}
+        )
+        return registered.status_code, logged_in.status_code, rejected.status_code
+
+    try:
+        assert asyncio.run(scenario()) == (200, 200, 401)
+    finally:
+        password_hasher.shutdown()
+
+
+def test_register_returns_503_when_hashing_queue_is_full(
+    auth_client: AsyncClient,
+    auth_router: ModuleType,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    saturated = PasswordHasher(max_workers=1, queue_size=0)
+    monkeypatch.setattr(saturated, "_pending", 1)
+    monkeypatch.setattr(auth_router, "password_hasher", saturated)
+
+    response = asyncio.run(
+        auth_client.post(
+            "/auth/register",
+            json={
+                "name": "Late",
+                "email": "late@example.com",
+                "password": "s3cret-pass",
+            },
+        )
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+
+from app.db import _pool_args
+from app.pool_metrics import PoolMetrics, TimedQueuePool, pool_metrics
+from app.routers import internal
+
+
+@pytest.fixture()
+def tiny_pool(tmp_path: Path) -> Iterator[tuple[Engine, PoolMetrics]]:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.2,
+        connect_args={"check_same_thread": False},
+    )
+    metrics = PoolMetrics("test").attach(engine)
+    try:
+        yield engine, metrics
+    finally:
+        pool_metrics.pop("test", None)
+        engine.dispose()
+
+
+def test_pool_args_only_size_file_backed_pools():
+    memory = _pool_args("sqlite:///:memory:")
+    on_disk = _pool_args("sqlite:///./dev.db")
+
+    assert "pool_size" not in memory and "poolclass" not in memory
+    assert on_disk["poolclass"] is TimedQueuePool
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= set(on_disk)
+
+
+def test_metrics_record_usage_overflow_and_checkout_wait(tiny_pool):
+    engine, metrics = tiny_pool
+    first = engine.connect()
+    second = engine.connect()
+    in_use = metrics.snapshot()
+
+    release = threading.Timer(0.1, second.close)
+    release.start()
+    with engine.connect() as third:
+        third.execute(text("SELECT 1"))
+    release.join()
+    with engine.connect(), pytest.raises(PoolTimeoutError):
+        engine.connect()
+    first.close()
+    snapshot = metrics.snapshot()
+
+    assert (in_use["checked_out"], in_use["overflow"], in_use["in_use"]) == (2, 1, 2)
+    assert snapshot["checkouts"] == 4 and snapshot["checkout_timeouts"] == 1
+    assert snapshot["peak_in_use"] == 2 and snapshot["in_use"] == 0
+    wait = snapshot["checkout_wait"]
+    assert wait["count"] == 5 and wait["max_seconds"] >= 0.15
+    assert wait["buckets"]["+Inf"] == 5 and wait["buckets"]["0.05"] <= 3
+
+
+def test_metrics_survive_dispose(tiny_pool):
+    engine, metrics = tiny_pool
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert metrics.snapshot()["checkout_wait"]["count"] == 1
+    assert metrics.snapshot()["connections_opened"] == 1
+
+
+def _get_metrics(headers: dict[str, str] | None = None, client=("127.0.0.1", 1)):
+    metrics_app = FastAPI()
+    metrics_app.include_router(internal.router)
+
+    async def scenario():
+        transport = ASGITransport(app=metrics_app, client=client)
+        async with AsyncClient(transport=transport, base_url="http://t") as http:
+            return await http.get("/internal/metrics/pool", headers=headers)
+
+    return asyncio.run(scenario())
+
+
+def test_metrics_endpoint_reports_registered_pools(monkeypatch: pytest.MonkeyPatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    PoolMetrics("static").attach(engine)
+    monkeypatch.setattr(internal, "METRICS_TOKEN", "scrape-secret")
+    try:
+        response = _get_metrics({"Authorization": "Bearer scrape-secret"})
+    finally:
+        pool_metrics.pop("static", None)
+
+    assert response.status_code == 200
+    pools = {pool["name"]: pool for pool in response.json()["pools"]}
+    assert pools["primary"]["pool_class"] == "TimedQueuePool"
+    assert pools["static"]["size"] is None
+
+
+def test_metrics_endpoint_requires_configured_token(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(internal, "METRICS_TOKEN", "scrape-secret")
+
+    assert _get_metrics().status_code == 403
+    authorized = _get_metrics(
+        {"Authorization": "Bearer scrape-secret"}, client=("203.0.113.9", 1)
+    )
+    assert authorized.status_code == 200
+
+
+def test_metrics_endpoint_is_disabled_without_a_token(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(internal, "METRICS_TOKEN", None)
+
+    # Loopback is no proof of an internal caller behind a reverse proxy.
+    local = _get_metrics(client=("127.0.0.1", 1))
+
+    assert local.status_code == 403
+    assert local.json()["error"]["code"] == "FORBIDDEN"
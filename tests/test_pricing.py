@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.pricing_rule import DayKind, PricingRule
+from app.services.pricing import PricingRuleCache, PricingTable, day_counts
+
+RULES = [
+    (None, DayKind.WEEKEND, 125, 0),
+    ("electric", DayKind.ALL, 100, 300),
+    ("cargo", DayKind.WEEKDAY, 90, 0),
+]
+
+
+def _scalar_quote(rules, rate: int, bike_type: str, start: date, end: date) -> int:
+    total = 0
+    day = start
+    while day < end:
+        kind = DayKind.WEEKEND if day.weekday() >= 5 else DayKind.WEEKDAY
+        factor, surcharge = 1.0, 0
+        for rule_type, day_kind, multiplier_percent, surcharge_cents in rules:
+            if rule_type in (None, bike_type) and day_kind in (DayKind.ALL, kind):
+                factor *= multiplier_percent / 100.0
+                surcharge += surcharge_cents
+        total += math.floor(rate * factor + 0.5) + surcharge
+        day += timedelta(days=1)
+    return total
+
+
+def test_day_counts_splits_weekdays_and_weekends():
+    # 2024-07-05 is a Friday.
+    counts = day_counts(
+        [date(2024, 7, 5), date(2024, 7, 1)], [date(2024, 7, 8), date(2024, 7, 3)]
+    )
+
+    assert counts.tolist() == [[1, 2], [2, 0]]
+
+
+def test_quote_without_rules_is_rate_times_days():
+    prices = PricingTable().quote(
+        [2500, 1000], ["road", "city"], [date(2024, 7, 1)], [date(2024, 7, 4)]
+    )
+
+    assert prices.tolist() == [[7500], [3000]]
+
+
+def test_quote_matches_per_day_scalar_pricing():
+    rng = random.Random(7)
+    types = ["road", "electric", "cargo"]
+    rates = [rng.randrange(500, 5000) for _ in range(40)]
+    bike_types = [rng.choice(types) for _ in rates]
+    starts = [date(2024, 7, 1) + timedelta(days=rng.randrange(30)) for _ in range(6)]
+    ends = [start + timedelta(days=rng.randrange(1, 4)) for start in starts]
+
+    prices = PricingTable(RULES).quote(rates, bike_types, starts, ends)
+
+    assert prices.tolist() == [
+        [
+            _scalar_quote(RULES, rate, bike_type, start, end)
+            for start, end in zip(starts, ends)
+        ]
+        for rate, bike_type in zip(rates, bike_types)
+    ]
+
+
+def test_rule_cache_reloads_only_when_version_changes(db_session: Session):
+    rule = PricingRule(
+        name="Weekend", day_kind=DayKind.WEEKEND, multiplier_percent=150
+    )
+    db_session.add(rule)
+    db_session.flush()
+    cache = PricingRuleCache(check_interval_seconds=60)
+    saturday = [date(2024, 7, 6)], [date(2024, 7, 7)]
+
+    assert cache.get(db_session).quote([1000], ["road"], *saturday).tolist() == [
+        [1500]
+    ]
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        cache.get(db_session)
+        assert statements == []
+
+        rule.multiplier_percent = 200
+        db_session.flush()
+        assert cache.get(db_session).quote([1000], ["road"], *saturday).tolist() == [
+            [1500]
+        ]
+        cache.invalidate()
+        repriced = cache.get(db_session).quote([1000], ["road"], *saturday)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert repriced.tolist() == [[2000]]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from app.query_metrics import (
+    QueryMetricsMiddleware,
+    current_query_stats,
+    instrument_engine,
+    track_queries,
+)
+
+
+def test_statements_are_attributed_to_the_tracking_context():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_seconds=60)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            connection.execute(text("SELECT 2"))
+            connection.execute(text("SELECT 2"))
+        connection.execute(text("SELECT 3"))
+
+    assert stats.count == 2
+    assert stats.statements == {"SELECT 2": 2}
+    assert stats.total_seconds > 0
+    assert current_query_stats() is None
+
+
+def test_async_engine_statements_are_attributed():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine.sync_engine, slow_query_seconds=60)
+
+    async def scenario() -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    with track_queries() as stats:
+        asyncio.run(scenario())
+
+    assert stats.statements["SELECT 1"] == 1
+
+
+def test_slow_queries_are_logged_without_parameters(caplog: pytest.LogCaptureFixture):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_seconds=0)
+
+    with caplog.at_level(logging.WARNING, logger="app.query_metrics"):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT :secret"), {"secret": "hunter2"})
+
+    message = caplog.records[-1].getMessage()
+    assert "Slow query" in message and "SELECT ?" in message
+    assert "1 parameters redacted" in message
+    assert "hunter2" not in message
+
+
+def test_middleware_reports_server_timing_and_repeated_statements(
+    caplog: pytest.LogCaptureFixture,
+):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_seconds=60)
+    metrics_app = FastAPI()
+    metrics_app.add_middleware(QueryMetricsMiddleware, repeat_threshold=3)
+
+    @metrics_app.get("/bikes/{bike_id}")
+    def one_bike(bike_id: int) -> dict[str, int]:
+        with Session(engine) as db:
+            for _ in range(4):
+                db.execute(text("SELECT :id"), {"id": bike_id})
+        return {"id": bike_id}
+
+    async def scenario():
+        transport = ASGITransport(app=metrics_app)
+        async with AsyncClient(transport=transport, base_url="http://t") as http:
+            return await http.get("/bikes/7")
+
+    with caplog.at_level(logging.WARNING, logger="app.query_metrics"):
+        response = asyncio.run(scenario())
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and timing.endswith('desc="4 queries"')
+    warning = caplog.records[-1].getMessage()
+    assert "Possible N+1 query in GET /bikes/{bike_id}: ran 4 times" in warning
+
+
+def test_query_budget_fails_when_exceeded(query_budget):
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_seconds=60)
+
+    with engine.connect() as connection:
+        with query_budget(2):
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SAVEPOINT sp"))
+            connection.execute(text("SELECT 2"))
+        with pytest.raises(pytest.fail.Exception, match="3 statements exceeded"):
+            with query_budget(2):
+                for _ in range(3):
+                    connection.execute(text("SELECT 1"))
@@ -0,0 +1,271 @@
+"""Query plan regression tests for the repositories.
+
+Every repository read runs against a seeded, analysed SQLite database; the
+statements it sends are captured and passed through ``EXPLAIN QUERY PLAN``.
+A plan step reading a table without an index (``SCAN <table>``) fails the
+test unless the query is listed in ``_FULL_SCANS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from datetime import date
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.db import Base
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.rental import Rental
+from app.models.user import User
+from app.repositories import bike_repo, rental_repo, user_repo
+from app.schemas.bike_schema import BikeSort
+from app.schemas.rental_schema import RentalCreate
+
+_BIKES = 500
+_USERS = 200
+_RENTALS = 2_000
+_START, _END = date(2024, 1, 5), date(2024, 1, 9)
+
+# Queries that read a whole table on purpose.
+_FULL_SCANS = {
+    "get_all_bikes": "admin export of every bike",
+    "get_all_rentals": "admin export of every rental",
+    "get_all_users": "admin export of every user",
+    "get_bike_statuses": "fleet status board lists every bike",
+}
+
+# ``SCAN bikes USING INDEX ...`` walks an index; a bare ``SCAN`` reads the table.
+_TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+_PLANNED = ("SELECT", "UPDATE", "DELETE")
+
+
+def _keyset(sort: BikeSort) -> list[Any]:
+    if sort.field == "id":
+        return [_BIKES // 2]
+    if sort.field == "name":
+        return ["Bike 250", _BIKES // 2]
+    return [1_250, _BIKES // 2]
+
+
+_Query = Callable[[Session], Any]
+_AsyncQuery = Callable[[AsyncSession], Awaitable[Any]]
+
+# Sync helpers: the in-process caches load through these via ``run_sync``.
+_QUERIES: dict[str, _Query] = {
+    "get_bike_by_id": lambda db: bike_repo.get_bike_by_id(db, 3),
+    "get_available_bike_locations": bike_repo.get_available_bike_locations,
+    "get_bike_statuses": bike_repo.get_bike_statuses,
+    "get_all_bikes": bike_repo.get_all_bikes,
+    "get_rental_by_id": lambda db: rental_repo.get_rental_by_id(db, 1),
+    "get_rental_windows_between": lambda db: rental_repo.get_rental_windows_between(
+        db, _START, _END
+    ),
+    "get_user_by_id": lambda db: user_repo.get_user_by_id(db, 1),
+    "get_existing_emails": lambda db: user_repo.get_existing_emails(
+        db, ["user1@example.com", "nobody@example.com"]
+    ),
+}
+
+
+async def _reserve_rental(db: AsyncSession) -> Any:
+    bike = await db.get(Bike, 4)
+    return await rental_repo.reserve_rental_async(db, _booking(bike_id=4), bike.version)
+
+
+async def _reserve_rentals(db: AsyncSession) -> Any:
+    bikes = [await db.get(Bike, bike_id) for bike_id in (5, 6)]
+    return await rental_repo.reserve_rentals_async(
+        db,
+        [_booking(bike_id=bike.id) for bike in bikes],
+        {bike.id: bike.version for bike in bikes},
+    )
+
+
+# What the routes run on an ``AsyncSession``.
+_ASYNC_QUERIES: dict[str, _AsyncQuery] = {
+    "get_bike_for_update_async": lambda db: bike_repo.get_bike_for_update_async(
+        db, 3
+    ),
+    "get_bikes_for_update_async": lambda db: bike_repo.get_bikes_for_update_async(
+        db, [1, 2]
+    ),
+    "get_bikes_by_ids_async": lambda db: bike_repo.get_bikes_by_ids_async(
+        db, [1, 2]
+    ),
+    "get_bike_rates_async": lambda db: bike_repo.get_bike_rates_async(db, [1, 2]),
+    **{
+        f"get_available_bike_rows_async[{sort.value}]": (
+            lambda db, sort=sort: bike_repo.get_available_bike_rows_async(
+                db, sort=sort, limit=20
+            )
+        )
+        for sort in BikeSort
+    },
+    **{
+        f"get_available_bike_rows_async[{sort.value},after]": (
+            lambda db, sort=sort: bike_repo.get_available_bike_rows_async(
+                db, sort=sort, after=_keyset(sort), limit=20
+            )
+        )
+        for sort in BikeSort
+    },
+    "get_available_bike_rows_async[filtered]": (
+        lambda db: bike_repo.get_available_bike_rows_async(
+            db, bike_type="city", min_rate_cents=1_100, max_rate_cents=1_300, limit=20
+        )
+    ),
+    "get_bikes_available_between_async": (
+        lambda db: bike_repo.get_bikes_available_between_async(db, _START, _END)
+    ),
+    "get_rental_by_id_async": lambda db: rental_repo.get_rental_by_id_async(db, 1),
+    "get_overlapping_rentals_async": (
+        lambda db: rental_repo.get_overlapping_rentals_async(db, [1, 2], _START, _END)
+    ),
+    "has_overlapping_rental_async": (
+        lambda db: rental_repo.has_overlapping_rental_async(db, 1, _START, _END)
+    ),
+    "get_rental_rows_for_user_async": (
+        lambda db: rental_repo.get_rental_rows_for_user_async(db, 1, limit=20)
+    ),
+    "get_rental_rows_for_user_async[after]": (
+        lambda db: rental_repo.get_rental_rows_for_user_async(
+            db, 1, after_id=_RENTALS // 2, limit=20
+        )
+    ),
+    "reserve_rental_async": _reserve_rental,
+    "reserve_rentals_async": _reserve_rentals,
+    "get_user_by_id_async": lambda db: user_repo.get_user_by_id_async(db, 1),
+    "get_user_by_email_async": lambda db: user_repo.get_user_by_email_async(
+        db, "user1@example.com"
+    ),
+}
+
+
+def _booking(bike_id: int) -> RentalCreate:
+    return RentalCreate(
+        bike_id=bike_id,
+        user_id=1,
+        start_date=date(2025, 3, 1),
+        end_date=date(2025, 3, 4),
+        total_price_cents=0,
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded_engine(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Engine]:
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    plan_engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(plan_engine)
+    with Session(plan_engine) as db:
+        db.add_all(
+            User(name=f"User {i}", email=f"user{i}@example.com", hashed_password="x")
+            for i in range(_USERS)
+        )
+        # One bike in ten is available, as in a busy fleet.
+        db.add_all(
+            Bike(
+                name=f"Bike {i}",
+                type="city" if i % 2 else "road",
+                rate_per_day_cents=1_000 + i,
+                availability_status=(
+                    AvailabilityStatus.AVAILABLE
+                    if i % 10 == 0
+                    else AvailabilityStatus.UNAVAILABLE
+                ),
+                lat=40.0,
+                lng=-74.0,
+            )
+            for i in range(_BIKES)
+        )
+        db.flush()
+        db.add_all(
+            Rental(
+                bike_id=i % _BIKES + 1,
+                user_id=i % _USERS + 1,
+                start_date=date(2024, 1, 1 + i % 28),
+                end_date=date(2024, 2, 1),
+                total_price_cents=1_000,
+            )
+            for i in range(_RENTALS)
+        )
+        db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+    try:
+        yield plan_engine
+    finally:
+        plan_engine.dispose()
+
+
+@contextmanager
+def _capture(target: Engine) -> Iterator[list[tuple[str, Any]]]:
+    """Collect the reads and conditional writes ``target`` sends."""
+    statements: list[tuple[str, Any]] = []
+
+    def _record(_conn, _cursor, statement, parameters, _context, executemany):
+        if not executemany and statement.lstrip().startswith(_PLANNED):
+            statements.append((statement, parameters))
+
+    event.listen(target, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", _record)
+
+
+def _table_scans(plan_engine: Engine, statements: list[tuple[str, Any]]) -> str:
+    """Return the plans of statements that scan a table, one per line."""
+    offending = []
+    with plan_engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = [
+                row[3]
+                for row in connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                )
+            ]
+            if any(_TABLE_SCAN.match(step) for step in plan):
+                sql = " ".join(statement.split())
+                offending.append(f"{' / '.join(plan)}  <-  {sql}")
+    return "\n".join(offending)
+
+
+@pytest.mark.parametrize("name", list(_QUERIES))
+def test_repository_queries_use_indexes(seeded_engine: Engine, name: str):
+    with Session(seeded_engine) as db, _capture(seeded_engine) as statements:
+        _QUERIES[name](db)
+
+    assert statements, f"{name} sent no statements"
+    scans = _table_scans(seeded_engine, statements)
+    if name in _FULL_SCANS:
+        assert scans, f"{name} no longer scans; drop it from _FULL_SCANS"
+    else:
+        assert not scans, f"{name} falls back to a full table scan:\n{scans}"
+
+
+@pytest.mark.parametrize("name", list(_ASYNC_QUERIES))
+def test_async_repository_queries_use_indexes(seeded_engine: Engine, name: str):
+    async_engine = create_async_engine(
+        seeded_engine.url.set(drivername="sqlite+aiosqlite")
+    )
+
+    async def scenario() -> None:
+        try:
+            async with AsyncSession(async_engine) as db:
+                await _ASYNC_QUERIES[name](db)
+        finally:
+            await async_engine.dispose()
+
+    with _capture(async_engine.sync_engine) as statements:
+        asyncio.run(scenario())
+
+    assert statements, f"{name} sent no statements"
+    scans = _table_scans(seeded_engine, statements)
+    assert not scans, f"{name} falls back to a full table scan:\n{scans}"
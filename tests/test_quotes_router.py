@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import get_async_db
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.pricing_rule import DayKind, PricingRule
+from app.models.user import User
+from app.routers import quotes
+from app.services.pricing import pricing_rules
+
+
+@pytest.fixture()
+def fresh_pricing_rules() -> Iterator[None]:
+    pricing_rules.clear()
+    yield
+    pricing_rules.clear()
+
+
+def _add_bike(db_session: Session, bike_type: str, rate: int) -> Bike:
+    bike = Bike(
+        name=f"{bike_type} bike",
+        type=bike_type,
+        rate_per_day_cents=rate,
+        availability_status=AvailabilityStatus.AVAILABLE,
+    )
+    db_session.add(bike)
+    db_session.flush()
+    return bike
+
+
+def test_create_quotes_prices_every_bike_and_window(
+    async_client, db_session: Session, fresh_pricing_rules: None
+) -> None:
+    db_session.add_all(
+        [
+            PricingRule(
+                name="Weekend", day_kind=DayKind.WEEKEND, multiplier_percent=120
+            ),
+            PricingRule(
+                name="E-bike battery", bike_type="electric", surcharge_cents=500
+            ),
+        ]
+    )
+    road = _add_bike(db_session, "road", 2000)
+    electric = _add_bike(db_session, "electric", 3000)
+    # 2024-07-05 is a Friday.
+    windows = [
+        {"start_date": "2024-07-01", "end_date": "2024-07-03"},
+        {"start_date": "2024-07-05", "end_date": "2024-07-07"},
+    ]
+
+    response = asyncio.run(
+        async_client.post(
+            "/api/quotes",
+            json={"bike_ids": [electric.id, 999_999, road.id], "windows": windows},
+        )
+    )
+
+    assert response.status_code == 200, response.json()
+    body = response.json()
+    assert [window["days"] for window in body["windows"]] == [2, 2]
+    assert body["quotes"] == [
+        {"bike_id": electric.id, "total_price_cents": [7000, 7600]},
+        {"bike_id": road.id, "total_price_cents": [4000, 4400]},
+    ]
+
+
+def test_booking_is_charged_its_quoted_total(
+    async_client, db_session: Session, test_user: User, fresh_pricing_rules: None
+) -> None:
+    db_session.add_all(
+        [
+            PricingRule(
+                name="Weekend", day_kind=DayKind.WEEKEND, multiplier_percent=150
+            ),
+            PricingRule(name="Helmet", bike_type="road", surcharge_cents=250),
+        ]
+    )
+    road = _add_bike(db_session, "road", 2000)
+    # Friday to Sunday: one weekday and one weekend day.
+    window = {"start_date": "2024-07-05", "end_date": "2024-07-07"}
+
+    async def quote_then_book():
+        quote = await async_client.post(
+            "/api/quotes", json={"bike_ids": [road.id], "windows": [window]}
+        )
+        booking = await async_client.post(
+            "/api/rentals",
+            json={
+                "bike_id": road.id,
+                "user_id": test_user.id,
+                "total_price_cents": 0,
+                **window,
+            },
+        )
+        return quote, booking
+
+    quote, booking = asyncio.run(quote_then_book())
+
+    assert booking.status_code == 200, booking.json()
+    quoted = quote.json()["quotes"][0]["total_price_cents"][0]
+    assert quoted == 2250 + 3250
+    assert booking.json()["total_price_cents"] == quoted
+
+
+def test_create_quotes_rejects_invalid_window(
+    async_client, db_session: Session, fresh_pricing_rules: None
+) -> None:
+    bike = _add_bike(db_session, "road", 2000)
+
+    response = asyncio.run(
+        async_client.post(
+            "/api/quotes",
+            json={
+                "bike_ids": [bike.id],
+                "windows": [
+                    {"start_date": "2024-07-01", "end_date": "2024-07-02"},
+                    {"start_date": "2024-07-03", "end_date": "2024-07-03"},
+                ],
+            },
+        )
+    )
+
+    assert response.status_code == 400
+    error = response.json()["error"]
+    assert error["code"] == "INVALID_RANGE"
+    assert error["message"].startswith("windows[1]")
+
+
+def test_concurrent_quotes_load_cold_rules_without_deadlock(
+    file_session_factory: sessionmaker,
+    file_async_session_factory: async_sessionmaker[AsyncSession],
+    fresh_pricing_rules: None,
+) -> None:
+    with file_session_factory() as setup:
+        setup.add(PricingRule(name="Weekend", day_kind=DayKind.WEEKEND))
+        bike = _add_bike(setup, "city", 1000)
+        bike_id = bike.id
+        setup.commit()
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with file_async_session_factory() as db:
+            yield db
+
+    quotes_app = FastAPI()
+    quotes_app.include_router(quotes.router)
+    quotes_app.dependency_overrides[get_async_db] = _get_async_db
+    payload = {
+        "bike_ids": [bike_id],
+        "windows": [{"start_date": "2024-07-01", "end_date": "2024-07-03"}],
+    }
+    statuses: list[int] = []
+
+    async def scenario() -> None:
+        transport = ASGITransport(app=quotes_app)
+        async with AsyncClient(transport=transport, base_url="http://t") as client:
+            responses = await asyncio.gather(
+                *(client.post("/api/quotes", json=payload) for _ in range(8))
+            )
+        statuses.extend(response.status_code for response in responses)
+
+    # A deadlock blocks the event loop itself, so watch it from another thread.
+    runner = threading.Thread(target=asyncio.run, args=(scenario(),), daemon=True)
+    runner.start()
+    runner.join(timeout=10)
+
+    assert not runner.is_alive(), "concurrent cold-cache quotes deadlocked"
+    assert statuses == [200] * 8
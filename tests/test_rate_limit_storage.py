@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import socketserver
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import (
+    FixedWindowRateLimiter,
+    SlidingWindowCounterRateLimiter,
+)
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+
+from app.rate_limit_storage import (
+    MemoryTokenBuckets,
+    RespStorage,
+    SQLiteStorage,
+    gcra,
+    token_buckets_from_uri,
+)
+
+
+@pytest.fixture()
+def rate_limiter(
+    auth_router: ModuleType, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> ModuleType:
+    # Limiter instances read a .env file from the working directory.
+    (tmp_path / ".env").touch()
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("app.rate_limiter")
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Just enough of the Redis protocol for ``RespStorage``."""
+
+    def handle(self) -> None:
+        queued: list[list[bytes]] | None = None
+        watched: dict[bytes, int] = {}
+        while command := self._read_command():
+            name = command[0].upper()
+            if name == b"WATCH":
+                watched.update(self.server.watch(command[1:]))
+                self._write(b"+OK\r\n")
+            elif name == b"UNWATCH":
+                watched.clear()
+                self._write(b"+OK\r\n")
+            elif name == b"MULTI":
+                queued = []
+                self._write(b"+OK\r\n")
+            elif name == b"EXEC":
+                with self.server.lock:
+                    if any(
+                        self.server.versions.get(key, 0) != version
+                        for key, version in watched.items()
+                    ):
+                        self._write(b"*-1\r\n")
+                    else:
+                        replies = [self.server.apply(pending) for pending in queued]
+                        self._write(b"*%d\r\n" % len(replies) + b"".join(replies))
+                queued = None
+                watched.clear()
+            elif queued is not None:
+                queued.append(command)
+                self._write(b"+QUEUED\r\n")
+            else:
+                self._write(self.server.apply(command))
+
+    def _read_command(self) -> list[bytes] | None:
+        header = self.rfile.readline()
+        if not header:
+            return None
+        command = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            command.append(self.rfile.read(length + 2)[:-2])
+        return command
+
+    def _write(self, data: bytes) -> None:
+        self.wfile.write(data)
+
+
+def _bulk(value: bytes | None) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.lock = threading.RLock()
+        self.values: dict[bytes, bytes] = {}
+        self.expiries: dict[bytes, float] = {}
+        self.versions: dict[bytes, int] = {}
+        # Number of upcoming WATCHes to invalidate, simulating a racing writer.
+        self.interfere = 0
+
+    def watch(self, keys: list[bytes]) -> dict[bytes, int]:
+        with self.lock:
+            snapshot = {key: self.versions.get(key, 0) for key in keys}
+            if self.interfere:
+                self.interfere -= 1
+                for key in keys:
+                    self.versions[key] = self.versions.get(key, 0) + 1
+            return snapshot
+
+    def _live(self, key: bytes) -> bytes | None:
+        expiry = self.expiries.get(key)
+        if expiry is not None and expiry <= time.time():
+            self.values.pop(key, None)
+            self.expiries.pop(key, None)
+        return self.values.get(key)
+
+    def apply(self, command: list[bytes]) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        with self.lock:
+            if name in (b"SET", b"INCRBY", b"DECRBY", b"DEL"):
+                for key in args[:1] if name != b"DEL" else args:
+                    self.versions[key] = self.versions.get(key, 0) + 1
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"GET":
+                return _bulk(self._live(args[0]))
+            if name == b"MGET":
+                values = [_bulk(self._live(key)) for key in args]
+                return b"*%d\r\n" % len(values) + b"".join(values)
+            if name == b"SET":
+                key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+                if b"NX" in options and self._live(key) is not None:
+                    return b"$-1\r\n"
+                self.values[key] = value
+                if b"PX" in options:
+                    ttl = int(args[2 + options.index(b"PX") + 1])
+                    self.expiries[key] = time.time() + ttl / 1000
+                return b"+OK\r\n"
+            if name in (b"INCRBY", b"DECRBY"):
+                sign = 1 if name == b"INCRBY" else -1
+                value = int(self._live(args[0]) or 0) + sign * int(args[1])
+                self.values[args[0]] = str(value).encode()
+                return b":%d\r\n" % value
+            if name == b"PTTL":
+                if self._live(args[0]) is None:
+                    return b":-2\r\n"
+                expiry = self.expiries.get(args[0])
+                if expiry is None:
+                    return b":-1\r\n"
+                return b":%d\r\n" % int((expiry - time.time()) * 1000)
+            if name == b"DEL":
+                removed = sum(self.values.pop(key, None) is not None for key in args)
+                return b":%d\r\n" % removed
+            if name == b"SCAN":
+                prefix = args[args.index(b"MATCH") + 1].rstrip(b"*")
+                keys = [_bulk(key) for key in self.values if key.startswith(prefix)]
+                return b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(keys)
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture()
+def resp_server() -> Iterator[_RespServer]:
+    server = _RespServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _resp_uri(server: _RespServer) -> str:
+    host, port = server.server_address
+    return f"resp://{host}:{port}/0"
+
+
+def test_sqlite_storage_is_shared_between_workers(tmp_path: Path):
+    uri = f"sqlite:///{tmp_path}/limits.db"
+    workers = [storage_from_string(uri), storage_from_string(uri)]
+    assert all(isinstance(storage, SQLiteStorage) for storage in workers)
+    item = parse("5/minute")
+
+    hits = [
+        SlidingWindowCounterRateLimiter(workers[i % 2]).hit(item, "client")
+        for i in range(8)
+    ]
+
+    assert hits == [True] * 5 + [False] * 3
+    assert workers[1].reset() == 1
+
+
+def test_sqlite_fixed_window_expires_and_clears(tmp_path: Path):
+    storage = SQLiteStorage(f"sqlite:///{tmp_path}/limits.db")
+    limiter = FixedWindowRateLimiter(storage)
+    item = parse("2/second")
+
+    assert [limiter.hit(item, "k") for _ in range(3)] == [True, True, False]
+    assert storage.get_expiry(item.key_for("k")) > time.time()
+    time.sleep(1.05)
+    assert limiter.hit(item, "k")
+    storage.clear(item.key_for("k"))
+    assert storage.get(item.key_for("k")) == 0
+    assert storage.purge_expired() == 0
+
+
+def test_resp_storage_enforces_limits_against_stand_in(resp_server: _RespServer):
+    first = storage_from_string(_resp_uri(resp_server))
+    second = RespStorage(_resp_uri(resp_server))
+    assert isinstance(first, RespStorage) and first.check()
+    item = parse("3/minute")
+
+    hits = [
+        SlidingWindowCounterRateLimiter(storage).hit(item, "client")
+        for storage in (first, second, first, second)
+    ]
+    fixed = [FixedWindowRateLimiter(first).hit(item, "fixed") for _ in range(4)]
+
+    assert hits == [True, True, True, False]
+    assert fixed == [True, True, True, False]
+    assert all(key.startswith(b"rate-limit:") for key in resp_server.values)
+    assert first.get_expiry(item.key_for("fixed")) > time.time()
+
+    resp_server.values[b"unrelated"] = b"1"
+    assert second.reset() == 2
+    assert list(resp_server.values) == [b"unrelated"]
+
+
+def test_gcra_allows_burst_then_refills():
+    results = [gcra(None, 100.0, rate=1.0, burst=3)]
+    for _ in range(3):
+        results.append(gcra(results[-1][0], 100.0, rate=1.0, burst=3))
+
+    assert [retry for _, retry in results] == [0.0, 0.0, 0.0, pytest.approx(1.0)]
+    assert results[-1][0] is None
+    assert gcra(results[2][0], 101.0, rate=1.0, burst=3) == (104.0, 0.0)
+
+
+def test_memory_token_buckets_are_per_key():
+    buckets = token_buckets_from_uri("memory://")
+    assert isinstance(buckets, MemoryTokenBuckets)
+
+    first = [buckets.consume_token("a", rate=0.01, burst=2) for _ in range(3)]
+    other = buckets.consume_token("b", rate=0.01, burst=2)
+
+    assert first[:2] == [0.0, 0.0] and first[2] > 99
+    assert other == 0.0
+
+
+def test_sqlite_token_buckets_are_shared_between_workers(tmp_path: Path):
+    uri = f"sqlite:///{tmp_path}/limits.db"
+    workers = [token_buckets_from_uri(uri), SQLiteStorage(uri)]
+
+    retries = [
+        workers[i % 2].consume_token("user:1", rate=0.01, burst=3) for i in range(5)
+    ]
+
+    assert retries[:3] == [0.0] * 3
+    assert all(retry > 0 for retry in retries[3:])
+    assert workers[0].purge_expired() == 0
+    workers[1].reset()
+    assert workers[0].consume_token("user:1", rate=0.01, burst=3) == 0.0
+
+
+def test_resp_token_buckets_retry_on_concurrent_update(resp_server: _RespServer):
+    first = RespStorage(_resp_uri(resp_server))
+    second = RespStorage(_resp_uri(resp_server))
+
+    resp_server.interfere = 2
+    retries = [
+        storage.consume_token("user:1", rate=0.01, burst=2)
+        for storage in (first, second, first)
+    ]
+
+    assert retries[:2] == [0.0, 0.0] and retries[2] > 99
+    assert resp_server.interfere == 0
+    assert list(resp_server.values) == [b"rate-limit:bucket:user:1"]
+    assert 0 < first.get_expiry("bucket:user:1") - time.time() <= 200
+
+
+def test_resp_storage_reports_unreachable_server():
+    storage = RespStorage("resp://127.0.0.1:1/0", socket_timeout=0.2)
+    assert not storage.check()
+    with pytest.raises(OSError):
+        storage.incr("key", 60)
+
+
+def _limited_app(limiter: Limiter, middleware: type) -> FastAPI:
+    limited_app = FastAPI()
+    limited_app.state.limiter = limiter
+    limited_app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    limited_app.add_middleware(middleware, limiter=limiter)
+
+    @limited_app.get("/open")
+    def open_route(request: Request) -> dict[str, bool]:
+        return {"ok": True}
+
+    return limited_app
+
+
+def _statuses(limited_app: FastAPI, count: int) -> list[int]:
+    async def scenario() -> list[int]:
+        transport = ASGITransport(app=limited_app)
+        async with AsyncClient(transport=transport, base_url="http://t") as client:
+            return [(await client.get("/open")).status_code for _ in range(count)]
+
+    return asyncio.run(scenario())
+
+
+def test_middleware_passes_through_without_default_limits(rate_limiter: ModuleType):
+    calls: list[str] = []
+
+    async def downstream(scope, receive, send) -> None:
+        calls.append("app")
+
+    async def checked(scope, receive, send) -> None:
+        calls.append("slowapi")
+
+    limiter = Limiter(key_func=get_remote_address)
+    middleware = rate_limiter.RateLimitMiddleware(downstream, limiter=limiter)
+    middleware._checked = checked
+    scope = {"type": "http", "path": "/open"}
+
+    asyncio.run(middleware(scope, None, None))
+    limiter._default_limits = Limiter(
+        key_func=get_remote_address, default_limits=["2/minute"]
+    )._default_limits
+    asyncio.run(middleware(scope, None, None))
+
+    assert calls == ["app", "slowapi"]
+
+
+def test_middleware_applies_default_limits(rate_limiter: ModuleType):
+    limiter = Limiter(key_func=get_remote_address, default_limits=["2/minute"])
+    limited_app = _limited_app(limiter, rate_limiter.RateLimitMiddleware)
+
+    assert _statuses(limited_app, 3) == [200, 200, 429]
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import threading
+from collections.abc import Iterator
+from types import ModuleType
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.orm import Session
+
+import app.auth as auth_utils
+from app.auth import create_access_token, get_current_user
+from app.db import get_db
+from app.models.user import User
+from app.rate_limit_storage import MemoryTokenBuckets
+from app.user_cache import AuthenticatedUser
+
+
+@pytest.fixture()
+def tiers(auth_router: ModuleType) -> ModuleType:
+    # Imported after ``auth_router`` so slowapi's limiter has found its .env.
+    return importlib.import_module("app.rate_limit_tiers")
+
+
+@pytest.fixture()
+def tiered_app(tiers: ModuleType, db_session: Session) -> Iterator[FastAPI]:
+    read = tiers.TierPolicy("read", rate=0.01, burst=3)
+    write = tiers.TierPolicy("write", rate=0.01, burst=2)
+    tiered = FastAPI()
+    tiered.add_middleware(
+        tiers.TieredRateLimitMiddleware,
+        buckets=MemoryTokenBuckets(),
+        routes=[
+            tiers.RouteTier("/api/bikes", frozenset({"GET"}), read),
+            tiers.RouteTier("/api/rentals", frozenset({"POST"}), write),
+        ],
+    )
+
+    @tiered.get("/api/bikes")
+    def list_bikes() -> list[int]:
+        return []
+
+    @tiered.post("/api/rentals")
+    def create_rental(
+        user: Annotated[AuthenticatedUser, Depends(get_current_user)],
+    ) -> dict[str, int]:
+        return {"user_id": user.id}
+
+    @tiered.get("/health")
+    def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    def _get_db() -> Iterator[Session]:
+        yield db_session
+
+    tiered.dependency_overrides[get_db] = _get_db
+    yield tiered
+
+
+def _user(db_session: Session, email: str) -> User:
+    user = User(name=email, email=email, hashed_password="hashed-password")
+    db_session.add(user)
+    db_session.flush()
+    return user
+
+
+def _send(tiered_app: FastAPI, requests: list[tuple[str, str, str | None]]) -> list:
+    async def scenario() -> list:
+        transport = ASGITransport(app=tiered_app)
+        async with AsyncClient(transport=transport, base_url="http://t") as client:
+            responses = []
+            for method, path, token in requests:
+                headers = {"Authorization": f"Bearer {token}"} if token else {}
+                responses.append(await client.request(method, path, headers=headers))
+            return responses
+
+    return asyncio.run(scenario())
+
+
+def test_tier_for_matches_declared_routes(tiers: ModuleType):
+    assert tiers.tier_for("GET", "/api/bikes/nearby") is tiers.READ_TIER
+    assert tiers.tier_for("POST", "/api/quotes") is tiers.READ_TIER
+    assert tiers.tier_for("GET", "/api/rentals/7") is tiers.READ_TIER
+    assert tiers.tier_for("POST", "/api/rentals/batch") is tiers.WRITE_TIER
+    assert tiers.tier_for("POST", "/api/payments") is tiers.WRITE_TIER
+    assert tiers.tier_for("POST", "/auth/login") is None
+    assert tiers.tier_for("GET", "/api/bikesearch") is None
+
+
+def test_write_tier_is_per_user_and_separate_from_reads(
+    tiered_app: FastAPI, db_session: Session
+):
+    alice = create_access_token(str(_user(db_session, "alice@example.com").id))
+    bob = create_access_token(str(_user(db_session, "bob@example.com").id))
+
+    responses = _send(
+        tiered_app,
+        [("POST", "/api/rentals", alice)] * 3
+        + [("POST", "/api/rentals", bob), ("GET", "/api/bikes", alice)],
+    )
+
+    assert [r.status_code for r in responses] == [200, 200, 429, 200, 200]
+    limited = responses[2]
+    assert limited.json()["error"]["code"] == "RATE_LIMITED"
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_anonymous_reads_are_keyed_by_client_address(tiered_app: FastAPI):
+    responses = _send(
+        tiered_app,
+        [("GET", "/api/bikes", None)] * 2
+        + [("GET", "/api/bikes", "not-a-jwt"), ("GET", "/api/bikes", None)]
+        + [("GET", "/health", None)],
+    )
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 429, 200]
+
+
+def test_token_is_decoded_once_per_request(
+    tiered_app: FastAPI, db_session: Session, monkeypatch: pytest.MonkeyPatch
+):
+    token = create_access_token(str(_user(db_session, "carol@example.com").id))
+    calls: list[str] = []
+    decode = auth_utils.decode_token
+
+    def counting_decode(raw: str, expected_type: str) -> dict:
+        calls.append(raw)
+        return decode(raw, expected_type)
+
+    monkeypatch.setattr(auth_utils, "decode_token", counting_decode)
+
+    responses = _send(tiered_app, [("POST", "/api/rentals", token)] * 2)
+
+    assert [r.status_code for r in responses] == [200, 200]
+    # The second request is keyed and authenticated from ``user_cache``.
+    assert calls == [token]
+
+
+def test_shared_storage_buckets_are_consumed_off_the_event_loop(
+    tiers: ModuleType,
+):
+    class RecordingBuckets:
+        threads: list[int] = []
+
+        def consume_token(self, key: str, rate: float, burst: int) -> float:
+            self.threads.append(threading.get_ident())
+            return 0.0
+
+    buckets = RecordingBuckets()
+    tiered = FastAPI()
+    tiered.add_middleware(tiers.TieredRateLimitMiddleware, buckets=buckets)
+
+    @tiered.get("/api/bikes")
+    async def list_bikes() -> list[int]:
+        return []
+
+    async def scenario() -> int:
+        transport = ASGITransport(app=tiered)
+        async with AsyncClient(transport=transport, base_url="http://t") as client:
+            return (await client.get("/api/bikes")).status_code
+
+    assert asyncio.run(scenario()) == 200
+    # ``asyncio.run`` drives the loop on this thread.
+    assert buckets.threads and buckets.threads[0] != threading.get_ident()
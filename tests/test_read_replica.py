@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from collections.abc import AsyncIterator, Iterator
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+
+import app.db as db_module
+from app.auth import get_current_user_async
+from app.catalog_cache import catalog_cache
+from app.db import Base, get_async_db
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.user import User
+from app.read_replica import RecentWriters, caller_keys
+from app.routers import bikes, rentals
+
+
+def _scope(token: str | None = None, client: str = "198.51.100.7") -> dict:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return {"type": "http", "headers": headers, "client": (client, 1)}
+
+
+def test_callers_sharing_an_address_are_not_sticky_together():
+    # Behind a reverse proxy every request arrives from the proxy's address.
+    writers = RecentWriters(window_seconds=60)
+    writers.mark(_scope("alice-token", client="10.0.0.1"))
+
+    assert writers.is_sticky(_scope("alice-token", client="10.0.0.1"))
+    assert not writers.is_sticky(_scope("bob-token", client="10.0.0.1"))
+    assert not writers.is_sticky(_scope(client="10.0.0.1"))
+
+
+def test_recent_writers_expire_after_the_window():
+    now = [100.0]
+    writers = RecentWriters(window_seconds=5, clock=lambda: now[0])
+    writers.mark(_scope("alice-token"))
+
+    assert caller_keys(_scope("t")) == ("token:t",)
+    assert caller_keys(_scope()) == ()
+    assert writers.is_sticky(_scope("alice-token", client="203.0.113.1"))
+    now[0] += 5
+    assert not writers.is_sticky(_scope("alice-token"))
+
+
+class _Replica:
+    """A primary and a replica SQLite file, synced on demand."""
+
+    def __init__(self, directory: Path) -> None:
+        self.primary_path = directory / "primary.db"
+        self.replica_path = directory / "replica.db"
+        self.primary = create_engine(f"sqlite:///{self.primary_path}")
+        self.async_engines: list[AsyncEngine] = []
+        Base.metadata.create_all(self.primary)
+        self.sync()
+
+    def sync(self) -> None:
+        source = sqlite3.connect(self.primary_path)
+        target = sqlite3.connect(self.replica_path)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+
+    def async_factory(self, path: Path) -> async_sessionmaker[AsyncSession]:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.async_engines.append(engine)
+        return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture()
+def replicated(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[tuple[_Replica, AsyncClient, User]]:
+    replica = _Replica(tmp_path)
+    with Session(replica.primary, expire_on_commit=False) as setup:
+        user = User(name="Reader", email="reader@example.com", hashed_password="x")
+        setup.add(user)
+        setup.add_all(
+            Bike(
+                name=f"Bike {index}",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for index in range(2)
+        )
+        setup.commit()
+    replica.sync()
+
+    primary_factory = replica.async_factory(replica.primary_path)
+    replica_factory = replica.async_factory(replica.replica_path)
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with primary_factory() as db:
+            yield db
+
+    monkeypatch.setattr(db_module, "AsyncReadSessionLocal", replica_factory)
+    monkeypatch.setattr(db_module, "recent_writers", RecentWriters(60))
+    # Replica syncs are not ORM commits, so cached pages would hide them.
+    monkeypatch.setattr(catalog_cache, "enabled", False)
+    test_app = FastAPI()
+    test_app.include_router(bikes.router)
+    test_app.include_router(rentals.router)
+    test_app.dependency_overrides[get_async_db] = _get_async_db
+    test_app.dependency_overrides[get_current_user_async] = lambda: user
+    client = AsyncClient(transport=ASGITransport(app=test_app), base_url="http://t")
+    try:
+        yield replica, client, user
+    finally:
+        asyncio.run(client.aclose())
+        for engine in replica.async_engines:
+            asyncio.run(engine.dispose())
+        replica.primary.dispose()
+
+
+def test_reads_are_served_by_the_replica(replicated):
+    replica, client, _ = replicated
+    with Session(replica.primary) as db:
+        db.add(
+            Bike(
+                name="Primary only",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+        )
+        db.commit()
+
+    stale = asyncio.run(client.get("/api/bikes"))
+    replica.sync()
+    synced = asyncio.run(client.get("/api/bikes"))
+
+    assert len(stale.json()) == 2
+    assert len(synced.json()) == 3
+
+
+def test_writer_reads_its_own_rental_from_the_primary(replicated):
+    replica, client, user = replicated
+
+    async def book_then_read() -> tuple:
+        booked = await client.post(
+            "/api/rentals",
+            json={
+                "bike_id": 1,
+                "user_id": user.id,
+                "start_date": date(2024, 8, 1).isoformat(),
+                "end_date": date(2024, 8, 3).isoformat(),
+                "total_price_cents": 0,
+            },
+            headers={"Authorization": "Bearer writer-token"},
+        )
+        rental_id = booked.json()["id"]
+        own = await client.get(
+            f"/api/rentals/{rental_id}",
+            headers={"Authorization": "Bearer writer-token"},
+        )
+        db_module.recent_writers.clear()
+        other = await client.get(f"/api/rentals/{rental_id}")
+        return booked, own, other
+
+    booked, own, other = asyncio.run(book_then_read())
+
+    assert booked.status_code == 200
+    assert own.status_code == 200
+    # The replica has not caught up, and this caller has no recent write.
+    assert other.status_code == 404
+
+
+def test_recent_writers_bypass_cached_replica_pages(replicated, monkeypatch):
+    replica, client, _ = replicated
+    monkeypatch.setattr(catalog_cache, "enabled", True)
+    with Session(replica.primary) as db:
+        db.add(
+            Bike(
+                name="Primary only",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+        )
+        db.commit()
+    db_module.recent_writers.mark(_scope("writer-token", client="203.0.113.9"))
+
+    async def read_both() -> tuple:
+        other = await client.get("/api/bikes")
+        own = await client.get(
+            "/api/bikes", headers={"Authorization": "Bearer writer-token"}
+        )
+        return other, own
+
+    other, own = asyncio.run(read_both())
+
+    # The lagging replica page is cached, but not served to the writer.
+    assert len(other.json()) == 2 and len(catalog_cache) == 1
+    assert len(own.json()) == 3
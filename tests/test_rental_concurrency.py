@@ -0,0 +1,137 @@
+"""Concurrent booking tests against a file-backed SQLite database.
+
+Every request gets its own ``AsyncSession`` on the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.auth import get_current_user_async
+from app.db import get_async_db
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.rental import Rental
+from app.models.user import User
+from app.repositories import rental_repo
+from app.routers import rentals
+from app.schemas.rental_schema import RentalCreate
+from app.services.booking_calendar import booking_calendar, get_booking_calendar
+
+_CONTENDERS = 200
+
+
+@pytest.fixture()
+def concurrent_client(
+    file_session_factory: sessionmaker,
+    file_async_session_factory: async_sessionmaker[AsyncSession],
+) -> Iterator[tuple[AsyncClient, User, list[Bike]]]:
+    session_factory = file_session_factory
+    with session_factory(expire_on_commit=False) as setup:
+        user = User(name="Racer", email="racer@example.com", hashed_password="x")
+        bikes = [
+            Bike(
+                name=f"Bike {index}",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for index in range(50)
+        ]
+        setup.add(user)
+        setup.add_all(bikes)
+        setup.commit()
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with file_async_session_factory() as db:
+            yield db
+
+    test_app = FastAPI()
+    test_app.include_router(rentals.router)
+    test_app.dependency_overrides[get_async_db] = _get_async_db
+    test_app.dependency_overrides[get_current_user_async] = lambda: user
+    client = AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test")
+    try:
+        yield client, user, bikes
+    finally:
+        asyncio.run(client.aclose())
+
+
+def _payload(bike_id: int, user_id: int) -> dict:
+    return {
+        "bike_id": bike_id,
+        "user_id": user_id,
+        "start_date": date(2024, 8, 1).isoformat(),
+        "end_date": date(2024, 8, 3).isoformat(),
+        "total_price_cents": 0,
+    }
+
+
+async def _post_all(client: AsyncClient, payloads: list[dict]) -> list[int]:
+    responses = await asyncio.gather(
+        *(client.post("/api/rentals", json=payload) for payload in payloads)
+    )
+    return [response.status_code for response in responses]
+
+
+def test_simultaneous_bookings_for_one_bike_have_exactly_one_winner(
+    concurrent_client, file_engine: Engine
+) -> None:
+    client, user, bikes = concurrent_client
+    target = bikes[0]
+
+    statuses = asyncio.run(
+        _post_all(client, [_payload(target.id, user.id)] * _CONTENDERS)
+    )
+
+    assert Counter(statuses) == {200: 1, 409: _CONTENDERS - 1}
+    with Session(file_engine) as check:
+        stored = check.scalar(
+            select(func.count()).select_from(Rental).where(Rental.bike_id == target.id)
+        )
+    assert stored == 1
+
+
+def test_simultaneous_bookings_for_different_bikes_all_succeed(
+    concurrent_client,
+) -> None:
+    client, user, bikes = concurrent_client
+
+    statuses = asyncio.run(
+        _post_all(client, [_payload(bike.id, user.id) for bike in bikes])
+    )
+
+    assert statuses == [200] * len(bikes)
+
+
+def test_lost_reservation_keeps_the_booking_calendar(
+    concurrent_client,
+    file_session_factory: sessionmaker,
+    file_async_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    _, user, bikes = concurrent_client
+    schema = RentalCreate(**_payload(bikes[0].id, user.id))
+    with file_session_factory() as db:
+        get_booking_calendar(db, today=date(2024, 7, 1))
+
+    async def reserve_at_stale_version() -> Rental | None:
+        async with file_async_session_factory() as db:
+            return await rental_repo.reserve_rental_async(
+                db, schema, bikes[0].version + 1
+            )
+
+    try:
+        assert asyncio.run(reserve_at_stale_version()) is None
+        # Losing the race must not force every reader to reload the calendar.
+        assert booking_calendar.origin == date(2024, 7, 1)
+    finally:
+        booking_calendar.clear()
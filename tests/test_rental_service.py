@@ -8,6 +8,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from app.models.bike import AvailabilityStatus
 from app.services.rental_service import (
     compute_total_price_cents,
     is_bike_available,
@@ -135,3 +136,12 @@ def test_is_bike_available_reuses_validate_range():
 
     with pytest.raises(ValueError, match="Rental duration"):
         is_bike_available(bike, date(2024, 6, 1), date(2024, 6, 5))
+
+
+def test_is_bike_available_reads_orm_availability_status():
+    class OrmBikeStub:
+        availability_status = AvailabilityStatus.AVAILABLE
+
+    available = is_bike_available(OrmBikeStub(), date(2024, 6, 1), date(2024, 6, 2))
+
+    assert available is True
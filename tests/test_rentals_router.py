@@ -8,6 +8,8 @@ from sqlalchemy.orm import Session
 from app.models.bike import AvailabilityStatus, Bike
 from app.models.rental import Rental
 from app.models.user import User
+from app.services.pagination import encode_cursor
+from app.services.pricing import pricing_rules
 
 
 def _create_bike(db_session: Session) -> Bike:
@@ -45,6 +47,21 @@ def test_create_rental_returns_created_record(
     assert body["total_price_cents"] == bike.rate_per_day_cents * 2
 
 
+def test_create_rental_stays_within_query_budget(
+    async_client, db_session: Session, test_user: User, query_budget
+) -> None:
+    bike = _create_bike(db_session)
+    payload = _rental_payload(bike, test_user, date(2024, 7, 1), date(2024, 7, 3))
+    # Pricing rules are cached per process; only the booking is budgeted.
+    pricing_rules.get(db_session)
+
+    # bike, overlap check, version UPDATE, INSERT, reload
+    with query_budget(5):
+        response = asyncio.run(async_client.post("/api/rentals", json=payload))
+
+    assert response.status_code == 200, response.json()
+
+
 def test_get_rental_returns_existing_record(
     async_client, db_session: Session, test_user: User
 ) -> None:
@@ -66,3 +83,231 @@ def test_get_rental_returns_existing_record(
     assert body["id"] == rental.id
     assert body["bike_id"] == bike.id
     assert body["user_id"] == test_user.id
+
+
+def _rental_payload(bike: Bike, user: User, start: date, end: date) -> dict:
+    return {
+        "bike_id": bike.id,
+        "user_id": user.id,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "total_price_cents": 0,
+    }
+
+
+def test_create_rental_rejects_overlapping_booking(
+    async_client, db_session: Session, test_user: User
+) -> None:
+    bike = _create_bike(db_session)
+    first = asyncio.run(
+        async_client.post(
+            "/api/rentals",
+            json=_rental_payload(bike, test_user, date(2024, 7, 1), date(2024, 7, 3)),
+        )
+    )
+    assert first.status_code == 200, first.json()
+
+    overlapping = asyncio.run(
+        async_client.post(
+            "/api/rentals",
+            json=_rental_payload(bike, test_user, date(2024, 7, 2), date(2024, 7, 4)),
+        )
+    )
+
+    assert overlapping.status_code == 409
+    assert overlapping.json()["error"]["code"] == "UNAVAILABLE"
+
+
+def test_create_rental_allows_back_to_back_booking(
+    async_client, db_session: Session, test_user: User
+) -> None:
+    bike = _create_bike(db_session)
+    for start, end in [
+        (date(2024, 7, 1), date(2024, 7, 3)),
+        (date(2024, 7, 3), date(2024, 7, 5)),
+    ]:
+        response = asyncio.run(
+            async_client.post(
+                "/api/rentals", json=_rental_payload(bike, test_user, start, end)
+            )
+        )
+        assert response.status_code == 200, response.json()
+
+
+def test_create_rental_batch_creates_all_items(
+    async_client, db_session: Session, test_user: User
+) -> None:
+    bikes = [_create_bike(db_session) for _ in range(3)]
+    items = [
+        _rental_payload(bike, test_user, date(2024, 8, 1), date(2024, 8, 3))
+        for bike in bikes
+    ]
+
+    response = asyncio.run(
+        async_client.post("/api/rentals/batch", json={"items": items})
+    )
+
+    assert response.status_code == 200, response.json()
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["created"] * 3
+    assert [result["rental"]["bike_id"] for result in results] == [
+        bike.id for bike in bikes
+    ]
+    assert all(result["rental"]["total_price_cents"] == 5000 for result in results)
+
+
+def test_create_rental_batch_uses_constant_queries(
+    async_client, db_session: Session, test_user: User, query_budget
+) -> None:
+    bikes = [_create_bike(db_session) for _ in range(20)]
+    items = [
+        _rental_payload(bike, test_user, date(2024, 8, 1), date(2024, 8, 2))
+        for bike in bikes
+    ]
+    pricing_rules.get(db_session)
+
+    # user lookup, bikes, overlaps, version UPDATE, INSERT, reload
+    with query_budget(6) as stats:
+        response = asyncio.run(
+            async_client.post("/api/rentals/batch", json={"items": items})
+        )
+
+    assert response.status_code == 200, response.json()
+    rental_inserts = [
+        statement
+        for statement in stats.statements
+        if statement.startswith("INSERT INTO rentals")
+    ]
+    assert len(rental_inserts) == 1
+    assert stats.statements[rental_inserts[0]] == 1
+
+
+def test_create_rental_batch_rejects_whole_batch_on_any_conflict(
+    async_client, db_session: Session, test_user: User
+) -> None:
+    booked_bike, free_bike = _create_bike(db_session), _create_bike(db_session)
+    first = asyncio.run(
+        async_client.post(
+            "/api/rentals",
+            json=_rental_payload(
+                booked_bike, test_user, date(2024, 8, 1), date(2024, 8, 3)
+            ),
+        )
+    )
+    assert first.status_code == 200, first.json()
+
+    items = [
+        _rental_payload(free_bike, test_user, date(2024, 8, 1), date(2024, 8, 3)),
+        _rental_payload(booked_bike, test_user, date(2024, 8, 2), date(2024, 8, 4)),
+        _rental_payload(free_bike, test_user, date(2024, 8, 1), date(2024, 8, 9)),
+        {
+            **_rental_payload(free_bike, test_user, date(2024, 8, 5), date(2024, 8, 6)),
+            "bike_id": 999_999,
+        },
+    ]
+    response = asyncio.run(
+        async_client.post("/api/rentals/batch", json={"items": items})
+    )
+
+    assert response.status_code == 409
+    body = response.json()
+    assert body["error"]["code"] == "BATCH_REJECTED"
+    assert [result["status"] for result in body["results"]] == [
+        "valid",
+        "error",
+        "error",
+        "error",
+    ]
+    assert [
+        result["error"]["code"] for result in body["results"][1:]
+    ] == ["UNAVAILABLE", "INVALID_RANGE", "NOT_FOUND"]
+    assert (
+        db_session.query(Rental).filter(Rental.bike_id == free_bike.id).count() == 0
+    )
+
+
+def test_create_rental_batch_rejects_overlaps_within_batch(
+    async_client, db_session: Session, test_user: User
+) -> None:
+    bike = _create_bike(db_session)
+    items = [
+        _rental_payload(bike, test_user, date(2024, 8, 1), date(2024, 8, 3)),
+        _rental_payload(bike, test_user, date(2024, 8, 3), date(2024, 8, 5)),
+        _rental_payload(bike, test_user, date(2024, 8, 4), date(2024, 8, 6)),
+    ]
+
+    response = asyncio.run(
+        async_client.post("/api/rentals/batch", json={"items": items})
+    )
+
+    assert response.status_code == 409
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["valid", "valid", "error"]
+    assert db_session.query(Rental).filter(Rental.bike_id == bike.id).count() == 0
+
+
+def _add_rentals(db_session: Session, user: User, count: int) -> list[Rental]:
+    rentals = []
+    for _ in range(count):
+        bike = _create_bike(db_session)
+        rental = Rental(
+            bike_id=bike.id,
+            user_id=user.id,
+            start_date=date(2024, 9, 1),
+            end_date=date(2024, 9, 2),
+            total_price_cents=2500,
+        )
+        db_session.add(rental)
+        rentals.append(rental)
+    db_session.flush()
+    return rentals
+
+
+def test_list_my_rentals_pages_newest_first_with_bikes(
+    async_client, db_session: Session, test_user: User
+) -> None:
+    other_user = User(
+        name="Other", email="other-renter@example.com", hashed_password="hashed"
+    )
+    db_session.add(other_user)
+    db_session.flush()
+    _add_rentals(db_session, other_user, 2)
+    mine = _add_rentals(db_session, test_user, 5)
+
+    seen: list[int] = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = asyncio.run(async_client.get("/api/rentals", params=params))
+        assert response.status_code == 200, response.json()
+        page = response.json()
+        assert all(item["bike"]["id"] == item["bike_id"] for item in page)
+        seen.extend(item["id"] for item in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    # Rows created in the same instant fall back to id order.
+    assert seen == sorted((rental.id for rental in mine), reverse=True)
+
+
+def test_list_my_rentals_uses_constant_queries(
+    async_client, db_session: Session, test_user: User, query_budget
+) -> None:
+    _add_rentals(db_session, test_user, 30)
+
+    for limit in (2, 25):
+        with query_budget(1):
+            response = asyncio.run(
+                async_client.get("/api/rentals", params={"limit": limit})
+            )
+        assert len(response.json()) == limit
+
+
+def test_list_my_rentals_rejects_foreign_cursor(async_client) -> None:
+    cursor = encode_cursor("bikes:id", [1])
+
+    response = asyncio.run(async_client.get("/api/rentals", params={"cursor": cursor}))
+
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
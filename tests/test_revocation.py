@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Request
+from httpx import AsyncClient
+from jose import jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.auth import (
+    ALGORITHM,
+    SECRET_KEY,
+    create_access_token,
+    create_refresh_token,
+    get_current_user,
+    revoke_token_claims,
+)
+from app.models import RevokedToken, User
+from app.revocation import BloomFilter, RevocationFilter, revocation_filter
+from app.user_cache import AuthenticatedUser
+
+
+def _claims(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def _current_user(token: str, db_session: Session) -> AuthenticatedUser:
+    """Call the dependency directly, as FastAPI would for a fresh request."""
+    return get_current_user(Request({"type": "http"}), token=token, db=db_session)
+
+
+def _count_statements(db_session: Session, func):
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=100, false_positive_rate=0.01)
+    members = [f"jti-{i}" for i in range(100)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(f"other-{i}" in bloom for i in range(1_000))
+    assert false_positives < 50
+
+
+def test_filter_syncs_rows_above_high_water_mark(db_session: Session):
+    expires_at = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    db_session.add(RevokedToken(jti="first", expires_at=expires_at))
+    db_session.flush()
+    revocations = RevocationFilter(sync_interval_seconds=3_600, initial_capacity=4)
+    revocations.sync(db_session)
+
+    # Written by "another worker": not seen until the next sync.
+    db_session.add_all(
+        RevokedToken(jti=f"later-{i}", expires_at=expires_at) for i in range(10)
+    )
+    db_session.flush()
+    assert revocations.is_revoked(db_session, "first")
+    assert not revocations.is_revoked(db_session, "unrelated")
+
+    revocations.sync(db_session)
+    assert len(revocations) == 11
+    assert revocations.is_revoked(db_session, "later-9")
+
+
+def test_filter_prunes_expired_ids_and_falls_back_to_database(db_session: Session):
+    expired = datetime.now(tz=timezone.utc) - timedelta(seconds=1)
+    db_session.add(RevokedToken(jti="stale", expires_at=expired))
+    db_session.flush()
+    revocations = RevocationFilter()
+    revocations.sync(db_session)
+
+    assert len(revocations) == 0
+    assert revocations.is_revoked(db_session, "stale")
+
+
+def test_unrevoked_token_check_is_memory_only(db_session: Session, test_user: User):
+    token = create_access_token(str(test_user.id), timedelta(minutes=5))
+    revocation_filter.sync(db_session)
+    db_session.expunge_all()
+
+    _, queries = _count_statements(
+        db_session, lambda: _current_user(token, db_session)
+    )
+
+    assert queries == 1  # the user lookup only
+
+
+def test_revoked_access_token_is_rejected_even_when_cached(
+    db_session: Session, test_user: User
+):
+    token = create_access_token(str(test_user.id), timedelta(minutes=5))
+    assert _current_user(token, db_session).id == test_user.id
+
+    assert revoke_token_claims(db_session, _claims(token))
+    assert not revoke_token_claims(db_session, _claims(token))
+    with pytest.raises(HTTPException) as exc_info:
+        _current_user(token, db_session)
+    assert exc_info.value.status_code == 401
+
+
+def test_refresh_token_is_not_an_access_token(db_session: Session, test_user: User):
+    token = create_refresh_token(str(test_user.id))
+
+    with pytest.raises(HTTPException) as exc_info:
+        _current_user(token, db_session)
+    assert exc_info.value.status_code == 401
+
+
+def test_refresh_rotates_tokens_and_rejects_reuse(
+    auth_client: AsyncClient, test_user: User
+):
+    refresh_token = create_refresh_token(str(test_user.id))
+
+    async def scenario():
+        rotated = await auth_client.post(
+            "/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        reused = await auth_client.post(
+            "/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        wrong_type = await auth_client.post(
+            "/auth/refresh",
+            json={"refresh_token": create_access_token(str(test_user.id))},
+        )
+        return rotated, reused, wrong_type
+
+    rotated, reused, wrong_type = asyncio.run(scenario())
+
+    assert rotated.status_code == 200
+    body = rotated.json()
+    assert _claims(body["access_token"])["type"] == "access"
+    assert _claims(body["refresh_token"])["type"] == "refresh"
+    assert body["refresh_token"] != refresh_token
+    assert (reused.status_code, wrong_type.status_code) == (401, 401)
+
+
+def test_logout_revokes_access_and_refresh_tokens(
+    auth_client: AsyncClient, db_session: Session, test_user: User
+):
+    access_token = create_access_token(str(test_user.id))
+    refresh_token = create_refresh_token(str(test_user.id))
+
+    async def scenario():
+        logged_out = await auth_client.post(
+            "/auth/logout",
+            headers={"Authorization": f"Bearer {access_token}"},
+            json={"refresh_token": refresh_token},
+        )
+        refreshed = await auth_client.post(
+            "/auth/refresh", json={"refresh_token": refresh_token}
+        )
+        return logged_out, refreshed
+
+    logged_out, refreshed = asyncio.run(scenario())
+
+    assert (logged_out.status_code, refreshed.status_code) == (204, 401)
+    with pytest.raises(HTTPException):
+        _current_user(access_token, db_session)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.services.geo import haversine_m
+from app.services.spatial_index import BikeSpatialIndex
+
+
+def _random_points(count: int, seed: int = 7) -> list[tuple[int, float, float]]:
+    rng = random.Random(seed)
+    return [
+        (bike_id, 51.5 + rng.uniform(-0.2, 0.2), -0.12 + rng.uniform(-0.3, 0.3))
+        for bike_id in range(1, count + 1)
+    ]
+
+
+def _assert_same_matches(result, expected):
+    assert [bike_id for bike_id, _ in result] == [bike_id for bike_id, _ in expected]
+    assert [distance for _, distance in result] == pytest.approx(
+        [distance for _, distance in expected]
+    )
+
+
+def _brute_force(points, lat, lng, limit, radius_m=None):
+    scored = [
+        (bike_id, haversine_m(lat, lng, bike_lat, bike_lng))
+        for bike_id, bike_lat, bike_lng in points
+    ]
+    if radius_m is not None:
+        scored = [match for match in scored if match[1] <= radius_m]
+    scored.sort(key=lambda match: (match[1], match[0]))
+    return scored[:limit]
+
+
+@pytest.mark.parametrize("radius_m", [250.0, 1_500.0, 20_000.0])
+def test_radius_query_matches_brute_force(radius_m):
+    points = _random_points(3_000)
+    index = BikeSpatialIndex()
+    index.load(points)
+
+    result = index.nearby(51.51, -0.1, limit=50, radius_m=radius_m)
+
+    _assert_same_matches(result, _brute_force(points, 51.51, -0.1, 50, radius_m))
+
+
+@pytest.mark.parametrize("limit", [1, 10, 100])
+def test_k_nearest_matches_brute_force(limit):
+    points = _random_points(3_000)
+    index = BikeSpatialIndex()
+    index.load(points)
+
+    result = index.nearby(51.4, -0.35, limit=limit)
+
+    _assert_same_matches(result, _brute_force(points, 51.4, -0.35, limit))
+
+
+def test_k_nearest_finds_distant_bikes_in_sparse_grid():
+    points = [(1, 10.0, 10.0), (2, -33.9, 151.2)]
+    index = BikeSpatialIndex()
+    index.load(points)
+
+    result = index.nearby(51.5, -0.1, limit=5)
+
+    assert [bike_id for bike_id, _ in result] == [1, 2]
+
+
+def test_queries_wrap_across_antimeridian():
+    index = BikeSpatialIndex()
+    index.load([(1, 0.0, 179.999), (2, 0.0, -179.999), (3, 0.0, 170.0)])
+
+    result = index.nearby(0.0, 180.0, limit=10, radius_m=1_000)
+
+    assert sorted(bike_id for bike_id, _ in result) == [1, 2]
+
+
+def test_upsert_and_remove_update_results():
+    index = BikeSpatialIndex()
+    index.load([(1, 51.5, -0.1)])
+
+    index.upsert(2, 51.5001, -0.1)
+    index.upsert(1, 48.85, 2.35)
+    index.remove(2)
+
+    assert index.nearby(51.5, -0.1, limit=5, radius_m=5_000) == []
+    assert len(index) == 1
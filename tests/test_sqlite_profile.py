@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+import app.db as db_module
+from app.auth import get_current_user_async
+from app.db import Base, get_async_db
+from app.models.bike import AvailabilityStatus, Bike
+from app.models.rental import Rental
+from app.models.user import User
+from app.routers import rentals
+from app.sqlite_profile import WriterLock, apply_pragmas, is_tunable, tuned_pragmas
+
+
+def test_is_tunable_only_for_database_files():
+    assert is_tunable("sqlite:///./dev.db")
+    assert is_tunable("sqlite+aiosqlite:////srv/app.db")
+    assert not is_tunable("sqlite://")
+    assert not is_tunable("sqlite:///:memory:")
+    assert not is_tunable("postgresql://db/transport")
+
+
+def test_tuned_pragmas_apply_to_sync_and_async_connections(tmp_path: Path):
+    url = f"sqlite:///{tmp_path / 'tuned.db'}"
+    pragmas = tuned_pragmas(busy_timeout_ms=1234, cache_size=-2048)
+    sync_engine = create_engine(url)
+    async_engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:"))
+    apply_pragmas(sync_engine, pragmas)
+    apply_pragmas(async_engine.sync_engine, pragmas)
+    query = (
+        "SELECT * FROM pragma_journal_mode, pragma_synchronous, "
+        "pragma_busy_timeout, pragma_foreign_keys, pragma_cache_size"
+    )
+
+    async def read_async() -> tuple:
+        async with async_engine.connect() as connection:
+            return tuple((await connection.exec_driver_sql(query)).one())
+
+    try:
+        with sync_engine.connect() as connection:
+            from_sync = tuple(connection.exec_driver_sql(query).one())
+        from_async = asyncio.run(read_async())
+    finally:
+        sync_engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+    # synchronous=NORMAL reads back as 1.
+    assert from_sync == from_async == ("wal", 1, 1234, 1, -2048)
+
+
+def test_writer_lock_grants_threads_and_coroutines_in_arrival_order():
+    lock = WriterLock()
+    order: list[str] = []
+    lock.acquire()
+
+    def thread_writer() -> None:
+        with lock:
+            order.append("thread")
+
+    async def scenario() -> None:
+        async def task_writer(name: str) -> None:
+            async with lock:
+                order.append(name)
+                await asyncio.sleep(0)
+
+        first = asyncio.create_task(task_writer("first"))
+        await asyncio.sleep(0)
+        worker = threading.Thread(target=thread_writer)
+        worker.start()
+        while len(lock._waiters) < 2:
+            await asyncio.sleep(0.001)
+        second = asyncio.create_task(task_writer("second"))
+        await asyncio.sleep(0)
+        lock.release()
+        await asyncio.gather(first, second)
+        await asyncio.to_thread(worker.join)
+
+    asyncio.run(scenario())
+
+    assert order == ["first", "thread", "second"]
+    assert not lock.locked()
+
+
+def test_cancelled_waiter_does_not_keep_the_lock():
+    lock = WriterLock()
+
+    async def scenario() -> None:
+        lock.acquire()
+        queued = asyncio.create_task(lock.acquire_async())
+        handed_over = asyncio.create_task(lock.acquire_async())
+        await asyncio.sleep(0)
+        queued.cancel()
+        # Hand the lock to ``handed_over``, then cancel it before it resumes.
+        await asyncio.sleep(0)
+        lock.release()
+        handed_over.cancel()
+        results = await asyncio.gather(queued, handed_over, return_exceptions=True)
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    assert not lock.locked()
+    assert not lock._waiters
+
+
+class _CountingLock(WriterLock):
+    def __init__(self) -> None:
+        super().__init__()
+        self.acquisitions = 0
+
+    async def acquire_async(self) -> None:
+        await super().acquire_async()
+        self.acquisitions += 1
+
+
+@pytest.fixture()
+def tuned_client(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[tuple[AsyncClient, User, list[Bike], Session]]:
+    url = f"sqlite:///{tmp_path / 'tuned.db'}"
+    pragmas = tuned_pragmas()
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    apply_pragmas(sync_engine, pragmas)
+    # No busy timeout on the async side: only the writer lock avoids errors.
+    async_engine = create_async_engine(
+        url.replace("sqlite:", "sqlite+aiosqlite:"), connect_args={"timeout": 0}
+    )
+    apply_pragmas(async_engine.sync_engine, tuned_pragmas(busy_timeout_ms=0))
+    Base.metadata.create_all(sync_engine)
+    session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    with Session(sync_engine, expire_on_commit=False) as setup:
+        user = User(name="Tuned", email="tuned@example.com", hashed_password="x")
+        bikes = [
+            Bike(
+                name=f"Bike {index}",
+                type="city",
+                rate_per_day_cents=1000,
+                availability_status=AvailabilityStatus.AVAILABLE,
+            )
+            for index in range(40)
+        ]
+        setup.add(user)
+        setup.add_all(bikes)
+        setup.commit()
+
+    async def _get_async_db() -> AsyncIterator[AsyncSession]:
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(db_module, "sqlite_writer_lock", _CountingLock())
+    test_app = FastAPI()
+    test_app.include_router(rentals.router)
+    test_app.dependency_overrides[get_async_db] = _get_async_db
+    test_app.dependency_overrides[get_current_user_async] = lambda: user
+    client = AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test")
+    try:
+        with Session(sync_engine) as check:
+            yield client, user, bikes, check
+    finally:
+        asyncio.run(client.aclose())
+        asyncio.run(async_engine.dispose())
+        sync_engine.dispose()
+
+
+def test_writer_lock_serializes_concurrent_bookings(tuned_client):
+    client, user, bikes, check = tuned_client
+
+    def payload(bike: Bike) -> dict:
+        return {
+            "bike_id": bike.id,
+            "user_id": user.id,
+            "start_date": date(2024, 8, 1).isoformat(),
+            "end_date": date(2024, 8, 3).isoformat(),
+            "total_price_cents": 0,
+        }
+
+    async def post_all() -> list[int]:
+        requests = [payload(bike) for bike in bikes] + [payload(bikes[0])] * 20
+        responses = await asyncio.gather(
+            *(client.post("/api/rentals", json=body) for body in requests)
+        )
+        return [response.status_code for response in responses]
+
+    statuses = asyncio.run(post_all())
+
+    assert Counter(statuses) == {200: len(bikes), 409: 20}
+    assert check.scalar(select(func.count()).select_from(Rental)) == len(bikes)
+    writer_lock = db_module.sqlite_writer_lock
+    assert writer_lock.acquisitions == len(statuses)
+    assert not writer_lock.locked()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException, Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.auth import create_access_token, get_current_user
+from app.models.user import User
+from app.revocation import revocation_filter
+from app.user_cache import AuthenticatedUser, UserCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = UserCache(max_size=2, ttl_seconds=60)
+    for token, user_id in (("a", 1), ("b", 2)):
+        cache.put(token, AuthenticatedUser(user_id, f"{token}@example.com"), None)
+
+    cache.get("a")
+    cache.put("c", AuthenticatedUser(3, "c@example.com"), None)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == AuthenticatedUser(1, "a@example.com")
+    assert len(cache) == 2
+
+
+def test_cache_expires_at_ttl_or_token_expiry():
+    clock = _Clock()
+    cache = UserCache(max_size=10, ttl_seconds=60, clock=clock)
+    user = AuthenticatedUser(1, "rider@example.com")
+    cache.put("long-lived", user, clock.now + 3_600)
+    cache.put("expiring", user, clock.now + 5)
+
+    clock.now += 10
+    assert cache.get("expiring") is None
+    assert cache.get("long-lived") == user
+
+    clock.now += 60
+    assert cache.get("long-lived") is None
+
+
+def test_cache_invalidates_by_user_and_can_be_disabled():
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    cache.put("t1", AuthenticatedUser(1, "one@example.com"), None)
+    cache.put("t2", AuthenticatedUser(1, "one@example.com"), None)
+    cache.put("t3", AuthenticatedUser(2, "two@example.com"), None)
+
+    cache.invalidate_user(1)
+    assert (cache.get("t1"), cache.get("t2")) == (None, None)
+    assert cache.get("t3") is not None
+
+    cache.enabled = False
+    assert cache.get("t3") is None
+
+
+def _current_user(token: str, db_session: Session) -> AuthenticatedUser:
+    """Call the dependency directly, as FastAPI would for a fresh request."""
+    return get_current_user(Request({"type": "http"}), token=token, db=db_session)
+
+
+def _count_statements(db_session: Session, func):
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = func()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_get_current_user_skips_database_on_cache_hit(
+    db_session: Session, test_user: User
+):
+    token = create_access_token(str(test_user.id), timedelta(minutes=5))
+    db_session.expunge_all()
+    revocation_filter.sync(db_session)
+
+    first, first_queries = _count_statements(
+        db_session, lambda: _current_user(token, db_session)
+    )
+    second, second_queries = _count_statements(
+        db_session, lambda: _current_user(token, db_session)
+    )
+
+    assert first == second
+    assert (first.id, first.email) == (test_user.id, test_user.email)
+    assert first_queries == 1
+    assert second_queries == 0
+
+
+def test_committed_user_changes_evict_cached_tokens(
+    db_session: Session, test_user: User
+):
+    token = create_access_token(str(test_user.id), timedelta(minutes=5))
+    _current_user(token, db_session)
+
+    test_user.email = "renamed@example.com"
+    db_session.commit()
+    assert _current_user(token, db_session).email == "renamed@example.com"
+
+    db_session.delete(test_user)
+    db_session.commit()
+    with pytest.raises(HTTPException) as exc_info:
+        _current_user(token, db_session)
+    assert exc_info.value.status_code == 401
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from httpx import AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.auth import create_access_token
+from app.models.user import User
+from app.password_hasher import hash_password, password_hasher
+from app.repositories.user_repo import insert_users
+from app.services.user_import import import_users, iter_csv_records
+
+_HASH = hash_password("imported-pass")
+
+
+async def _chunks(body: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+def _ndjson(*rows: dict) -> bytes:
+    return "\n".join(json.dumps(row) for row in rows).encode()
+
+
+def _post(client: AsyncClient, token: str, body: bytes, content_type: str):
+    return asyncio.run(
+        client.post(
+            "/auth/users/bulk",
+            content=body,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": content_type,
+            },
+        )
+    )
+
+
+def _admin_token(db_session: Session, user: User) -> str:
+    user.is_admin = True
+    db_session.flush()
+    return create_access_token(str(user.id))
+
+
+def test_csv_records_handle_split_chunks_and_quoted_newlines():
+    body = (
+        b"\xef\xbb\xbfName,Email,Password,Phone\r\n"
+        b'"Ada\nLovelace",ada@example.com,s3cret-pass,\r\n'
+        b"\r\n"
+        b"too,few\n"
+        b"Bob,bob@example.com,s3cret-pass,555-0100"
+    )
+
+    records = asyncio.run(_collect(iter_csv_records(_chunks(body))))
+
+    assert records == [
+        (
+            2,
+            {
+                "name": "Ada\nLovelace",
+                "email": "ada@example.com",
+                "password": "s3cret-pass",
+            },
+            None,
+        ),
+        (5, None, "expected 4 fields, got 2"),
+        (
+            6,
+            {
+                "name": "Bob",
+                "email": "bob@example.com",
+                "password": "s3cret-pass",
+                "phone": "555-0100",
+            },
+            None,
+        ),
+    ]
+
+
+def test_import_uses_one_lookup_and_one_insert_per_chunk(db_session: Session):
+    rows = [
+        {"name": f"user {i}", "email": f"bulk{i}@example.com", "password_hash": _HASH}
+        for i in range(5)
+    ]
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement.split()[0])
+
+    engine = db_session.get_bind().engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = asyncio.run(
+            import_users(
+                db_session,
+                (record async for record in _records(rows)),
+                password_hasher,
+                chunk_size=2,
+            )
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert (result.created, result.failed) == (5, 0)
+    assert statements.count("SELECT") == 3
+    assert statements.count("INSERT") == 3
+
+
+async def _records(rows: list[dict]):
+    for line, row in enumerate(rows, start=1):
+        yield line, row, None
+
+
+def test_insert_users_rejects_only_rows_that_lost_a_race(
+    db_session: Session, test_user: User
+):
+    rows = [
+        {"name": "New", "email": "race-new@example.com", "hashed_password": _HASH},
+        {"name": "Taken", "email": test_user.email, "hashed_password": _HASH},
+    ]
+
+    assert insert_users(db_session, rows) == {test_user.email}
+    created = db_session.scalars(
+        select(User.email).where(User.email == "race-new@example.com")
+    ).all()
+    assert created == ["race-new@example.com"]
+
+
+def test_bulk_import_reports_per_line_errors(
+    auth_client: AsyncClient, db_session: Session, test_user: User
+):
+    token = _admin_token(db_session, test_user)
+    body = _ndjson(
+        {"name": "Plain", "email": "plain@example.com", "password": "s3cret-pass"},
+        {"name": "Hashed", "email": "hashed@example.com", "password_hash": _HASH},
+        {"name": "Again", "email": "plain@example.com", "password": "s3cret-pass"},
+        {"name": "Existing", "email": test_user.email, "password": "s3cret-pass"},
+        {"name": "Bad", "email": "not-an-email", "password": "s3cret-pass"},
+        {"name": "Both", "email": "both@example.com"},
+    ) + b"\n{broken"
+
+    try:
+        response = _post(auth_client, token, body, "application/x-ndjson")
+    finally:
+        password_hasher.shutdown()
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["created"], payload["failed"]) == (2, 5)
+    assert [(error["line"], error["code"]) for error in payload["errors"]] == [
+        (3, "DUPLICATE_EMAIL"),
+        (5, "INVALID_ROW"),
+        (6, "INVALID_ROW"),
+        (7, "INVALID_ROW"),
+        (4, "EMAIL_EXISTS"),
+    ]
+    stored = db_session.scalar(select(User).where(User.email == "hashed@example.com"))
+    assert stored is not None and stored.hashed_password == _HASH
+    assert not stored.is_admin
+
+
+def test_bulk_import_requires_admin_and_supported_body(
+    auth_client: AsyncClient, db_session: Session, test_user: User
+):
+    user_token = create_access_token(str(test_user.id))
+    csv_body = b"name,email,password_hash\nAda,ada@example.com," + _HASH.encode()
+
+    forbidden = _post(auth_client, user_token, csv_body, "text/csv")
+    admin_token = _admin_token(db_session, test_user)
+    unsupported = _post(auth_client, admin_token, csv_body, "application/xml")
+    bad_header = _post(auth_client, admin_token, b"name,phone\nAda,1", "text/csv")
+    imported = _post(auth_client, admin_token, csv_body, "text/csv; charset=utf-8")
+
+    assert forbidden.status_code == 403
+    assert unsupported.status_code == 415
+    assert bad_header.status_code == 400
+    assert imported.status_code == 200
+    assert imported.json() == {"created": 1, "failed": 0, "errors": []}